@@ -23,7 +23,9 @@ class UserAdmin(BaseUserAdmin):
     search_fields = ('email', 'username', 'first_name', 'last_name')
     ordering = ('-date_joined',)
     readonly_fields = ('date_joined', 'created_at',
-                       'updated_at', 'avatar_preview')
+                       'updated_at', 'avatar_preview', 'posts_count',
+                       'published_posts_count', 'comments_count',
+                       'likes_received_count')
 
     fieldsets = (
         (None, {
@@ -42,6 +44,10 @@ class UserAdmin(BaseUserAdmin):
         ('Карма та рівень', {
             'fields': ('karma_points', 'karma_level'),
         }),
+        ('Статистика', {
+            'fields': ('posts_count', 'published_posts_count',
+                       'comments_count', 'likes_received_count'),
+        }),
     )
 
     add_fieldsets = (
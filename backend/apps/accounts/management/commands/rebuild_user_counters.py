@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+
+from apps.accounts.models import User
+
+
+class Command(BaseCommand):
+    help = 'Перераховує статистику профілів (пости, опубліковані пости, коментарі, отримані лайки) і виправляє розбіжності'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Лише показати кількість розбіжностей, без запису')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
+        actual = {
+            f'actual_{field}': expr
+            for field, expr in User._counter_subqueries().items()
+        }
+
+        checked = drifted = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                User.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .only('pk', *User.COUNTER_FIELDS)
+                .annotate(**actual)[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            checked += len(batch)
+
+            to_update = []
+            for user in batch:
+                changed = False
+                for field in User.COUNTER_FIELDS:
+                    value = getattr(user, f'actual_{field}')
+                    if getattr(user, field) != value:
+                        setattr(user, field, value)
+                        changed = True
+                if changed:
+                    to_update.append(user)
+
+            drifted += len(to_update)
+            if to_update and not dry_run:
+                User.objects.bulk_update(to_update, User.COUNTER_FIELDS)
+
+        action = 'Знайдено' if dry_run else 'Виправлено'
+        self.stdout.write(self.style.SUCCESS(
+            f'Перевірено {checked} користувачів. {action} розбіжностей: {drifted}'))
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:40
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    Post = apps.get_model('main', 'Post')
+    Comment = apps.get_model('comments', 'Comment')
+    Like = apps.get_model('likes', 'Like')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+
+    def _count(qs, fk):
+        return Coalesce(Subquery(
+            qs.filter(**{fk: OuterRef('pk')})
+              .order_by()
+              .values(fk)
+              .annotate(c=Count('pk'))
+              .values('c')[:1],
+            output_field=models.IntegerField(),
+        ), 0)
+
+    def _likes_on(model, app_label, model_name):
+        ct = ContentType.objects.filter(app_label=app_label, model=model_name).first()
+        if ct is None:
+            return models.Value(0)
+        # GenericRelation в історичних моделях немає — вкладений підзапит
+        authored = model.objects.filter(author=OuterRef(OuterRef('pk'))).values('pk')
+        return Coalesce(Subquery(
+            Like.objects.filter(content_type=ct, object_id__in=authored)
+                .order_by()
+                .values('content_type')
+                .annotate(c=Count('pk'))
+                .values('c')[:1],
+            output_field=models.IntegerField(),
+        ), 0)
+
+    User.objects.update(
+        posts_count=_count(Post.objects.all(), 'author'),
+        comments_count=_count(Comment.objects.all(), 'author'),
+        likes_received_count=(_likes_on(Post, 'main', 'post')
+                              + _likes_on(Comment, 'comments', 'comment')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_karma_level_user_karma_points'),
+        ('main', '0008_post_excerpt'),
+        ('comments', '0002_comment_path'),
+        ('likes', '0001_initial'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='likes_received_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
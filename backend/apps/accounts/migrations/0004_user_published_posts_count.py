@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:20
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_published_posts(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    Post = apps.get_model('main', 'Post')
+    User.objects.update(published_posts_count=Coalesce(Subquery(
+        Post.objects.filter(author=OuterRef('pk'), status='published')
+            .order_by()
+            .values('author')
+            .annotate(c=Count('pk'))
+            .values('c')[:1],
+        output_field=models.IntegerField(),
+    ), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_user_counters'),
+        ('main', '0008_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='published_posts_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_published_posts, migrations.RunPython.noop),
+    ]
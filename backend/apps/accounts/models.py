@@ -1,9 +1,15 @@
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Greatest
 from django.contrib.auth.models import AbstractUser
 from django.core.cache import cache
 
 
 class User(AbstractUser):
+    # Денормалізована статистика профілю (оновлюється сигналами)
+    COUNTER_FIELDS = ('posts_count', 'published_posts_count',
+                      'comments_count', 'likes_received_count')
+
     email = models.EmailField(unique=True)
     first_name = models.CharField(max_length=30, blank=True)
     last_name = models.CharField(max_length=30, blank=True)
@@ -15,6 +21,11 @@ class User(AbstractUser):
     is_active = models.BooleanField(default=True)
     karma_points = models.IntegerField(default=0, db_index=True)
     karma_level = models.IntegerField(default=1)
+    posts_count = models.PositiveIntegerField(default=0)
+    # Лише опубліковані — для публічного профілю
+    published_posts_count = models.PositiveIntegerField(default=0)
+    comments_count = models.PositiveIntegerField(default=0)
+    likes_received_count = models.PositiveIntegerField(default=0)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
@@ -34,21 +45,18 @@ class User(AbstractUser):
             return f"{self.first_name} {self.last_name}".strip()
         return self.email
 
-    def add_karma(self, points, reason=''):
-        """Додати карму + зберегти в історію"""
-        self.karma_points += points
+    # Кожні 100 карми = +1 рівень
+    KARMA_PER_LEVEL = 100
 
-        # Оновлюємо рівень (кожні 100 карми = +1 рівень)
-        self.karma_level = 1 + (self.karma_points // 100)
-        if self.karma_points < 0:
-            self.karma_points = 0
-            self.karma_level = 1
-        self.save(update_fields=['karma_points', 'karma_level'])
+    def add_karma(self, points, reason=''):
+        """Додати карму + зберегти в історію (синхронно, атомарно через F())"""
+        self.__class__.apply_karma([self.pk], points)
+        self.refresh_from_db(fields=['karma_points', 'karma_level'])
 
-        # Скидаємо кеш лідерборду і цього юзера
+        # Скидаємо кеш цього юзера, оновлюємо лідерборд
+        from apps.karma.services import leaderboard
         cache.delete(f"karma:user:{self.username}")
-        for limit in [10, 20, 50]:
-            cache.delete(f"karma:leaderboard:{limit}")
+        leaderboard.update_scores([self.pk])
 
         # Зберігаємо в історію
         from apps.karma.models import KarmaHistory
@@ -58,6 +66,67 @@ class User(AbstractUser):
             reason=reason
         )
 
+    @classmethod
+    def apply_karma(cls, user_ids, points):
+        """
+        Атомарне нарахування одним UPDATE (без read-modify-write):
+        карма не опускається нижче 0, рівень рахується з нового значення.
+        """
+        new_points = Greatest(F('karma_points') + points, Value(0))
+        return cls.objects.filter(pk__in=user_ids).update(
+            karma_points=new_points,
+            karma_level=1 + new_points / cls.KARMA_PER_LEVEL,
+        )
+
     def get_karma_history(self, limit=10):
         """Отримати останні N записів історії"""
         return self.karma_history.all().order_by('-created_at')[:limit]
+
+    @classmethod
+    def adjust_counter(cls, user_id, field, delta):
+        """
+        Атомарна зміна лічильника (не нижче нуля).
+        user_id може бути й Subquery — тоді автор шукається в тому ж UPDATE.
+        """
+        if field not in cls.COUNTER_FIELDS:
+            raise ValueError(f'Невідомий лічильник: {field}')
+        cls.objects.filter(pk=user_id).update(
+            **{field: Greatest(F(field) + delta, 0)})
+
+    @classmethod
+    def recount_counters(cls, queryset=None):
+        """Перерахунок статистики одним UPDATE з корельованими підзапитами"""
+        if queryset is None:
+            queryset = cls.objects.all()
+        return queryset.update(**cls._counter_subqueries())
+
+    @staticmethod
+    def _counter_subqueries():
+        """Вирази фактичних значень лічильників для annotate()/update()"""
+        from django.contrib.contenttypes.models import ContentType
+        from apps.main.models import Post
+        from apps.comments.models import Comment
+        from apps.likes.models import Like
+
+        def _count(qs, fk):
+            return Coalesce(models.Subquery(
+                qs.filter(**{fk: models.OuterRef('pk')})
+                  .order_by()
+                  .values(fk)
+                  .annotate(c=models.Count('pk'))
+                  .values('c')[:1],
+                output_field=models.IntegerField(),
+            ), 0)
+
+        post_ct = ContentType.objects.get_for_model(Post)
+        comment_ct = ContentType.objects.get_for_model(Comment)
+        return {
+            'posts_count': _count(Post.objects.all(), 'author'),
+            'published_posts_count': _count(
+                Post.objects.filter(status='published'), 'author'),
+            'comments_count': _count(Comment.objects.all(), 'author'),
+            'likes_received_count': (
+                _count(Like.objects.filter(content_type=post_ct), 'post__author')
+                + _count(Like.objects.filter(content_type=comment_ct), 'comment__author')
+            ),
+        }
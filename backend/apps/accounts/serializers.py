@@ -71,9 +71,6 @@ class UserLoginSerializer(serializers.Serializer):
 
 class UserProfileSerializer(serializers.ModelSerializer):
     full_name = serializers.ReadOnlyField()
-    posts_count = serializers.SerializerMethodField()
-    comments_count = serializers.SerializerMethodField()
-    likes_received_count = serializers.SerializerMethodField()
     karma_points = serializers.IntegerField(read_only=True)
     karma_level = serializers.IntegerField(read_only=True)
 
@@ -85,62 +82,18 @@ class UserProfileSerializer(serializers.ModelSerializer):
             'posts_count', 'comments_count', 'likes_received_count',
             'karma_points', 'karma_level'
         )
+        # Лічильники денормалізовані на User (див. accounts/signals.py)
         read_only_fields = ('id', 'created_at', 'updated_at',
-                            'karma_points', 'karma_level', 'likes_received_count')
-
-    def get_posts_count(self, obj):
-        """Кількість пості"""
-        try:
-            return obj.posts.count()
-        except AttributeError:
-            return 0
-
-    def get_comments_count(self, obj):
-        """Кількість коментаріїв"""
-        try:
-            return obj.comments.count()
-        except AttributeError:
-            return 0
-
-    def get_likes_received_count(self, obj):
-        from django.contrib.contenttypes.models import ContentType
-        from apps.likes.models import Like
-
-        try:
-            total = 0
-
-            # Лайки на постах
-            from apps.main.models import Post  # ← твій шлях до Post
-            post_ct = ContentType.objects.get_for_model(Post)
-            post_ids = list(obj.posts.values_list('id', flat=True))
-            if post_ids:
-                total += Like.objects.filter(
-                    content_type=post_ct,
-                    object_id__in=post_ids
-                ).count()
-
-            # Лайки на коментарях
-            from apps.comments.models import Comment  # ← твій шлях до Comment
-            comment_ct = ContentType.objects.get_for_model(Comment)
-            comment_ids = list(obj.comments.values_list('id', flat=True))
-            if comment_ids:
-                total += Like.objects.filter(
-                    content_type=comment_ct,
-                    object_id__in=comment_ids
-                ).count()
-
-            return total
-
-        except Exception as e:
-            print(f"Error: {e}")
-            return 0
+                            'karma_points', 'karma_level', 'posts_count',
+                            'comments_count', 'likes_received_count')
 
 
 class PublicUserSerializer(serializers.ModelSerializer):
     """Публічний профіль — без email та приватних даних"""
     full_name = serializers.ReadOnlyField()
-    posts_count = serializers.SerializerMethodField()
-    comments_count = serializers.SerializerMethodField()
+    # Тільки опубліковані; обидва лічильники — денормалізовані на User
+    posts_count = serializers.IntegerField(
+        source='published_posts_count', read_only=True)
     date_joined = serializers.DateTimeField(read_only=True)
 
     class Meta:
@@ -152,19 +105,6 @@ class PublicUserSerializer(serializers.ModelSerializer):
             'posts_count', 'comments_count',
         )
 
-    def get_posts_count(self, obj):
-        try:
-            return obj.posts.filter(status='published').count()
-        except AttributeError:
-            return 0
-
-    def get_comments_count(self, obj):
-        try:
-            return obj.comments.count()
-        except AttributeError:
-            return 0
-
-
 class UserUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -1,7 +1,12 @@
-from django.db.models.signals import pre_delete, pre_save
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Subquery
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 
 from .models import User
+from apps.main.models import Post
+from apps.comments.models import Comment
+from apps.likes.models import Like
 
 
 @receiver(pre_save, sender=User)
@@ -30,3 +35,63 @@ def delete_avatar_on_user_delete(sender, instance, **kwargs):
     if instance.avatar:
         if instance.avatar.storage.exists(instance.avatar.name):
             instance.avatar.storage.delete(instance.avatar.name)
+
+
+# ── Денормалізована статистика профілю ────────────────────────
+
+@receiver(post_save, sender=Post)
+def posts_counter_on_create(sender, instance, created, **kwargs):
+    if created:
+        User.adjust_counter(instance.author_id, 'posts_count', 1)
+
+    # Опубліковані: статус змінюється й при редагуванні. Попередній
+    # статус запам'ятовує pre_save у main/signals.py (_old_state)
+    old = None if created else getattr(instance, '_old_state', None)
+    was_published = old is not None and old['status'] == 'published'
+    published = instance.status == 'published'
+    if published != was_published:
+        User.adjust_counter(instance.author_id, 'published_posts_count',
+                            1 if published else -1)
+
+
+@receiver(post_delete, sender=Post)
+def posts_counter_on_delete(sender, instance, **kwargs):
+    User.adjust_counter(instance.author_id, 'posts_count', -1)
+    if instance.status == 'published':
+        User.adjust_counter(instance.author_id, 'published_posts_count', -1)
+
+
+@receiver(post_save, sender=Comment)
+def comments_counter_on_create(sender, instance, created, **kwargs):
+    if created:
+        User.adjust_counter(instance.author_id, 'comments_count', 1)
+
+
+@receiver(post_delete, sender=Comment)
+def comments_counter_on_delete(sender, instance, **kwargs):
+    User.adjust_counter(instance.author_id, 'comments_count', -1)
+
+
+def _liked_author(like):
+    """Підзапит author_id лайкнутого об'єкта — без окремого SELECT"""
+    model = ContentType.objects.get_for_id(like.content_type_id).model_class()
+    if model not in (Post, Comment):
+        return None
+    return Subquery(
+        model.objects.filter(pk=like.object_id).values('author_id')[:1])
+
+
+@receiver(post_save, sender=Like)
+def likes_received_on_create(sender, instance, created, **kwargs):
+    author = _liked_author(instance) if created else None
+    if author is not None:
+        User.adjust_counter(author, 'likes_received_count', 1)
+
+
+@receiver(pre_delete, sender=Like)
+def likes_received_on_delete(sender, instance, **kwargs):
+    # pre_delete: при каскадному видаленні поста коментарі можуть зникнути
+    # раніше за їхні лайки, а pre_delete шлеться до будь-якого DELETE
+    author = _liked_author(instance)
+    if author is not None:
+        User.adjust_counter(author, 'likes_received_count', -1)
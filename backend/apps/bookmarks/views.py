@@ -25,7 +25,8 @@ class MyBookmarksView(generics.ListAPIView):
     def get_queryset(self):
         return Bookmark.objects.filter(
             user=self.request.user
-        ).select_related('post', 'post__author', 'post__category')
+        ).select_related('post', 'post__author', 'post__category') \
+         .defer('post__content')
 
 
 @api_view(['POST'])
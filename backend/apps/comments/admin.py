@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from .models import Comment
+from apps.main.models import Post
 
 
 @admin.register(Comment)
@@ -11,7 +12,7 @@ class CommentAdmin(admin.ModelAdmin):
     )
     list_filter = ('is_active', 'created_at', 'updated_at')
     search_fields = ('content', 'author__username', 'post__title')
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('path', 'created_at', 'updated_at')
     raw_id_fields = ('author', 'post', 'parent')
     list_editable = ('is_active',)
 
@@ -23,7 +24,7 @@ class CommentAdmin(admin.ModelAdmin):
             'fields': ('is_active',)
         }),
         ('Timestamps', {
-            'fields': ('created_at', 'updated_at'),
+            'fields': ('path', 'created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
@@ -47,14 +48,22 @@ class CommentAdmin(admin.ModelAdmin):
 
     actions = ['make_active', 'make_inactive']
 
+    def _recount_posts(self, queryset):
+        # queryset.update() оминає сигнали — перераховуємо лічильники постів
+        post_ids = set(queryset.values_list('post_id', flat=True))
+        Post.recount_counters(Post.objects.filter(pk__in=post_ids))
+
     def make_active(self, request, queryset):
         updated = queryset.update(is_active=True)
+        self._recount_posts(queryset)
         self.message_user(
             request, f'{updated} comments were marked as active.')
     make_active.short_description = "Mark selected comments as active"
 
     def make_inactive(self, request, queryset):
-        updated = queryset.update(is_active=False)
+        # Разом з усіма відповідями — один UPDATE по діапазонах path
+        updated = Comment.deactivate_subtrees(queryset.only('id', 'post_id', 'path'))
+        self._recount_posts(queryset)
         self.message_user(
             request, f'{updated} comments were marked as inactive.')
     make_inactive.short_description = "Mark selected comments as inactive"
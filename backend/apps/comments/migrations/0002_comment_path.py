@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_path(apps, schema_editor):
+    Comment = apps.get_model('comments', 'Comment')
+
+    paths = {}
+    pending = list(Comment.objects.order_by('pk').values_list('pk', 'parent_id'))
+    # Батько майже завжди має менший id; решту доганяємо наступними проходами
+    while pending:
+        rest = []
+        for pk, parent_id in pending:
+            if parent_id is None:
+                paths[pk] = f"{pk:010d}/"
+            elif parent_id in paths:
+                paths[pk] = f"{paths[parent_id]}{pk:010d}/"
+            else:
+                rest.append((pk, parent_id))
+        if len(rest) == len(pending):
+            break
+        pending = rest
+
+    batch = [Comment(pk=pk, path=path) for pk, path in paths.items()]
+    Comment.objects.bulk_update(batch, ['path'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0001_initial'),
+        ('main', '0008_post_excerpt'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'path'], name='comments_post_id_5f9abc_idx'),
+        ),
+        migrations.RunPython(fill_path, migrations.RunPython.noop),
+    ]
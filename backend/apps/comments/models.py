@@ -1,9 +1,21 @@
+from functools import reduce
+from operator import or_
+
 from django.db import models
 from django.contrib.contenttypes.fields import GenericRelation
 from django.conf import settings
 
 
 class Comment(models.Model):
+    # Сегмент матеріалізованого шляху: id з нулями до фіксованої ширини,
+    # тож лексикографічний порядок path = обхід дерева в глибину
+    PATH_STEP = 10
+    PATH_SEPARATOR = '/'
+    # Більший за '/' та цифри — верхня межа діапазону піддерева
+    PATH_UPPER_BOUND = '~'
+    # Скільки рівнів вміщує path (max_length=255)
+    MAX_DEPTH = 255 // (PATH_STEP + 1) - 1
+
     post = models.ForeignKey(
         'main.Post', on_delete=models.CASCADE, related_name='comments'
     )
@@ -15,6 +27,9 @@ class Comment(models.Model):
     content = models.TextField()
     likes = GenericRelation('likes.Like', related_query_name='comment')
     is_active = models.BooleanField(default=True)
+    # '0000000001/0000000007/' — шлях від кореня до самого коментаря
+    path = models.CharField(max_length=255, blank=True, default='',
+                            editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -27,13 +42,75 @@ class Comment(models.Model):
             models.Index(fields=['post', '-created_at']),
             models.Index(fields=['author', '-created_at']),
             models.Index(fields=['parent', '-created_at']),
+            models.Index(fields=['post', 'path']),
         ]
 
     def __str__(self):
         return f"Comment by {self.author.username} on {self.post.title}"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Шлях містить власний id — відомий лише після INSERT
+        if not self.path:
+            parent_path = ''
+            if self.parent_id:
+                parent_path = Comment.objects.filter(pk=self.parent_id) \
+                    .values_list('path', flat=True).first() or ''
+            self.path = self.build_path(parent_path, self.pk)
+            Comment.objects.filter(pk=self.pk).update(path=self.path)
+
+    @classmethod
+    def build_path(cls, parent_path, pk):
+        return f"{parent_path}{pk:0{cls.PATH_STEP}d}{cls.PATH_SEPARATOR}"
+
+    @property
+    def depth(self):
+        """0 — кореневий коментар"""
+        return self.path.count(self.PATH_SEPARATOR) - 1
+
+    @classmethod
+    def subtree_q(cls, path):
+        """Коментар з цим шляхом і всі його нащадки — діапазон по індексу"""
+        return models.Q(path__gte=path, path__lt=path + cls.PATH_UPPER_BOUND)
+
+    def subtree(self, include_self=True):
+        if not self.path:
+            # Шлях ще не заповнено: subtree_q('') охопив би весь пост,
+            # тож до бекфілу піддерево — лише сам коментар
+            qs = Comment.objects.filter(pk=self.pk)
+            return qs if include_self else qs.none()
+        qs = Comment.objects.filter(
+            self.subtree_q(self.path), post_id=self.post_id)
+        if not include_self:
+            qs = qs.exclude(pk=self.pk)
+        return qs
+
+    def descendants_count(self):
+        """Усі активні нащадки (не лише прямі відповіді) — один COUNT"""
+        return self.subtree(include_self=False).filter(is_active=True).count()
+
+    @classmethod
+    def deactivate_subtrees(cls, comments):
+        """
+        Деактивує коментарі разом з усіма відповідями одним UPDATE.
+        Сигнали не спрацьовують — лічильники постів перераховує викликач.
+        """
+        comments = [c for c in comments if c.path]
+        if not comments:
+            return 0
+        condition = reduce(or_, (
+            cls.subtree_q(c.path) & models.Q(post_id=c.post_id)
+            for c in comments
+        ))
+        return cls.objects.filter(condition, is_active=True) \
+            .update(is_active=False)
+
     @property
     def replies_count(self):
+        # replies, prefetch-нуті у views, — вже лише активні: рахуємо без COUNT
+        prefetched = getattr(self, '_prefetched_objects_cache', {})
+        if 'replies' in prefetched:
+            return len(prefetched['replies'])
         return self.replies.filter(is_active=True).count()
 
     @property
@@ -2,9 +2,11 @@ from rest_framework import serializers
 
 from .models import Comment
 from apps.main.models import Post
+from apps.likes.serializers import IsLikedMixin
+from apps.likes.utils import liked_ids_context
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(IsLikedMixin, serializers.ModelSerializer):
     author_info = serializers.SerializerMethodField()
     replies_count = serializers.ReadOnlyField()
     is_reply = serializers.ReadOnlyField()
@@ -31,12 +33,6 @@ class CommentSerializer(serializers.ModelSerializer):
             'karma_level': author.karma_level,
         }
 
-    def get_is_liked(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.is_liked_by(request.user)
-        return False
-
 
 class CommentCreateSerializer(serializers.ModelSerializer):
 
@@ -59,6 +55,11 @@ class CommentCreateSerializer(serializers.ModelSerializer):
                 'parent': 'Parent comment must belong to the same post.'
             })
 
+        if parent and parent.depth >= Comment.MAX_DEPTH:
+            raise serializers.ValidationError({
+                'parent': 'Thread is too deep.'
+            })
+
         return attrs
 
     def create(self, validated_data):
@@ -83,13 +84,33 @@ class CommentUpdateSerializer(serializers.ModelSerializer):
 class CommentDetailSerializer(CommentSerializer):
 
     replies = serializers.SerializerMethodField()
+    descendants_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Comment
-        fields = CommentSerializer.Meta.fields + ['replies']
+        fields = CommentSerializer.Meta.fields + ['replies', 'descendants_count']
+
+    def get_descendants_count(self, obj):
+        return obj.descendants_count()
 
     def get_replies(self, obj):
         if obj.parent is None:  # тільки для кореневих коментарів
-            replies = obj.replies.filter(is_active=True).order_by('created_at')
-            return CommentSerializer(replies, many=True, context=self.context).data
+            # CommentDetailView вже prefetch-ить активні replies
+            replies = sorted(obj.replies.all(),
+                             key=lambda reply: (reply.created_at, reply.pk))
+            context = liked_ids_context(
+                self.context.get('request'), Comment, replies, self.context)
+            return CommentSerializer(replies, many=True, context=context).data
         return []
+
+
+class CommentTreeNodeSerializer(CommentSerializer):
+    """
+    Вузол дерева коментарів: replies_count береться з дерева в пам'яті
+    (context['tree']), likes_count — з анотації запиту.
+    """
+    replies_count = serializers.SerializerMethodField()
+    likes_count = serializers.IntegerField(source='likes_total', read_only=True)
+
+    def get_replies_count(self, obj):
+        return self.context['tree'].replies_count(obj.pk)
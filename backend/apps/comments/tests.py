@@ -1,3 +1,120 @@
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 
-# Create your tests here.
+from apps.main.models import Post
+
+from .models import Comment
+
+User = get_user_model()
+
+
+class CommentPathTests(TestCase):
+    """Матеріалізований шлях: побудова в save() і вибірка піддерева"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='author', email='author@example.com', password='pass12345')
+        cls.post = Post.objects.create(
+            title='Пост', content='текст', author=cls.user, status='published')
+        cls.other_post = Post.objects.create(
+            title='Інший', content='текст', author=cls.user, status='published')
+
+    def comment(self, parent=None, post=None):
+        return Comment.objects.create(
+            post=post or self.post, author=self.user, parent=parent,
+            content='коментар')
+
+    def test_root_path(self):
+        root = self.comment()
+        self.assertEqual(root.path, Comment.build_path('', root.pk))
+        self.assertEqual(root.path, f'{root.pk:010d}/')
+        self.assertEqual(root.depth, 0)
+
+        root.refresh_from_db()
+        self.assertEqual(root.path, f'{root.pk:010d}/')
+
+    def test_reply_paths_extend_parent(self):
+        root = self.comment()
+        reply = self.comment(parent=root)
+        nested = self.comment(parent=reply)
+
+        self.assertEqual(reply.path, root.path + f'{reply.pk:010d}/')
+        self.assertEqual(nested.path, reply.path + f'{nested.pk:010d}/')
+        self.assertEqual((reply.depth, nested.depth), (1, 2))
+
+    def test_save_keeps_existing_path(self):
+        root = self.comment()
+        path = root.path
+        root.content = 'змінено'
+        root.save()
+        root.refresh_from_db()
+        self.assertEqual(root.path, path)
+
+    def test_path_order_is_depth_first(self):
+        first = self.comment()
+        second = self.comment()
+        first_reply = self.comment(parent=first)
+        second_reply = self.comment(parent=second)
+        first_nested = self.comment(parent=first_reply)
+
+        ordered = list(Comment.objects.filter(post=self.post)
+                       .order_by('path').values_list('pk', flat=True))
+        self.assertEqual(ordered, [first.pk, first_reply.pk, first_nested.pk,
+                                   second.pk, second_reply.pk])
+
+    def test_subtree(self):
+        root = self.comment()
+        reply = self.comment(parent=root)
+        nested = self.comment(parent=reply)
+        sibling = self.comment()
+        self.comment(parent=sibling)
+
+        self.assertEqual(set(root.subtree().values_list('pk', flat=True)),
+                         {root.pk, reply.pk, nested.pk})
+        self.assertEqual(
+            set(root.subtree(include_self=False).values_list('pk', flat=True)),
+            {reply.pk, nested.pk})
+        self.assertEqual(set(reply.subtree().values_list('pk', flat=True)),
+                         {reply.pk, nested.pk})
+        self.assertEqual(list(nested.subtree(include_self=False)), [])
+
+    def test_subtree_is_limited_to_post(self):
+        root = self.comment()
+        other = self.comment(post=self.other_post)
+        # Однаковий префікс шляху в іншому пості не потрапляє в піддерево
+        Comment.objects.filter(pk=other.pk).update(path=root.path + '9999999999/')
+        self.assertEqual(list(root.subtree().values_list('pk', flat=True)), [root.pk])
+
+    def test_subtree_without_path_is_only_self(self):
+        root = self.comment()
+        self.comment(parent=root)
+        legacy = self.comment()
+        # Рядок до бекфілу шляхів не тягне за собою весь пост
+        Comment.objects.filter(pk=legacy.pk).update(path='')
+        legacy.refresh_from_db()
+
+        self.assertEqual(list(legacy.subtree().values_list('pk', flat=True)),
+                         [legacy.pk])
+        self.assertEqual(legacy.descendants_count(), 0)
+
+        response = self.client.get(f'/api/v1/comments/{legacy.pk}/thread/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_replies'], 0)
+        self.assertEqual(response.data['comment']['id'], legacy.pk)
+
+    def test_descendants_count_and_deactivate(self):
+        root = self.comment()
+        reply = self.comment(parent=root)
+        self.comment(parent=reply)
+        keep = self.comment()
+
+        self.assertEqual(root.descendants_count(), 2)
+        Comment.objects.filter(pk=reply.pk).update(is_active=False)
+        self.assertEqual(root.descendants_count(), 1)
+
+        self.assertEqual(Comment.deactivate_subtrees([root]), 2)
+        self.assertFalse(Comment.objects.filter(
+            root.subtree_q(root.path), is_active=True).exists())
+        keep.refresh_from_db()
+        self.assertTrue(keep.is_active)
@@ -0,0 +1,63 @@
+"""
+Дерево коментарів поста, зібране в пам'яті з одного впорядкованого запиту.
+
+Структури компактні: лише id та списки id дітей; самі об'єкти — в одному
+словнику. Коментарі, чий батьківський коментар неактивний (видалений),
+у дерево не потрапляють разом з усією гілкою.
+"""
+from collections import defaultdict
+
+
+class CommentTree:
+
+    def __init__(self, comments, root_id=None):
+        """
+        comments — активні коментарі поста, впорядковані за (created_at, id)
+        або за path, тож батько завжди йде раніше за свої відповіді.
+        root_id — корінь гілки, якщо будуємо піддерево одного коментаря.
+        """
+        self.by_id = {}
+        self.children = defaultdict(list)
+        self.roots = []
+
+        for comment in comments:
+            if comment.parent_id is None or comment.pk == root_id:
+                self.roots.append(comment.pk)
+            elif comment.parent_id in self.by_id:
+                self.children[comment.parent_id].append(comment.pk)
+            else:
+                continue  # гілка під видаленим коментарем
+            self.by_id[comment.pk] = comment
+
+    def replies_count(self, comment_id):
+        return len(self.children.get(comment_id, ()))
+
+    def collect(self, root_ids, max_depth):
+        """id коментарів сторінки: корені + відповіді до глибини max_depth"""
+        collected = []
+        level = list(root_ids)
+        depth = 0
+        while level:
+            collected.extend(level)
+            if depth >= max_depth:
+                break
+            level = [child for pk in level
+                     for child in self.children.get(pk, ())]
+            depth += 1
+        return collected
+
+    def nest(self, root_ids, data_by_id, max_depth):
+        """
+        Збирає вкладений JSON з уже серіалізованих вузлів.
+        На межі глибини replies порожній, а replies_count лишається повним.
+        """
+        def build(pk, depth):
+            node = dict(data_by_id[pk])
+            node['depth'] = depth
+            node['replies'] = [
+                build(child, depth + 1)
+                for child in self.children.get(pk, ())
+            ] if depth < max_depth else []
+            return node
+
+        return [build(pk, 0) for pk in root_ids]
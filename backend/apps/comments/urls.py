@@ -6,8 +6,10 @@ from . import views
 urlpatterns = [
     path('', views.CommentListCreateView.as_view(), name='comment-list'),
     path('<int:pk>/', views.CommentDetailView.as_view(), name='comment-detail'),
+    path('<int:comment_id>/thread/', views.comment_thread, name='comment-thread'),
     path('my-comments/', views.MyCommentsView.as_view(), name='my-comments'),
     path('post/<int:post_id>/', views.post_comments, name='post-comments'),
+    path('post/<int:post_id>/tree/', views.comment_tree, name='comment-tree'),
     path('post/<int:comment_id>/replies/',
          views.comment_replies, name='comment-replies'),
 ]
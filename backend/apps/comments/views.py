@@ -1,26 +1,32 @@
 from rest_framework import generics, permissions, filters
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import LimitOffsetPagination
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
-from django.db.models import Prefetch
+from django.db.models import Count, Prefetch
 from django.core.cache import cache
 
 from .models import Comment
 from .serializers import CommentSerializer, CommentDetailSerializer, \
-    CommentCreateSerializer, CommentUpdateSerializer
+    CommentCreateSerializer, CommentUpdateSerializer, CommentTreeNodeSerializer
+from .tree import CommentTree
 from .permissions import IsAuthorOrReadOnly
 from apps.main.models import Post
 from apps.core.throttling import CommentCreateMinuteThrottle, CommentCreateHourThrottle
+from apps.likes.utils import LikedIdsMixin, liked_ids_context, overlay_is_liked
+from apps.core.cache import make_key, bump_generation
+from apps.core.pagination import KeysetPaginationMixin
 
 
-class CommentPagination(LimitOffsetPagination):
+class CommentPagination(KeysetPaginationMixin, LimitOffsetPagination):
     default_limit = 20
     max_limit = 100
 
 
-class CommentListCreateView(generics.ListCreateAPIView):
+class CommentListCreateView(LikedIdsMixin, generics.ListCreateAPIView):
+    liked_model = Comment
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     pagination_class = CommentPagination
     filter_backends = [DjangoFilterBackend,
@@ -100,17 +106,19 @@ class CommentDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     def perform_destroy(self, instance):
         post_id = instance.post_id
-        instance.is_active = False
-        instance.save()
+        # М'яке видалення разом з усією гілкою відповідей — один UPDATE
+        Comment.deactivate_subtrees([instance])
+        Post.recount_counters(Post.objects.filter(pk=post_id))
         _invalidate_comments_cache(post_id)
 
 
 def _invalidate_comments_cache(post_id):
     """очищення кешу коментарів поста"""
-    cache.delete_pattern(f"comments:post:{post_id}:*")
+    bump_generation(f"comments:post:{post_id}")
 
 
-class MyCommentsView(generics.ListAPIView):
+class MyCommentsView(LikedIdsMixin, generics.ListAPIView):
+    liked_model = Comment
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = CommentPagination
@@ -141,29 +149,30 @@ def post_comments(request, post_id):
     limit = int(request.query_params.get('limit', 20))
     offset = int(request.query_params.get('offset', 0))
 
-    # Кешуємо тільки першу сторінку анонімних запитів
-    # Авторизовані — не кешуємо бо є is_liked який відрізняється
-    use_cache = not request.user.is_authenticated
-    cache_key = f"comments:post:{post_id}:limit:{limit}:offset:{offset}"
+    # Кеш спільний для всіх: is_liked поточного користувача
+    # накладається поверх одним запитом
+    cursor = request.query_params.get('cursor')
+    cache_key = make_key(
+        f"comments:post:{post_id}", 'limit', limit, 'offset', offset,
+        'cursor', cursor)
 
-    if use_cache:
-        cached = cache.get(cache_key)
-        if cached:
-            return Response(cached)
+    cached = cache.get(cache_key)
+    if cached:
+        overlay_is_liked(request, Comment, cached['results'])
+        return Response(cached)
 
     comments = Comment.objects.filter(
         post=post,
         is_active=True
     ).select_related('author').order_by('created_at')
 
-    # Пагінація
-    paginator = LimitOffsetPagination()
-    paginator.default_limit = 20
-    paginator.max_limit = 100
+    # Пагінація (?cursor= — keyset по (created_at, id) без COUNT)
+    paginator = CommentPagination()
+    paginator.keyset_descending = False
 
     page = paginator.paginate_queryset(comments, request)
     serializer = CommentSerializer(
-        page, many=True, context={'request': request})
+        page, many=True, context=liked_ids_context(request, Comment, page))
 
     response = paginator.get_paginated_response(serializer.data)
     response.data['post'] = {
@@ -172,24 +181,129 @@ def post_comments(request, post_id):
         'slug':  post.slug,
     }
 
-    if use_cache:
-        cache.set(cache_key, response.data, timeout=120)
+    cache.set(cache_key, response.data, timeout=120)
 
     return response
 
 
+COMMENT_TREE_MAX_DEPTH = 10
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def comment_tree(request, post_id):
+    """
+    GET /api/v1/comments/post/<post_id>/tree/?limit=&offset=&depth=
+    Вкладене дерево: пагінація по кореневих коментарях, depth — глибина
+    відповідей (0 — лише корені). Усі активні коментарі поста — одним запитом.
+    """
+    post = get_object_or_404(Post, id=post_id, status='published')
+
+    try:
+        limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+        offset = max(int(request.query_params.get('offset', 0)), 0)
+        depth = min(max(int(request.query_params.get(
+            'depth', COMMENT_TREE_MAX_DEPTH)), 0), COMMENT_TREE_MAX_DEPTH)
+    except ValueError:
+        raise ValidationError('limit, offset та depth мають бути числами')
+
+    cache_key = make_key(
+        f"comments:post:{post_id}", 'tree', limit, offset, depth)
+
+    cached = cache.get(cache_key)
+    if cached:
+        overlay_is_liked(request, Comment, cached['results'],
+                         children_key='replies')
+        return Response(cached)
+
+    comments = list(
+        Comment.objects.filter(post=post, is_active=True)
+        .select_related('author')
+        .annotate(likes_total=Count('likes'))
+        .order_by('created_at', 'id')
+    )
+    tree = CommentTree(comments)
+
+    root_ids = tree.roots[offset:offset + limit]
+    page = [tree.by_id[pk] for pk in tree.collect(root_ids, depth)]
+
+    context = liked_ids_context(request, Comment, page)
+    context['tree'] = tree
+    serialized = CommentTreeNodeSerializer(page, many=True, context=context).data
+
+    data = {
+        'count': len(tree.roots),
+        'total_comments': len(tree.by_id),
+        'limit': limit,
+        'offset': offset,
+        'depth': depth,
+        'post': {
+            'id':    post.id,
+            'title': post.title,
+            'slug':  post.slug,
+        },
+        'results': tree.nest(
+            root_ids, {node['id']: node for node in serialized}, depth),
+    }
+
+    cache.set(cache_key, data, timeout=120)
+
+    return Response(data)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def comment_thread(request, comment_id):
+    """
+    GET /api/v1/comments/<comment_id>/thread/?depth=
+    "Показати ще відповіді": уся гілка під коментарем одним діапазонним
+    запитом по path, зібрана в дерево.
+    """
+    root = get_object_or_404(
+        Comment.objects.only('id', 'post_id', 'path'),
+        id=comment_id, is_active=True)
+
+    try:
+        depth = min(max(int(request.query_params.get(
+            'depth', COMMENT_TREE_MAX_DEPTH)), 0), COMMENT_TREE_MAX_DEPTH)
+    except ValueError:
+        raise ValidationError('depth має бути числом')
+
+    comments = list(
+        root.subtree().filter(is_active=True)
+        .select_related('author')
+        .annotate(likes_total=Count('likes'))
+        .order_by('path')
+    )
+    tree = CommentTree(comments, root_id=root.pk)
+    page = [tree.by_id[pk] for pk in tree.collect(tree.roots, depth)]
+
+    context = liked_ids_context(request, Comment, page)
+    context['tree'] = tree
+    serialized = CommentTreeNodeSerializer(page, many=True, context=context).data
+    thread = tree.nest(
+        tree.roots, {node['id']: node for node in serialized}, depth)
+
+    return Response({
+        'total_replies': len(tree.by_id) - 1,
+        'depth': depth,
+        'comment': thread[0],
+    })
+
+
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def comment_replies(request, comment_id):
     """Залишаємо для сумісності, але post_comments тепер повертає все"""
     parent_comment = get_object_or_404(Comment, id=comment_id, is_active=True)
-    replies = Comment.objects.filter(
+    replies = list(Comment.objects.filter(
         parent=parent_comment, is_active=True
-    ).select_related('author').order_by('created_at')
-    serializer = CommentSerializer(
-        replies, many=True, context={'request': request})
+    ).select_related('author').order_by('created_at'))
+    context = liked_ids_context(
+        request, Comment, [parent_comment, *replies])
+    serializer = CommentSerializer(replies, many=True, context=context)
     return Response({
-        'parent_comment': CommentSerializer(parent_comment, context={'request': request}).data,
+        'parent_comment': CommentSerializer(parent_comment, context=context).data,
         'replies': serializer.data,
-        'total_replies': replies.count(),
+        'total_replies': len(replies),
     })
@@ -0,0 +1,98 @@
+"""
+Інвалідація кешу без SCAN/delete_pattern.
+
+Версіоновані простори ключів (generation counters).
+
+Кожна родина ключів (posts:list, comments:post:<id>...) містить у ключі
+поточне покоління: "posts:list:g<gen>:status=published". Інвалідація всієї
+родини — один INCR лічильника покоління; старі записи просто більше
+ніхто не читає, і вони зникають по TTL.
+
+Теги: кешована відповідь реєструє свій ключ під тегами (пост, категорія,
+тип списку), а інвалідація тегу видаляє рівно зареєстровані ключі.
+"""
+import logging
+import time
+
+from django.core.cache import cache
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+GENERATION_PREFIX = 'gen'
+
+
+def _generation_key(namespace):
+    return f"{GENERATION_PREFIX}:{namespace}"
+
+
+def get_generation(namespace):
+    """Поточне покоління простору ключів"""
+    # Стартуємо з часу, а не з 1: якщо лічильник витіснили з Redis,
+    # нове покоління не збіжеться зі старими ключами, що ще живуть
+    return cache.get_or_set(
+        _generation_key(namespace), int(time.time()), timeout=None)
+
+
+def make_key(namespace, *parts):
+    """Ключ кешу в межах поточного покоління простору"""
+    suffix = ':'.join(str(p) for p in parts)
+    return f"{namespace}:g{get_generation(namespace)}:{suffix}"
+
+
+def bump_generation(*namespaces):
+    """Інвалідація родин ключів — по одному INCR на простір"""
+    for namespace in namespaces:
+        key = _generation_key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Лічильника ще немає — наступне читання створить свіжий
+            cache.add(key, int(time.time()), timeout=None)
+
+
+# ── Теги: точна інвалідація зареєстрованих ключів ─────────────
+
+TAG_PREFIX = 'tag'
+# Набір тегу живе щонайменше стільки — довше за будь-який тегований ключ
+TAG_TIMEOUT = 3600
+
+
+def _tag_key(tag):
+    return cache.make_key(f"{TAG_PREFIX}:{tag}")
+
+
+def set_tagged(key, value, timeout, tags):
+    """
+    cache.set + реєстрація ключа під кожним тегом (Redis SET).
+    """
+    cache.set(key, value, timeout=timeout)
+    try:
+        pipe = get_redis_connection('default').pipeline(transaction=False)
+        full_key = cache.make_key(key)
+        for tag in tags:
+            tag_key = _tag_key(tag)
+            pipe.sadd(tag_key, full_key)
+            pipe.expire(tag_key, max(timeout, TAG_TIMEOUT))
+        pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Cache tag registry unavailable: {e}")
+
+
+def invalidate_tags(*tags):
+    """Видаляє рівно ті ключі, що зареєстровані під тегами (pipeline)"""
+    if not tags:
+        return
+    try:
+        client = get_redis_connection('default')
+        tag_keys = [_tag_key(tag) for tag in tags]
+
+        pipe = client.pipeline(transaction=False)
+        for tag_key in tag_keys:
+            pipe.smembers(tag_key)
+        members = set().union(*pipe.execute())
+
+        client.delete(*members, *tag_keys)
+    except RedisError as e:
+        logger.warning(f"Cache tag registry unavailable: {e}")
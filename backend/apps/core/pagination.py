@@ -0,0 +1,101 @@
+import base64
+import json
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPaginationMixin:
+    """
+    Опційна keyset (cursor) пагінація поверх LimitOffset/PageNumber.
+
+    Без ?cursor= працює базовий клас. З ?cursor= (порожній — перша сторінка)
+    сторінка вибирається умовою WHERE (field, id) < (value, last_id)
+    по індексу: без OFFSET і без COUNT(*), тож час не залежить від глибини.
+    Записи з NULL у ключовому полі в keyset-режим не потрапляють.
+    """
+    cursor_query_param = 'cursor'
+    keyset_fields = ('created_at', 'id')
+    keyset_descending = True
+
+    keyset_mode = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params:
+            self.keyset_mode = False
+            return super().paginate_queryset(queryset, request, view)
+
+        self.keyset_mode = True
+        self.request = request
+        limit = self._keyset_limit(request)
+        field, pk_field = self.keyset_fields
+        prefix = '-' if self.keyset_descending else ''
+
+        queryset = queryset.filter(**{f'{field}__isnull': False}) \
+                           .order_by(f'{prefix}{field}', f'{prefix}{pk_field}')
+
+        cursor = self._decode_cursor(
+            request.query_params.get(self.cursor_query_param),
+            queryset.model._meta.get_field(field))
+        if cursor is not None:
+            value, last_pk = cursor
+            op = 'lt' if self.keyset_descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{field}__{op}': value}) |
+                Q(**{field: value, f'{pk_field}__{op}': last_pk})
+            )
+
+        rows = list(queryset[:limit + 1])
+        self.has_next = len(rows) > limit
+        rows = rows[:limit]
+        self.next_cursor = self._encode_cursor(rows[-1]) \
+            if self.has_next and rows else None
+        return rows
+
+    def get_paginated_response(self, data):
+        if not self.keyset_mode:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self._next_link(),
+            'next_cursor': self.next_cursor,
+            'results': data,
+        })
+
+    def _keyset_limit(self, request):
+        if hasattr(self, 'get_limit'):
+            return self.get_limit(request)
+        return self.get_page_size(request)
+
+    def _next_link(self):
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        for param in ('offset', 'page'):
+            url = remove_query_param(url, param)
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def _encode_cursor(self, obj):
+        field, pk_field = self.keyset_fields
+        value = getattr(obj, field)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        raw = json.dumps([value, getattr(obj, pk_field)])
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def _decode_cursor(self, token, model_field):
+        """[value, last_pk] -> значення з типом ключового поля; інакше 404"""
+        if not token:
+            return None
+        try:
+            value, last_pk = json.loads(base64.urlsafe_b64decode(token.encode()))
+            # Курсор приходить від клієнта — перевіряємо типи до WHERE
+            value = model_field.to_python(value)
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound('Невірний курсор')
+        if value is None or type(last_pk) is not int:
+            raise NotFound('Невірний курсор')
+        return value, last_pk
@@ -0,0 +1,44 @@
+"""
+Розбір числових query-параметрів.
+
+str.isdigit() пропускає символи на кшталт '²' (тоді int() падає з 500),
+а задовгі числа — до DataError на integer-колонках Postgres. Тут лише
+ASCII-цифри в межах INTEGER; помилка — ValidationError (400).
+"""
+from rest_framework.exceptions import ValidationError
+
+# Верхня межа колонки INTEGER у Postgres
+MAX_INT = 2 ** 31 - 1
+
+
+def _to_int(part):
+    part = part.strip()
+    if not (part.isascii() and part.isdigit()) or int(part) > MAX_INT:
+        return None
+    return int(part)
+
+
+def parse_int(raw, default, name):
+    """Невід'ємне ціле з query-параметра; відсутнє — default"""
+    if raw is None or raw == '':
+        return default
+    value = _to_int(raw)
+    if value is None:
+        raise ValidationError({name: 'Очікується невід\'ємне ціле число'})
+    return value
+
+
+def parse_id_list(raw, limit, name='id'):
+    """'1,2,3' -> [1, 2, 3] без дублікатів, не більше limit значень"""
+    ids = []
+    for part in (raw or '').split(','):
+        if not part.strip():
+            continue
+        value = _to_int(part)
+        if not value:
+            raise ValidationError({name: 'Очікуються додатні числа через кому'})
+        ids.append(value)
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > limit:
+        raise ValidationError({name: f'Не більше {limit} значень'})
+    return ids
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.karma.services.ledger import apply_events
+
+
+class Command(BaseCommand):
+    help = 'Застосовує чергу подій карми (KarmaEvent) пакетами'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Працювати безперервно, перевіряючи чергу кожні N секунд')
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        batch_size = options['batch_size']
+
+        while True:
+            total = 0
+            while True:
+                applied = apply_events(batch_size=batch_size)
+                total += applied
+                if applied < batch_size:
+                    break
+            self.stdout.write(f'Застосовано подій карми: {total}')
+            if not interval:
+                break
+            time.sleep(interval)
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from apps.karma.services import leaderboard
+
+
+class Command(BaseCommand):
+    help = 'Перебудовує sorted set лідерборду карми з таблиці users'
+
+    def handle(self, *args, **options):
+        total = leaderboard.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Лідерборд перебудовано: {total} користувачів'))
@@ -24,3 +24,27 @@ class KarmaHistory(models.Model):
     def __str__(self):
         sign = '+' if self.points >= 0 else ''
         return f"{self.user.username}: {sign}{self.points} - {self.reason}"
+
+
+class KarmaEvent(models.Model):
+    """
+    Outbox нарахувань карми: сигнали лише додають рядок, а команда
+    process_karma_events застосовує події пакетами (див. services/ledger.py)
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    points = models.IntegerField()
+    reason = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Подія карми'
+        verbose_name_plural = 'Черга подій карми'
+
+    def __str__(self):
+        sign = '+' if self.points >= 0 else ''
+        return f"{self.user_id}: {sign}{self.points} - {self.reason}"
@@ -1,9 +1,25 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+
 from .models import KarmaHistory
 
 User = get_user_model()
 
+RECENT_HISTORY_LIMIT = 10
+
+
+def with_recent_history(queryset):
+    """
+    Останні RECENT_HISTORY_LIMIT записів історії для всіх користувачів
+    одним запитом (зріз у Prefetch — ROW_NUMBER() по user_id)
+    """
+    return queryset.prefetch_related(Prefetch(
+        'karma_history',
+        queryset=KarmaHistory.objects.order_by('-created_at')[:RECENT_HISTORY_LIMIT],
+        to_attr='recent_karma_history',
+    ))
+
 
 class KarmaHistorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -13,8 +29,8 @@ class KarmaHistorySerializer(serializers.ModelSerializer):
 
 class UserKarmaSerializer(serializers.ModelSerializer):
     recent_history = serializers.SerializerMethodField()
-    posts_created = serializers.SerializerMethodField()
-    comments_created = serializers.SerializerMethodField()
+    posts_created = serializers.IntegerField(source='posts_count', read_only=True)
+    comments_created = serializers.IntegerField(source='comments_count', read_only=True)
 
     class Meta:
         model = User
@@ -22,17 +38,25 @@ class UserKarmaSerializer(serializers.ModelSerializer):
                   'posts_created', 'comments_created', 'recent_history']
 
     def get_recent_history(self, obj):
-        history = obj.get_karma_history(10)
+        # Після with_recent_history — готовий список, інакше окремий запит
+        history = getattr(obj, 'recent_karma_history', None)
+        if history is None:
+            history = obj.get_karma_history(RECENT_HISTORY_LIMIT)
         return KarmaHistorySerializer(history, many=True).data
 
-    def get_posts_created(self, obj):
-        try:
-            return obj.posts.count()
-        except:
-            return 0
-
-    def get_comments_created(self, obj):
-        try:
-            return obj.comments.count()
-        except:
-            return 0
+
+class LeaderboardUserSerializer(serializers.ModelSerializer):
+    """
+    Картка лідерборду: без історії, лічильники — денормалізовані поля User
+    """
+    avatar = serializers.SerializerMethodField()
+    posts_created = serializers.IntegerField(source='posts_count', read_only=True)
+    comments_created = serializers.IntegerField(source='comments_count', read_only=True)
+
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'avatar', 'karma_points', 'karma_level',
+                  'posts_created', 'comments_created']
+
+    def get_avatar(self, obj):
+        return obj.avatar.url if obj.avatar else None
@@ -0,0 +1,168 @@
+"""
+Лідерборд карми як Redis sorted set (user_id -> karma_points).
+
+Оновлюється після кожного застосування карми (update_scores), тож top-N,
+"моє місце" і "сусіди по рейтингу" — ZREVRANGE / ZREVRANK за O(log n)
+без ORDER BY по таблиці users. Картки користувачів (незмінна частина
+відповіді) кешуються окремо по одній; бали й рівень беруться з set'у.
+Якщо set'у немає (холодний старт, втрата Redis) — він перебудовується з БД.
+"""
+import logging
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+LEADERBOARD_KEY = 'karma:leaderboard:zset'
+REBUILD_LOCK_KEY = 'karma:leaderboard:rebuild_lock'
+CARD_TIMEOUT = 600
+REBUILD_CHUNK = 5000
+
+
+def _redis():
+    return get_redis_connection('default')
+
+
+def _key(name):
+    # Сирий клієнт не додає KEY_PREFIX — робимо це самі
+    return cache.make_key(name)
+
+
+def card_key(user_id):
+    return f"karma:card:{user_id}"
+
+
+# ── Запис ─────────────────────────────────────────────────────
+
+def update_scores(user_ids):
+    """Переносить актуальні karma_points користувачів у sorted set"""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    scores = dict(User.objects.filter(pk__in=user_ids, is_active=True)
+                  .values_list('pk', 'karma_points'))
+    try:
+        client = _redis()
+        if not client.exists(_key(LEADERBOARD_KEY)):
+            return  # Побудується повністю при першому читанні
+        if scores:
+            client.zadd(_key(LEADERBOARD_KEY), scores)
+    except RedisError as e:
+        logger.warning(f"Leaderboard update failed: {e}")
+
+
+def remove_user(user_id):
+    try:
+        _redis().zrem(_key(LEADERBOARD_KEY), user_id)
+    except RedisError:
+        pass
+    cache.delete(card_key(user_id))
+
+
+def rebuild():
+    """Повна перебудова з БД: заповнюємо тимчасовий ключ і RENAME"""
+    client = _redis()
+    tmp_key = _key(f"{LEADERBOARD_KEY}:tmp")
+    client.delete(tmp_key)
+
+    rows = User.objects.filter(is_active=True) \
+        .values_list('pk', 'karma_points').order_by()
+    chunk = {}
+    for pk, points in rows.iterator(chunk_size=REBUILD_CHUNK):
+        chunk[pk] = points
+        if len(chunk) >= REBUILD_CHUNK:
+            client.zadd(tmp_key, chunk)
+            chunk = {}
+    if chunk:
+        client.zadd(tmp_key, chunk)
+
+    if client.exists(tmp_key):
+        client.rename(tmp_key, _key(LEADERBOARD_KEY))
+    return client.zcard(_key(LEADERBOARD_KEY))
+
+
+def _ensure(client):
+    if client.exists(_key(LEADERBOARD_KEY)):
+        return True
+    # Одна перебудова на всіх — решта поки читає з БД
+    if not cache.add(REBUILD_LOCK_KEY, 1, timeout=60):
+        return False
+    try:
+        rebuild()
+    finally:
+        cache.delete(REBUILD_LOCK_KEY)
+    return True
+
+
+# ── Читання ───────────────────────────────────────────────────
+
+def top(limit, offset=0):
+    """[(rank, user_id, points)] або None, якщо set недоступний"""
+    try:
+        client = _redis()
+        if not _ensure(client):
+            return None
+        rows = client.zrevrange(_key(LEADERBOARD_KEY), offset,
+                                offset + limit - 1, withscores=True)
+    except RedisError as e:
+        logger.warning(f"Leaderboard unavailable: {e}")
+        return None
+    return [(offset + i + 1, int(member), int(score))
+            for i, (member, score) in enumerate(rows)]
+
+
+def rank(user_id):
+    """(місце, бали, всього) або None; відсутнього користувача додає"""
+    try:
+        client = _redis()
+        if not _ensure(client):
+            return None
+        key = _key(LEADERBOARD_KEY)
+        position = client.zrevrank(key, user_id)
+        if position is None:
+            update_scores([user_id])
+            position = client.zrevrank(key, user_id)
+            if position is None:
+                return None
+        pipe = client.pipeline(transaction=False)
+        pipe.zscore(key, user_id)
+        pipe.zcard(key)
+        score, total = pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Leaderboard unavailable: {e}")
+        return None
+    return position + 1, int(score or 0), total
+
+
+def around(user_id, radius):
+    """Користувачі навколо user_id: radius вище і radius нижче"""
+    position = rank(user_id)
+    if position is None:
+        return None
+    offset = max(position[0] - 1 - radius, 0)
+    return top(position[0] - offset + radius, offset)
+
+
+# ── Картки ────────────────────────────────────────────────────
+
+def cards(user_ids, build):
+    """
+    Серіалізовані картки користувачів: get_many з кешу, відсутні —
+    build(user_ids) -> {user_id: data} одним запитом, потім set_many.
+    """
+    keys = {card_key(pk): pk for pk in user_ids}
+    cached = cache.get_many(list(keys))
+    result = {keys[key]: data for key, data in cached.items()}
+
+    missing = [pk for pk in user_ids if pk not in result]
+    if missing:
+        built = build(missing)
+        cache.set_many({card_key(pk): data for pk, data in built.items()},
+                       timeout=CARD_TIMEOUT)
+        result.update(built)
+    return result
@@ -0,0 +1,110 @@
+"""
+Черга нарахувань карми.
+
+Запит лише додає рядок KarmaEvent (enqueue). Команда process_karma_events
+забирає події пакетами і застосовує їх по черзі над заблокованими рядками
+користувачів: один bulk_update, bulk_create історії, одне скидання кешів
+і оновлення лідерборду на пакет.
+Якщо воркер не запущено, запит після коміту сам застосовує свої події
+(KARMA_INLINE_APPLY) — лише їх: чужі лишаються у воркера або в їхніх запитів.
+"""
+import logging
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from redis.exceptions import RedisError
+
+from apps.karma.models import KarmaEvent, KarmaHistory
+from apps.karma.services import leaderboard
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+
+def enqueue(user_id, points, reason):
+    """Поставити нарахування в чергу (один INSERT у запиті)"""
+    event = KarmaEvent.objects.create(
+        user_id=user_id, points=points, reason=reason[:255])
+    if settings.KARMA_INLINE_APPLY:
+        pending = _pending_events()
+        pending.append(event.pk)
+        transaction.on_commit(partial(_apply_inline, pending))
+
+
+def _pending_events():
+    """Id подій, доданих у поточній транзакції цього з'єднання"""
+    connection = transaction.get_connection()
+    if not hasattr(connection, 'karma_pending_events'):
+        connection.karma_pending_events = []
+    return connection.karma_pending_events
+
+
+def _apply_inline(pending):
+    """
+    Запасний шлях без воркера: лише події цієї транзакції. Перший колбек
+    забирає весь список, решта бачать його порожнім
+    """
+    event_ids = pending[:]
+    pending.clear()
+    if not event_ids:
+        return
+    try:
+        apply_events(event_ids=event_ids)
+    except (RedisError, DatabaseError) as e:
+        logger.warning(f"Inline karma apply failed: {e}")
+
+
+def apply_events(batch_size=500, event_ids=None):
+    """
+    Застосовує до batch_size подій (лише event_ids, якщо задано).
+    Повертає кількість оброблених
+    """
+    queryset = KarmaEvent.objects.all()
+    if event_ids is not None:
+        queryset = queryset.filter(pk__in=event_ids)
+    with transaction.atomic():
+        # skip_locked — кілька воркерів не беруть ті самі події
+        events = list(
+            queryset.select_for_update(skip_locked=True)
+            .order_by('id')[:batch_size]
+        )
+        if not events:
+            return 0
+
+        # Рядки користувачів блокуються (в порядку pk — без взаємоблокувань),
+        # тож події можна застосувати по одній: кламп до 0 діє на кожну
+        # подію окремо, як при синхронному нарахуванні, а в історію
+        # пишеться фактично застосована зміна
+        users = {
+            user.pk: user for user in
+            User.objects.select_for_update()
+            .filter(pk__in={e.user_id for e in events})
+            .order_by('pk').only('pk', 'username', 'karma_points')
+        }
+        history, changed = [], {}
+        for event in events:
+            user = users.get(event.user_id)
+            if user is None:
+                continue
+            new_points = max(user.karma_points + event.points, 0)
+            history.append(KarmaHistory(
+                user_id=user.pk, points=new_points - user.karma_points,
+                reason=event.reason))
+            if new_points != user.karma_points:
+                user.karma_points = new_points
+                user.karma_level = 1 + new_points // User.KARMA_PER_LEVEL
+                changed[user.pk] = user
+        User.objects.bulk_update(changed.values(), ['karma_points', 'karma_level'])
+
+        KarmaHistory.objects.bulk_create(history)
+        KarmaEvent.objects.filter(pk__in=[e.pk for e in events]).delete()
+
+        usernames = [user.username for user in users.values()]
+
+    cache.delete_many([f"karma:user:{username}" for username in usernames])
+    leaderboard.update_scores(list(users))
+    return len(events)
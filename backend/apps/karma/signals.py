@@ -5,6 +5,11 @@ from apps.main.models import Post
 from apps.comments.models import Comment
 from apps.likes.models import Like
 from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+
+from django.core.cache import cache
+
+from .services import ledger, leaderboard
 
 
 KARMA_RULES = {
@@ -29,20 +34,48 @@ def on_user_pre_delete(sender, instance, **kwargs):
 def on_user_post_delete(sender, instance, **kwargs):
     """Прибираємо маркер після видалення"""
     _deleting_users.discard(instance.pk)
+    leaderboard.remove_user(instance.pk)
+
+
+@receiver(post_save, sender=get_user_model())
+def on_user_saved(sender, instance, created=False, update_fields=None, **kwargs):
+    """Картка в лідерборді містить профіль (username, аватар...)"""
+    cache.delete(leaderboard.card_key(instance.pk))
+    if created or (update_fields is not None and 'is_active' not in update_fields):
+        return
+    # Деактивований користувач зникає з рейтингу одразу, а не після rebuild
+    if instance.is_active:
+        leaderboard.update_scores([instance.pk])
+    else:
+        leaderboard.remove_user(instance.pk)
 
 
-def _safe_add_karma(user, points, reason):
-    """Додає карму тільки якщо юзер не видаляється"""
-    if user.pk in _deleting_users:
+def _safe_add_karma(user_id, points, reason):
+    """Ставить нарахування в чергу, якщо юзер не видаляється"""
+    if user_id is None or user_id in _deleting_users:
         return
-    user.add_karma(points, reason)
+    ledger.enqueue(user_id, points, reason)
+
+
+def _like_target(like):
+    """(author_id, підпис) лайкнутого об'єкта — один легкий запит"""
+    model = ContentType.objects.get_for_id(like.content_type_id).model_class()
+    if model is Post:
+        row = Post.objects.filter(pk=like.object_id) \
+            .values_list('author_id', 'title').first()
+    elif model is Comment:
+        row = Comment.objects.filter(pk=like.object_id) \
+            .values_list('author_id', 'post__title').first()
+    else:
+        row = None
+    return row or (None, '')
 
 
 @receiver(post_save, sender=Post)
 def on_post_created(sender, instance, created, **kwargs):
     if created:
         _safe_add_karma(
-            instance.author,
+            instance.author_id,
             KARMA_RULES['post_created'],
             f'Створено пост "{instance.title}"'
         )
@@ -51,7 +84,7 @@ def on_post_created(sender, instance, created, **kwargs):
 @receiver(post_delete, sender=Post)
 def on_post_deleted(sender, instance, **kwargs):
     _safe_add_karma(
-        instance.author,
+        instance.author_id,
         KARMA_RULES['post_deleted'],
         f'Видалено пост "{instance.title}"'
     )
@@ -61,7 +94,7 @@ def on_post_deleted(sender, instance, **kwargs):
 def on_comment_created(sender, instance, created, **kwargs):
     if created:
         _safe_add_karma(
-            instance.author,
+            instance.author_id,
             KARMA_RULES['comment_created'],
             f'Коментар до поста "{instance.post.title}"'
         )
@@ -70,7 +103,7 @@ def on_comment_created(sender, instance, created, **kwargs):
 @receiver(post_delete, sender=Comment)
 def on_comment_deleted(sender, instance, **kwargs):
     _safe_add_karma(
-        instance.author,
+        instance.author_id,
         KARMA_RULES['comment_deleted'],
         'Видалено коментар'
     )
@@ -78,19 +111,20 @@ def on_comment_deleted(sender, instance, **kwargs):
 
 @receiver(post_save, sender=Like)
 def on_like_created(sender, instance, created, **kwargs):
-    if created and hasattr(instance.content_object, 'author'):
+    if created:
+        author_id, label = _like_target(instance)
         _safe_add_karma(
-            instance.content_object.author,
+            author_id,
             KARMA_RULES['like_received'],
-            f'Лайк на "{instance.content_object}"'
+            f'Лайк на "{label}"'
         )
 
 
 @receiver(post_delete, sender=Like)
 def on_like_deleted(sender, instance, **kwargs):
-    if hasattr(instance.content_object, 'author'):
-        _safe_add_karma(
-            instance.content_object.author,
-            KARMA_RULES['like_removed'],
-            'Видалено лайк'
-        )
+    author_id, _ = _like_target(instance)
+    _safe_add_karma(
+        author_id,
+        KARMA_RULES['like_removed'],
+        'Видалено лайк'
+    )
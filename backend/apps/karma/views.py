@@ -1,17 +1,25 @@
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from rest_framework.pagination import PageNumberPagination
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
+from apps.core.pagination import KeysetPaginationMixin
+from apps.core.params import parse_int
 from .models import KarmaHistory
-from .serializers import KarmaHistorySerializer, UserKarmaSerializer
+from .serializers import (
+    KarmaHistorySerializer,
+    UserKarmaSerializer,
+    LeaderboardUserSerializer,
+    with_recent_history,
+)
+from .services import leaderboard
 
 User = get_user_model()
 
 
-class KarmaHistoryPagination(PageNumberPagination):
+class KarmaHistoryPagination(KeysetPaginationMixin, PageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 50
@@ -23,7 +31,9 @@ class KarmaViewSet(viewsets.GenericViewSet):
     @action(detail=False, methods=['get'])
     def my_karma(self, request):
         """Моя карма — не кешуємо, бо персональна"""
-        serializer = UserKarmaSerializer(request.user)
+        user = with_recent_history(
+            User.objects.filter(pk=request.user.pk)).get()
+        serializer = UserKarmaSerializer(user)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'], url_path='my_history')
@@ -46,9 +56,10 @@ class KarmaViewSet(viewsets.GenericViewSet):
         if cached:
             return Response(cached)
 
-        try:
-            user = User.objects.get(username=username)
-        except User.DoesNotExist:
+        # Історія одним Prefetch, лічильники — поля User
+        user = with_recent_history(
+            User.objects.filter(username=username)).first()
+        if user is None:
             return Response({'error': 'User not found'}, status=404)
 
         serializer = UserKarmaSerializer(user)
@@ -74,14 +85,63 @@ class KarmaViewSet(viewsets.GenericViewSet):
 
     @action(detail=False, methods=['get'])
     def leaderboard(self, request):
-        """Топ користувачів за кармою — кешуємо на 2 хвилини"""
-        limit = int(request.query_params.get('page_size', 50))
-        cache_key = f"karma:leaderboard:{limit}"
-        cached = cache.get(cache_key)
-        if cached:
-            return Response(cached)
-
-        top_users = User.objects.order_by('-karma_points')[:limit]
-        serializer = UserKarmaSerializer(top_users, many=True)
-        cache.set(cache_key, serializer.data, timeout=120)
-        return Response(serializer.data)
+        """Топ користувачів за кармою — з sorted set у Redis"""
+        limit = min(max(parse_int(request.query_params.get('page_size'), 50, 'page_size'), 1), 100)
+        offset = parse_int(request.query_params.get('offset'), 0, 'offset')
+
+        entries = leaderboard.top(limit, offset)
+        if entries is None:
+            # Redis недоступний — рахуємо з БД (ті самі користувачі, що в rebuild)
+            users = list(User.objects.filter(is_active=True)
+                         .order_by('-karma_points', 'pk')
+                         .only('pk', 'karma_points')[offset:offset + limit])
+            entries = [(offset + i + 1, user.pk, user.karma_points)
+                       for i, user in enumerate(users)]
+        return Response(self._leaderboard_rows(entries))
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def my_rank(self, request):
+        """Моє місце в рейтингу — ZREVRANK, O(log n)"""
+        position = leaderboard.rank(request.user.pk)
+        if position is None:
+            points = request.user.karma_points
+            return Response({
+                'rank': User.objects.filter(
+                    is_active=True, karma_points__gt=points).count() + 1,
+                'karma_points': points,
+                'total': User.objects.filter(is_active=True).count(),
+            })
+        rank, points, total = position
+        return Response({'rank': rank, 'karma_points': points, 'total': total})
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def around_me(self, request):
+        """Користувачі навколо мене в рейтингу (?radius=5)"""
+        radius = min(max(parse_int(request.query_params.get('radius'), 5, 'radius'), 1), 25)
+        entries = leaderboard.around(request.user.pk, radius)
+        if entries is None:
+            return Response({'error': 'Рейтинг тимчасово недоступний'}, status=503)
+        return Response(self._leaderboard_rows(entries))
+
+    def _leaderboard_rows(self, entries):
+        """Картки з кешу + місце, бали й рівень з рейтингу"""
+        user_cards = leaderboard.cards(
+            [user_id for _, user_id, _ in entries], self._build_cards)
+        rows = []
+        for rank, user_id, points in entries:
+            card = user_cards.get(user_id)
+            if card is None:
+                continue  # Користувача вже видалено
+            rows.append({
+                **card,
+                'rank': rank,
+                'karma_points': points,
+                'karma_level': 1 + points // User.KARMA_PER_LEVEL,
+            })
+        return rows
+
+    @staticmethod
+    def _build_cards(user_ids):
+        """Відсутні в кеші картки — один SELECT"""
+        users = User.objects.filter(pk__in=user_ids)
+        return {user.pk: LeaderboardUserSerializer(user).data for user in users}
@@ -0,0 +1,33 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.likes.services import like_store
+
+
+class Command(BaseCommand):
+    help = 'Звіряє лічильники та множини лайків у Redis з таблицею likes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--warm-days', type=int, default=0,
+            help="Після втрати кешу: засіяти лічильники об'єктів, "
+                 "лайкнутих за останні N днів")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        checked, fixed = like_store.reconcile_counts(batch_size=batch_size)
+        self.stdout.write(f'Лічильники: перевірено {checked}, виправлено {fixed}')
+
+        checked, fixed = like_store.reconcile_user_sets(batch_size=batch_size)
+        self.stdout.write(f'Множини користувачів: перевірено {checked}, скинуто {fixed}')
+
+        if options['warm_days']:
+            since = timezone.now() - timedelta(days=options['warm_days'])
+            warmed = like_store.warm_counts(since, batch_size=batch_size)
+            self.stdout.write(f'Засіяно лічильників: {warmed}')
+
+        self.stdout.write(self.style.SUCCESS('Звірку лайків завершено'))
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
 from .models import Like
+from .utils import liked_context_key
 
 
 class LikeSerializer(serializers.ModelSerializer):
@@ -17,3 +18,20 @@ class LikeSerializer(serializers.ModelSerializer):
             'username': obj.user.username,
             'avatar': obj.user.avatar.url if obj.user.avatar else None
         }
+
+
+class IsLikedMixin:
+    """
+    get_is_liked, який спершу дивиться у пакетно підготовлений набір id
+    (див. apps.likes.utils.liked_ids_context), а без нього — робить EXISTS.
+    """
+
+    def get_is_liked(self, obj):
+        request = self.context.get('request')
+        if not (request and request.user.is_authenticated):
+            return False
+
+        liked_ids = self.context.get(liked_context_key(type(obj)))
+        if liked_ids is not None:
+            return obj.pk in liked_ids
+        return obj.is_liked_by(request.user)
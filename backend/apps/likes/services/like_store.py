@@ -0,0 +1,313 @@
+"""
+Лічильники лайків і множини лайкнутого в Redis.
+
+Джерело істини — рядки Like у БД. Redis тримає:
+  likes:count:<ct>:<id>  — кількість лайків об'єкта (O(1) читання);
+  likes:user:<uid>:<ct>  — id об'єктів, лайкнутих користувачем
+                           (з маркером USER_SET_SENTINEL = "завантажено повністю").
+Сигнали Like змінюють ключі лише якщо вони вже є (атомарно, Lua), відсутні
+ключі засіваються з БД при першому читанні. Розбіжності (втрата кешу, гонка
+під час засівання) виправляє команда reconcile_likes.
+"""
+import logging
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+from apps.likes.models import Like
+
+logger = logging.getLogger(__name__)
+
+KEY_TIMEOUT = 7 * 24 * 3600
+# Член-маркер повністю завантаженої множини (id об'єктів починаються з 1)
+USER_SET_SENTINEL = 0
+# Більше лайків — множину користувача не прогріваємо, питаємо БД
+USER_SET_MAX_SIZE = 5000
+
+# Змінює значення/множину, лише якщо ключ існує — інакше засіє читання
+_INCR_IF_EXISTS = """
+if redis.call('exists', KEYS[1]) == 1 then
+    local value = redis.call('incrby', KEYS[1], ARGV[1])
+    if value < 0 then
+        redis.call('set', KEYS[1], 0)
+        value = 0
+    end
+    redis.call('expire', KEYS[1], ARGV[2])
+    return value
+end
+return nil
+"""
+
+_SET_IF_EXISTS = """
+if redis.call('exists', KEYS[1]) == 1 then
+    redis.call(ARGV[1], KEYS[1], ARGV[2])
+    redis.call('expire', KEYS[1], ARGV[3])
+    return 1
+end
+return 0
+"""
+
+
+def _redis():
+    return get_redis_connection('default')
+
+
+def count_key(content_type_id, object_id):
+    # Сирий клієнт не додає KEY_PREFIX — робимо це самі
+    return cache.make_key(f"likes:count:{content_type_id}:{object_id}")
+
+
+def user_key(user_id, content_type_id):
+    return cache.make_key(f"likes:user:{user_id}:{content_type_id}")
+
+
+def _db_count(content_type_id, object_id):
+    return Like.objects.filter(
+        content_type_id=content_type_id, object_id=object_id).count()
+
+
+# ── Запис (викликається з сигналів Like) ─────────────────────
+
+def on_like_changed(like, delta):
+    """Оновлює лічильник і множину користувача після створення/видалення Like"""
+    try:
+        client = _redis()
+        client.eval(_INCR_IF_EXISTS, 1,
+                    count_key(like.content_type_id, like.object_id),
+                    delta, KEY_TIMEOUT)
+        client.eval(_SET_IF_EXISTS, 1,
+                    user_key(like.user_id, like.content_type_id),
+                    'sadd' if delta > 0 else 'srem', like.object_id,
+                    KEY_TIMEOUT)
+    except RedisError as e:
+        # Застарілий ключ гірший за відсутній — пробуємо прибрати
+        logger.warning(f"Like store update failed: {e}")
+        forget(like.content_type_id, like.object_id, like.user_id)
+
+
+def forget(content_type_id, object_id, user_id=None):
+    try:
+        keys = [count_key(content_type_id, object_id)]
+        if user_id is not None:
+            keys.append(user_key(user_id, content_type_id))
+        _redis().delete(*keys)
+    except RedisError:
+        pass
+
+
+# ── Читання ───────────────────────────────────────────────────
+
+def get_count(content_type_id, object_id):
+    """Кількість лайків: GET з Redis, при промаху — COUNT з БД і засівання"""
+    key = count_key(content_type_id, object_id)
+    try:
+        client = _redis()
+        value = client.get(key)
+        if value is not None:
+            return int(value)
+        count = _db_count(content_type_id, object_id)
+        client.set(key, count, ex=KEY_TIMEOUT, nx=True)
+        return count
+    except RedisError as e:
+        logger.warning(f"Like store unavailable, counting in DB: {e}")
+        return _db_count(content_type_id, object_id)
+
+
+def get_counts(content_type_id, object_ids, targets=None):
+    """
+    Кількості лайків для багатьох об'єктів: MGET з Redis, промахи — одним
+    GROUP BY запитом з засіванням. {object_id: count}
+
+    targets — queryset допустимих об'єктів (напр. лише опубліковані пости):
+    тоді промахи рахуються через нього, а id, яких у ньому немає, не
+    потрапляють у результат і не засівають ключів у Redis.
+    """
+    object_ids = list(object_ids)
+    if not object_ids:
+        return {}
+    keys = [count_key(content_type_id, pk) for pk in object_ids]
+    try:
+        client = _redis()
+        values = client.mget(keys)
+    except RedisError as e:
+        logger.warning(f"Like store unavailable, counting in DB: {e}")
+        return _db_counts(content_type_id, object_ids, targets)
+
+    counts = {pk: int(value) for pk, value in zip(object_ids, values)
+              if value is not None}
+    missing = [pk for pk in object_ids if pk not in counts]
+    if missing:
+        db = _db_counts(content_type_id, missing, targets)
+        counts.update(db)
+        try:
+            pipe = client.pipeline(transaction=False)
+            for pk, count in db.items():
+                pipe.set(count_key(content_type_id, pk), count,
+                         ex=KEY_TIMEOUT, nx=True)
+            pipe.execute()
+        except RedisError:
+            pass
+    return counts
+
+
+def liked_object_ids(user_id, content_type_id, object_ids):
+    """
+    Які з object_ids лайкнув користувач — з його множини в Redis.
+    None, якщо множину не вдалося використати (тоді питати БД).
+    """
+    key = user_key(user_id, content_type_id)
+    try:
+        client = _redis()
+        if not client.exists(key) and not _warm_user_set(
+                client, key, user_id, content_type_id):
+            return None
+        pipe = client.pipeline(transaction=False)
+        for object_id in object_ids:
+            pipe.sismember(key, object_id)
+        flags = pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Like store unavailable: {e}")
+        return None
+    return {pk for pk, flag in zip(object_ids, flags) if flag}
+
+
+def _warm_user_set(client, key, user_id, content_type_id):
+    ids = list(
+        Like.objects.filter(user_id=user_id, content_type_id=content_type_id)
+        .values_list('object_id', flat=True)[:USER_SET_MAX_SIZE + 1]
+    )
+    if len(ids) > USER_SET_MAX_SIZE:
+        return False
+    pipe = client.pipeline()
+    pipe.delete(key)
+    pipe.sadd(key, USER_SET_SENTINEL, *ids)
+    pipe.expire(key, KEY_TIMEOUT)
+    pipe.execute()
+    return True
+
+
+# ── Звірка з БД (команда reconcile_likes) ────────────────────
+
+def _batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _parse_ids(key):
+    """b'justforum:1:likes:count:12:345' -> (12, 345)"""
+    first, second = key.decode().rsplit(':', 2)[1:]
+    return int(first), int(second)
+
+
+def _db_counts(content_type_id, object_ids, targets=None):
+    if targets is not None:
+        # Один GROUP BY по самих об'єктах: відсутні id просто не повертаються
+        rows = targets.filter(pk__in=object_ids) \
+            .annotate(total=Count('likes')).values_list('pk', 'total')
+        return dict(rows)
+    rows = Like.objects.filter(
+        content_type_id=content_type_id, object_id__in=object_ids,
+    ).values('object_id').annotate(total=Count('id')) \
+     .values_list('object_id', 'total')
+    counts = dict(rows)
+    return {pk: counts.get(pk, 0) for pk in object_ids}
+
+
+def reconcile_counts(batch_size=500):
+    """Виправляє лічильники в Redis, що розійшлися з БД. Повертає (перевірено, виправлено)"""
+    client = _redis()
+    checked = fixed = 0
+    pattern = cache.make_key('likes:count:*')
+
+    for keys in _batched(client.scan_iter(match=pattern, count=batch_size),
+                         batch_size):
+        parsed = [_parse_ids(key) for key in keys]
+        by_type = defaultdict(list)
+        for content_type_id, object_id in parsed:
+            by_type[content_type_id].append(object_id)
+        db = {
+            (content_type_id, object_id): total
+            for content_type_id, ids in by_type.items()
+            for object_id, total in _db_counts(content_type_id, ids).items()
+        }
+
+        pipe = client.pipeline(transaction=False)
+        for key, ids, value in zip(keys, parsed, client.mget(keys)):
+            expected = db.get(ids, 0)
+            if value is None or int(value) != expected:
+                pipe.set(key, expected, ex=KEY_TIMEOUT)
+                fixed += 1
+        pipe.execute()
+        checked += len(keys)
+
+    return checked, fixed
+
+
+def reconcile_user_sets(batch_size=500):
+    """Перебудовує множини лайкнутого, що розійшлися з БД"""
+    client = _redis()
+    checked = fixed = 0
+    pattern = cache.make_key('likes:user:*')
+
+    for keys in _batched(client.scan_iter(match=pattern, count=batch_size),
+                         batch_size):
+        pipe = client.pipeline(transaction=False)
+        for key in keys:
+            pipe.smembers(key)
+        members = pipe.execute()
+
+        # Лайки всіх пар (user, тип) пакета — одним запитом
+        parsed = [_parse_ids(key) for key in keys]
+        users_by_type = defaultdict(set)
+        for user_id, content_type_id in parsed:
+            users_by_type[content_type_id].add(user_id)
+        pairs = Q()
+        for content_type_id, user_ids in users_by_type.items():
+            pairs |= Q(content_type_id=content_type_id, user_id__in=user_ids)
+        db = defaultdict(set)
+        for user_id, content_type_id, object_id in Like.objects.filter(pairs) \
+                .values_list('user_id', 'content_type_id', 'object_id'):
+            db[user_id, content_type_id].add(object_id)
+
+        for key, ids, cached in zip(keys, parsed, members):
+            cached = {int(member) for member in cached}
+            cached.discard(USER_SET_SENTINEL)
+            if cached != db.get(ids, set()):
+                # Прогріється заново з БД при наступному читанні
+                client.delete(key)
+                fixed += 1
+        checked += len(keys)
+
+    return checked, fixed
+
+
+def warm_counts(since, batch_size=500):
+    """Засіває лічильники об'єктів, лайкнутих після since (після втрати кешу)"""
+    client = _redis()
+    warmed = 0
+    targets = Like.objects.filter(created_at__gte=since) \
+        .values_list('content_type_id', 'object_id').distinct()
+
+    for batch in _batched(targets.iterator(chunk_size=batch_size), batch_size):
+        by_type = defaultdict(list)
+        for content_type_id, object_id in batch:
+            by_type[content_type_id].append(object_id)
+
+        pipe = client.pipeline(transaction=False)
+        for content_type_id, ids in by_type.items():
+            counts = _db_counts(content_type_id, ids)
+            for object_id in ids:
+                pipe.set(count_key(content_type_id, object_id),
+                         counts.get(object_id, 0), ex=KEY_TIMEOUT, nx=True)
+        warmed += sum(1 for created in pipe.execute() if created)
+
+    return warmed
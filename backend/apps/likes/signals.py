@@ -0,0 +1,17 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Like
+from .services import like_store
+
+
+@receiver(post_save, sender=Like)
+def like_store_on_create(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: like_store.on_like_changed(instance, 1))
+
+
+@receiver(post_delete, sender=Like)
+def like_store_on_delete(sender, instance, **kwargs):
+    transaction.on_commit(lambda: like_store.on_like_changed(instance, -1))
@@ -4,4 +4,5 @@ from . import views
 urlpatterns = [
     path('toggle/', views.toggle_like, name='toggle-like'),
     path('count/', views.get_likes_count, name='likes-count'),
+    path('batch/', views.likes_batch, name='likes-batch'),
 ]
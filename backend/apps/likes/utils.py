@@ -0,0 +1,86 @@
+from django.contrib.contenttypes.models import ContentType
+
+from .models import Like
+from .services import like_store
+
+
+def liked_context_key(model):
+    """Ключ контексту серіалізатора: liked_post_ids, liked_comment_ids..."""
+    return f"liked_{model._meta.model_name}_ids"
+
+
+def get_liked_ids(user, model, objects):
+    """
+    Множина id з переданих об'єктів, які лайкнув користувач.
+    Один запит на всю сторінку замість EXISTS на кожен рядок.
+    """
+    return get_liked_object_ids(user, model, [obj.pk for obj in objects])
+
+
+def get_liked_object_ids(user, model, object_ids):
+    """Те саме, але за готовими id (рядки з кешу)"""
+    if not user or not user.is_authenticated or not object_ids:
+        return set()
+
+    content_type = ContentType.objects.get_for_model(model)
+
+    # Спершу множина користувача в Redis, без неї — запит до БД
+    liked = like_store.liked_object_ids(user.pk, content_type.pk, object_ids)
+    if liked is not None:
+        return liked
+    return set(
+        Like.objects.filter(
+            user=user,
+            content_type=content_type,
+            object_id__in=object_ids,
+        ).values_list('object_id', flat=True)
+    )
+
+
+def liked_ids_context(request, model, objects, context=None):
+    """Контекст серіалізатора з готовим набором лайкнутих id"""
+    context = dict(context or {})
+    context['request'] = request
+    context[liked_context_key(model)] = get_liked_ids(
+        getattr(request, 'user', None), model, objects)
+    return context
+
+
+def _walk_rows(rows, children_key=None):
+    for row in rows:
+        yield row
+        if children_key:
+            yield from _walk_rows(row.get(children_key) or (), children_key)
+
+
+def overlay_is_liked(request, model, rows, children_key=None):
+    """
+    Накладає is_liked поточного користувача на спільні (кешовані) рядки —
+    один запит на всі рядки. Для анонімів просто скидає в False, тож
+    у кеші може лежати відповідь, зібрана для будь-кого.
+    children_key — ключ вкладених рядків (дерево коментарів).
+    """
+    rows = list(_walk_rows(rows, children_key))
+    liked_ids = get_liked_object_ids(
+        getattr(request, 'user', None), model, [row['id'] for row in rows])
+    for row in rows:
+        row['is_liked'] = row['id'] in liked_ids
+    return rows
+
+
+class LikedIdsMixin:
+    """
+    Для list-ендпоінтів GenericAPIView: при серіалізації сторінки (many=True)
+    підкладає в context набір лайкнутих користувачем id.
+    """
+    liked_model = None
+
+    def get_serializer(self, *args, **kwargs):
+        if kwargs.get('many') and args and self.liked_model is not None:
+            objects = list(args[0])
+            kwargs['context'] = liked_ids_context(
+                self.request, self.liked_model, objects,
+                context=kwargs.get('context') or self.get_serializer_context(),
+            )
+            args = (objects, *args[1:])
+        return super().get_serializer(*args, **kwargs)
@@ -1,14 +1,20 @@
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from django.contrib.contenttypes.models import ContentType
-from django.shortcuts import get_object_or_404
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from django.core.cache import cache
 
 from .models import Like
+from .services import like_store
 from apps.main.models import Post
 from apps.comments.models import Comment
 from apps.core.throttling import LikeToggleMinuteThrottle, LikeToggleDayThrottle
+from apps.core.cache import bump_generation
+from apps.core.params import parse_id_list
 
 
 @api_view(['POST'])
@@ -40,41 +46,58 @@ def toggle_like(request):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    # Визначаємо модель
+    # Визначаємо модель (лише потрібні колонки, без повного рядка)
     if content_type_name == 'post':
         model = Post
-        obj = get_object_or_404(Post, id=object_id, status='published')
+        target = Post.objects.filter(id=object_id, status='published') \
+            .values('id', 'slug').first()
     elif content_type_name == 'comment':
         model = Comment
-        obj = get_object_or_404(Comment, id=object_id, is_active=True)
+        target = Comment.objects.filter(id=object_id, is_active=True) \
+            .values('id', 'post_id').first()
     else:
         return Response(
             {'error': 'Невірний content_type. Використовуйте "post" або "comment"'},
             status=status.HTTP_400_BAD_REQUEST
         )
+    if target is None:
+        raise NotFound()
 
+    # ContentType кешується Django в пам'яті процесу
     content_type = ContentType.objects.get_for_model(model)
+    lookup = dict(user=request.user, content_type=content_type,
+                  object_id=target['id'])
 
-    # Перевіряємо чи існує лайк
-    like, created = Like.objects.get_or_create(
-        user=request.user,
-        content_type=content_type,
-        object_id=object_id
-    )
+    # Лайк уже був — видаляємо; інакше створюємо (рядок Like — джерело істини)
+    deleted, _ = Like.objects.filter(**lookup).delete()
+    created = not deleted
+    if created:
+        try:
+            with transaction.atomic():
+                Like.objects.create(**lookup)
+        except IntegrityError:
+            pass  # Паралельний запит уже поставив лайк
+
+    # O(1): лічильник у Redis (оновлено сигналом Like; засівається з БД)
+    likes_count = like_store.get_count(content_type.pk, target['id'])
+
+    if model is Post:
+        # Кешована сторінка поста спільна для всіх — оновлюємо likes_count
+        cache.delete(f"post:detail:{target['slug']}")
+    else:
+        bump_generation(f"comments:post:{target['post_id']}")
 
     if created:
         # Лайк додано
         return Response({
             'liked': True,
-            'likes_count': obj.likes_count,
+            'likes_count': likes_count,
             'message': 'Лайк додано'
         }, status=status.HTTP_201_CREATED)
     else:
-        # Лайк вже існував - видаляємо
-        like.delete()
         return Response({
             'liked': False,
-            'likes_count': obj.likes_count,
+            'likes_count': likes_count,
             'message': 'Лайк видалено'
         }, status=status.HTTP_200_OK)
 
@@ -121,3 +144,57 @@ def get_likes_count(request):
         'likes_count': likes_count,
         'is_liked': is_liked
     })
+
+
+# Скільки id кожного типу можна запитати за раз
+BATCH_MAX_IDS = 100
+
+
+def _parse_ids(raw, name):
+    return parse_id_list(raw, BATCH_MAX_IDS, name)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def likes_batch(request):
+    """
+    Стан лайків для багатьох об'єктів за один запит
+
+    Query params: ?posts=1,2,3&comments=10,11
+    Кількості — з лічильників у Redis (промахи — один GROUP BY на тип),
+    is_liked — один запит до likes на всі об'єкти. Неіснуючі, неопубліковані
+    пости й неактивні коментарі у відповідь не потрапляють.
+    """
+    requested = {
+        'posts': (Post.objects.filter(status='published'),
+                  _parse_ids(request.query_params.get('posts'), 'posts')),
+        'comments': (Comment.objects.filter(is_active=True),
+                     _parse_ids(request.query_params.get('comments'), 'comments')),
+    }
+    content_types = ContentType.objects.get_for_models(Post, Comment)
+
+    liked = set()
+    membership = Q()
+    for targets, ids in requested.values():
+        if ids:
+            membership |= Q(content_type=content_types[targets.model],
+                            object_id__in=ids)
+    if request.user.is_authenticated and membership:
+        liked = set(
+            Like.objects.filter(membership, user=request.user)
+            .values_list('content_type_id', 'object_id')
+        )
+
+    data = {}
+    for name, (targets, ids) in requested.items():
+        content_type_id = content_types[targets.model].pk
+        # Неіснуючі/неопубліковані id випадають тут же і не засівають Redis
+        counts = like_store.get_counts(content_type_id, ids, targets)
+        data[name] = {
+            str(pk): {
+                'likes_count': counts[pk],
+                'is_liked': (content_type_id, pk) in liked,
+            }
+            for pk in ids if pk in counts
+        }
+    return Response(data)
@@ -5,6 +5,7 @@ from django.db.models import Count
 from django.urls import reverse
 
 from .models import Category, Post, PostImages, PostVideo
+from .services.categories import categories_with_counts, rebuild_categories_cache
 
 User = get_user_model()
 
@@ -77,15 +78,20 @@ class CategoryAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+        # posts_count одним запитом замість COUNT на кожен рядок
+        return categories_with_counts()
+
     def posts_count(self, obj):
-        """Кількість постів у категорії"""
-        count = obj.posts.count()
+        """Кількість опублікованих постів у категорії"""
+        count = obj.posts_count
         if count > 0:
             url = reverse('admin:main_post_changelist') + \
                 f'?category__id__exact={obj.id}'
             return format_html('<a href="{}">{} постів</a>', url, count)
         return '0 постів'
     posts_count.short_description = 'Кількість постів'
+    posts_count.admin_order_field = 'posts_count'
 
 
 # ============================================
@@ -130,12 +136,16 @@ class PostAdmin(admin.ModelAdmin):
         'updated_at',
         'published_at',
         'views_count',
+        'likes_count',
+        'comments_count',
+        'hot_score',
         'image_preview',
         'post_link'
     )
 
     # Дії які можна виконати над вибраними постами
-    actions = ['make_published', 'make_draft', 'reset_views']
+    actions = ['make_published', 'make_draft', 'reset_views',
+               'recount_counters']
 
     # Скільки постів на сторінку
     list_per_page = 25
@@ -161,7 +171,8 @@ class PostAdmin(admin.ModelAdmin):
             'fields': ('content', 'image', 'image_preview', 'tags')
         }),
         ('Метадані', {
-            'fields': ('views_count', 'created_at', 'updated_at', 'published_at'),
+            'fields': ('views_count', 'likes_count', 'comments_count',
+                       'hot_score', 'created_at', 'updated_at', 'published_at'),
             'classes': ('collapse',)
         }),
         ('Посилання', {
@@ -201,7 +212,7 @@ class PostAdmin(admin.ModelAdmin):
 
     def images_count(self, obj):
         """Кількість додаткових зображень"""
-        count = obj.images.count()
+        count = obj.images_count
         if count > 0:
             return format_html('<b style="color: #007bff;">{}</b> 📷', count)
         return '0'
@@ -254,7 +265,12 @@ class PostAdmin(admin.ModelAdmin):
     @admin.action(description='📝 Зробити чернетками')
     def make_draft(self, request, queryset):
         """Масове перетворення в чернетки"""
+        authors = list(queryset.values_list('author_id', flat=True).distinct())
         updated = queryset.update(status='draft', published_at=None)
+        # update() сигналів не шле — posts_count категорій і лічильники
+        # опублікованих у авторів оновлюємо явно
+        rebuild_categories_cache()
+        User.recount_counters(User.objects.filter(pk__in=authors))
         self.message_user(
             request,
             f'📝 Змінено статус у {updated} постів на "Чернетка"',
@@ -265,17 +281,28 @@ class PostAdmin(admin.ModelAdmin):
     def reset_views(self, request, queryset):
         """Скидання лічильника переглядів"""
         updated = queryset.update(views_count=0)
+        Post.recompute_hot_scores(queryset)
         self.message_user(
             request,
             f'🔄 Скинуто перегляди у {updated} постів',
             level='warning'
         )
 
+    @admin.action(description='🔢 Перерахувати лічильники')
+    def recount_counters(self, request, queryset):
+        """Перерахунок лайків, коментарів та зображень"""
+        updated = Post.recount_counters(queryset)
+        self.message_user(
+            request,
+            f'🔢 Перераховано лічильники у {updated} постів',
+            level='success'
+        )
+
     def get_queryset(self, request):
         """Оптимізація запитів"""
         qs = super().get_queryset(request)
         return qs.select_related('author', 'category') \
-                 .prefetch_related('tags', 'images', 'videos')
+                 .prefetch_related('tags', 'videos')
 
     def delete_queryset(self, request, queryset):
         for post in queryset:
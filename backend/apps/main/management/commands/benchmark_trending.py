@@ -0,0 +1,142 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, ExpressionWrapper, F, FloatField
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from apps.main.models import Post
+from apps.comments.models import Comment
+from apps.likes.models import Like
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Порівнює вартість ранжування трендів: старий annotate(Count) '
+        'проти збереженого trending_score. Дані синтетичні, створюються '
+        'в транзакції і відкочуються після заміру.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10000,100000,1000000',
+                            help='Кількості постів через кому')
+        parser.add_argument('--limit', type=int, default=30)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--days', type=int, default=180)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        sizes = [int(s) for s in options['sizes'].split(',') if s.strip()]
+        self.limit = options['limit']
+        self.repeat = options['repeat']
+        self.days = options['days']
+        random.seed(options['seed'])
+
+        self.stdout.write(
+            f"{'posts':>9} | {'seed, s':>8} | {'annotate, ms':>12} | "
+            f"{'UPDATE recompute, s':>19} | {'indexed read, ms':>16}"
+        )
+        for size in sizes:
+            with transaction.atomic():
+                row = self._run(size)
+                transaction.set_rollback(True)
+            self.stdout.write(
+                f"{size:>9} | {row['seed']:>8.1f} | {row['annotate']:>12.1f} | "
+                f"{row['recompute']:>19.2f} | {row['read']:>16.2f}"
+            )
+
+    def _run(self, size):
+        started = time.perf_counter()
+        self._seed(size)
+        seeded = time.perf_counter() - started
+
+        date_from = timezone.now() - timedelta(days=self.days)
+        base = Post.objects.filter(status='published',
+                                   published_at__gte=date_from)
+
+        def legacy():
+            # Так trending_posts ранжував до матеріалізації рейтингу
+            return list(base.annotate(
+                likes_count_ann=Count('likes', distinct=True),
+                comments_count_ann=Count('comments', distinct=True),
+                hot=ExpressionWrapper(
+                    Cast(F('views_count'), FloatField()) * 0.45
+                    + Cast(F('likes_count_ann'), FloatField()) * 2.8
+                    + Cast(F('comments_count_ann'), FloatField()) * 4.2,
+                    output_field=FloatField()
+                )
+            ).order_by('-hot').values_list('pk', flat=True)[:self.limit])
+
+        def indexed():
+            return list(base.order_by('-trending_score')
+                            .values_list('pk', flat=True)[:self.limit])
+
+        started = time.perf_counter()
+        Post.recompute_trending_scores(Post.objects.filter(status='published'))
+        recompute = time.perf_counter() - started
+
+        return {
+            'seed': seeded,
+            'annotate': self._median_ms(legacy),
+            'recompute': recompute,
+            'read': self._median_ms(indexed),
+        }
+
+    def _median_ms(self, fn):
+        timings = []
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
+
+    def _seed(self, size, chunk=5000):
+        users = User.objects.bulk_create([
+            User(username=f'bench_{size}_{i}', email=f'bench_{size}_{i}@bench.local')
+            for i in range(20)
+        ])
+        post_ct = ContentType.objects.get_for_model(Post)
+        now = timezone.now()
+        weights = Post.HOT_SCORE_WEIGHTS
+
+        for start in range(0, size, chunk):
+            posts = []
+            for i in range(start, min(start + chunk, size)):
+                views = random.randint(0, 5000)
+                likes = random.randint(0, 5)
+                comments = random.randint(0, 3)
+                hot = (views * weights['views_count']
+                       + likes * weights['likes_count']
+                       + comments * weights['comments_count'])
+                posts.append(Post(
+                    title=f'Bench post {i}',
+                    slug=f'bench-{size}-{i}',
+                    author=random.choice(users),
+                    status='published',
+                    published_at=now - timedelta(
+                        seconds=random.randint(0, self.days * 86400)),
+                    views_count=views,
+                    likes_count=likes,
+                    comments_count=comments,
+                    hot_score=hot,
+                ))
+            posts = Post.objects.bulk_create(posts)
+
+            like_rows, comment_rows = [], []
+            for post in posts:
+                for user in random.sample(users, post.likes_count):
+                    like_rows.append(Like(
+                        user=user, content_type=post_ct, object_id=post.pk))
+                for _ in range(post.comments_count):
+                    comment_rows.append(Comment(
+                        post=post, author=random.choice(users), content='bench'))
+            Like.objects.bulk_create(like_rows)
+            Comment.objects.bulk_create(comment_rows)
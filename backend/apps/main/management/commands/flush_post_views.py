@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.main.services.view_counter import flush_views
+
+
+class Command(BaseCommand):
+    help = 'Переносить буферизовані в Redis перегляди постів у posts.views_count'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Працювати безперервно, скидаючи буфер кожні N секунд')
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+
+        while True:
+            flushed = flush_views(batch_size=options['batch_size'])
+            self.stdout.write(f'Скинуто переглядів: {flushed}')
+            if not interval:
+                break
+            time.sleep(interval)
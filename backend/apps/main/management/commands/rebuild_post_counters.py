@@ -0,0 +1,65 @@
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+
+from apps.main.models import Post, PostImages
+from apps.comments.models import Comment
+from apps.likes.models import Like
+
+
+class Command(BaseCommand):
+    help = 'Перераховує лічильники лайків, коментарів та зображень постів і виправляє розбіжності'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Лише показати кількість розбіжностей, без запису')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
+        post_ct = ContentType.objects.get_for_model(Post)
+        actual = {
+            f'actual_{field}': expr
+            for field, expr in Post._counter_subqueries(
+                Like.objects.filter(content_type=post_ct),
+                Comment.objects.filter(is_active=True),
+                PostImages.objects.all(),
+            ).items()
+        }
+
+        checked = drifted = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                Post.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .only('pk', *Post.COUNTER_FIELDS)
+                .annotate(**actual)[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            checked += len(batch)
+
+            to_update = []
+            for post in batch:
+                changed = False
+                for field in Post.COUNTER_FIELDS:
+                    value = getattr(post, f'actual_{field}')
+                    if getattr(post, field) != value:
+                        setattr(post, field, value)
+                        changed = True
+                if changed:
+                    to_update.append(post)
+
+            drifted += len(to_update)
+            if to_update and not dry_run:
+                Post.objects.bulk_update(to_update, Post.COUNTER_FIELDS)
+                Post.recompute_hot_scores(
+                    Post.objects.filter(pk__in=[p.pk for p in to_update]))
+
+        action = 'Знайдено' if dry_run else 'Виправлено'
+        self.stdout.write(self.style.SUCCESS(
+            f'Перевірено {checked} постів. {action} розбіжностей: {drifted}'))
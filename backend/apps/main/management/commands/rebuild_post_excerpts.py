@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from apps.main.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Перераховує збережений excerpt постів пакетами'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        total = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                Post.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .only('pk', 'content')[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            for post in batch:
+                post.excerpt = Post.make_excerpt(post.content)
+            total += Post.objects.bulk_update(batch, ['excerpt'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Excerpt перераховано для {total} постів'))
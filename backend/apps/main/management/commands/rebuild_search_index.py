@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from apps.main.models import Post
+from apps.main.services.search import index_post
+
+
+class Command(BaseCommand):
+    help = 'Перебудовує повнотекстовий індекс постів (tsvector / FTS5)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        total = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                Post.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .only('pk', 'title', 'content')
+                .prefetch_related('tags')[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            for post in batch:
+                index_post(post, [tag.name for tag in post.tags.all()])
+            total += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Пошуковий індекс перебудовано для {total} постів'))
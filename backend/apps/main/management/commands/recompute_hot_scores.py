@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from apps.main.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Перераховує hot_score та trending_score постів пакетами (для періодичного запуску)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        total = 0
+        last_pk = 0
+        while True:
+            pks = list(
+                Post.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            last_pk = pks[-1]
+            total += Post.recompute_hot_scores(
+                Post.objects.filter(pk__gte=pks[0], pk__lte=last_pk))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'hot_score та trending_score перераховано для {total} постів'))
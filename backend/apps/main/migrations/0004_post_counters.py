@@ -0,0 +1,61 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:58
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    Post = apps.get_model('main', 'Post')
+    PostImages = apps.get_model('main', 'PostImages')
+    Comment = apps.get_model('comments', 'Comment')
+    Like = apps.get_model('likes', 'Like')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+
+    def _count(qs, fk):
+        return Coalesce(Subquery(
+            qs.filter(**{fk: OuterRef('pk')})
+              .order_by()
+              .values(fk)
+              .annotate(c=Count('pk'))
+              .values('c')[:1],
+            output_field=models.IntegerField(),
+        ), 0)
+
+    post_ct = ContentType.objects.filter(app_label='main', model='post').first()
+    likes = Like.objects.filter(content_type=post_ct) if post_ct else Like.objects.none()
+
+    Post.objects.update(
+        likes_count=_count(likes, 'object_id'),
+        comments_count=_count(Comment.objects.filter(is_active=True), 'post'),
+        images_count=_count(PostImages.objects.all(), 'post'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0003_alter_post_content'),
+        ('comments', '0001_initial'),
+        ('likes', '0001_initial'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='images_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
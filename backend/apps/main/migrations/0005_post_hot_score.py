@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:00
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+
+
+def fill_hot_score(apps, schema_editor):
+    Post = apps.get_model('main', 'Post')
+    Post.objects.update(hot_score=(
+        Cast(F('views_count'), FloatField()) * 0.45
+        + Cast(F('likes_count'), FloatField()) * 2.8
+        + Cast(F('comments_count'), FloatField()) * 4.2
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0004_post_counters'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='hot_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['status', '-hot_score'], name='posts_status_c74349_idx'),
+        ),
+        migrations.RunPython(fill_hot_score, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:02
+
+import math
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_trending_score(apps, schema_editor):
+    Post = apps.get_model('main', 'Post')
+    half_life = settings.TRENDING_HALF_LIFE_HOURS * 3600
+
+    batch = []
+    rows = Post.objects.filter(published_at__isnull=False) \
+        .values_list('pk', 'hot_score', 'published_at')
+    for pk, hot_score, published_at in rows.iterator(chunk_size=1000):
+        batch.append(Post(
+            pk=pk,
+            trending_score=math.log2(1 + max(hot_score, 0))
+            + published_at.timestamp() / half_life,
+        ))
+        if len(batch) >= 1000:
+            Post.objects.bulk_update(batch, ['trending_score'])
+            batch = []
+    if batch:
+        Post.objects.bulk_update(batch, ['trending_score'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0005_post_hot_score'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='trending_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['status', '-trending_score'], name='posts_status_ca12bf_idx'),
+        ),
+        migrations.RunPython(fill_trending_score, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:08
+
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+from django.utils.html import strip_tags
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS posts_search_vector_gin "
+            "ON posts USING GIN (search_vector)"
+        )
+        # Заповнюємо вектор одним UPDATE (HTML-теги вирізаємо регуляркою)
+        schema_editor.execute(
+            """
+            UPDATE posts p SET search_vector =
+                setweight(to_tsvector(%(config)s::regconfig, coalesce(p.title, '')), 'A')
+                || setweight(to_tsvector(%(config)s::regconfig, coalesce((
+                    SELECT string_agg(t.name, ' ')
+                    FROM taggit_taggeditem ti
+                    JOIN taggit_tag t ON t.id = ti.tag_id
+                    JOIN django_content_type ct ON ct.id = ti.content_type_id
+                    WHERE ct.app_label = 'main' AND ct.model = 'post'
+                      AND ti.object_id = p.id
+                ), '')), 'A')
+                || setweight(to_tsvector(%(config)s::regconfig, regexp_replace(
+                    coalesce(p.content, ''), '<[^>]+>', ' ', 'g')), 'B')
+            """,
+            {'config': settings.SEARCH_CONFIG},
+        )
+
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5("
+            "title, content, tags, tokenize='unicode61 remove_diacritics 2')"
+        )
+        Post = apps.get_model('main', 'Post')
+        TaggedItem = apps.get_model('taggit', 'TaggedItem')
+        ContentType = apps.get_model('contenttypes', 'ContentType')
+
+        tags = {}
+        post_ct = ContentType.objects.filter(
+            app_label='main', model='post').first()
+        if post_ct:
+            rows = TaggedItem.objects.filter(content_type=post_ct) \
+                .values_list('object_id', 'tag__name')
+            for object_id, name in rows:
+                tags.setdefault(object_id, []).append(name)
+
+        rows = Post.objects.values_list('pk', 'title', 'content')
+        schema_editor.connection.cursor().executemany(
+            "INSERT OR REPLACE INTO posts_fts(rowid, title, content, tags) "
+            "VALUES (%s, %s, %s, %s)",
+            [(pk, title or '', strip_tags(content or ''),
+              ' '.join(tags.get(pk, []))) for pk, title, content in rows],
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS posts_search_vector_gin")
+    elif vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS posts_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0006_post_trending_score'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
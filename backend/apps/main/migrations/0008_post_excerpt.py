@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:10
+
+from django.db import migrations, models
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+
+def fill_excerpt(apps, schema_editor):
+    Post = apps.get_model('main', 'Post')
+
+    batch = []
+    rows = Post.objects.exclude(content__isnull=True).exclude(content='') \
+        .values_list('pk', 'content')
+    for pk, content in rows.iterator(chunk_size=1000):
+        batch.append(Post(
+            pk=pk,
+            excerpt=Truncator(strip_tags(content)).chars(200, truncate='...'),
+        ))
+        if len(batch) >= 1000:
+            Post.objects.bulk_update(batch, ['excerpt'])
+            batch = []
+    if batch:
+        Post.objects.bulk_update(batch, ['excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_post_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(fill_excerpt, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 import itertools
+import math
 from slugify import slugify as external_slugify
 
 from django.db import models
@@ -6,10 +7,28 @@ from django.conf import settings
 from taggit.managers import TaggableManager
 from django.utils import timezone
 from django.urls import reverse
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
 from django.contrib.contenttypes.fields import GenericRelation
+from django.db.models import Value
+from django.db.models.functions import Cast, Coalesce, Greatest, Log
+from django.contrib.postgres.search import SearchVectorField
 
 
-from django.db import models
+class EpochSeconds(models.Func):
+    """Unix-час дати в секундах (float) — як datetime.timestamp() у Python"""
+    output_field = models.FloatField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection,
+                           template='EXTRACT(EPOCH FROM %(expressions)s)',
+                           **extra_context)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # У SQLite немає EXTRACT: юліанські дні від 1970-01-01 у секундах
+        return self.as_sql(compiler, connection,
+                           template='((julianday(%(expressions)s) - 2440587.5) * 86400.0)',
+                           **extra_context)
 
 
 class Category(models.Model):
@@ -33,6 +52,12 @@ class Category(models.Model):
         super().save(*args, **kwargs)
 
 
+class PostManager(models.Manager):
+    def get_queryset(self):
+        # tsvector потрібен лише пошуку — не тягнемо його в кожен SELECT
+        return super().get_queryset().defer('search_vector')
+
+
 class Post(models.Model):
     '''Модель поста'''
 
@@ -41,9 +66,25 @@ class Post(models.Model):
         ('published', 'Published'),
     ]
 
+    COUNTER_FIELDS = ('likes_count', 'comments_count', 'images_count')
+
+    # Колонки, які змінюються лише атомарними UPDATE (F()/буфер переглядів).
+    # Повний save() існуючого поста їх не пише, щоб не затерти застарілими
+    # значеннями, завантаженими разом з рядком.
+    DENORMALIZED_FIELDS = ('views_count', *COUNTER_FIELDS,
+                           'hot_score', 'trending_score')
+
+    EXCERPT_LENGTH = 200
+
+    # Ваги для hot_score (популярні / в тренді)
+    HOT_SCORE_WEIGHTS = settings.POST_SCORE_WEIGHTS
+
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=200, unique=True, blank=True)
     content = models.TextField(blank=True, null=True)
+    # Скорочений текст для списків — рахується при збереженні (див. save)
+    excerpt = models.CharField(max_length=255, blank=True, default='',
+                               editable=False)
     image = models.ImageField(
         upload_to='posts/%Y/%m/%d/', blank=True, null=True)
     category = models.ForeignKey(
@@ -64,6 +105,21 @@ class Post(models.Model):
     published_at = models.DateTimeField(null=True, blank=True, db_index=True)
     views_count = models.PositiveIntegerField(default=0)
 
+    # Денормалізовані лічильники (оновлюються атомарно через F())
+    likes_count = models.PositiveIntegerField(default=0)
+    comments_count = models.PositiveIntegerField(default=0)
+    images_count = models.PositiveIntegerField(default=0)
+
+    # Матеріалізований рейтинг, підтримується інкрементально
+    hot_score = models.FloatField(default=0)
+    # log2(1 + hot_score) + published_at / half_life (див. trending_score_for)
+    trending_score = models.FloatField(default=0)
+
+    # Повнотекстовий індекс (PostgreSQL); на SQLite — таблиця FTS5 posts_fts
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = PostManager()
+
     class Meta:
         db_table = 'posts'
         verbose_name = 'Post'
@@ -74,6 +130,8 @@ class Post(models.Model):
             models.Index(fields=['slug']),
             models.Index(fields=['category', 'status']),
             models.Index(fields=['author', 'status']),
+            models.Index(fields=['status', '-hot_score']),
+            models.Index(fields=['status', '-trending_score']),
         ]
 
     def __str__(self):
@@ -90,8 +148,43 @@ class Post(models.Model):
         elif self.status == 'draft':
             self.published_at = None  # Скидаємо дату при зміні на чернетку
 
+        # Excerpt — тільки якщо content завантажений (не deferred)
+        if 'content' not in self.get_deferred_fields():
+            self.excerpt = self.make_excerpt(self.content)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'content' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'excerpt'}
+
+        if self._state.adding or kwargs.get('force_insert'):
+            self.trending_score = self.trending_score_for(
+                self.hot_score, self.published_at)
+            super().save(*args, **kwargs)
+            return
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.DENORMALIZED_FIELDS
+                and field.attname not in self.get_deferred_fields()
+            ]
         super().save(*args, **kwargs)
 
+        # Тренд залежить від published_at — рахуємо його в SQL від
+        # актуального hot_score, а не від значення в пам'яті
+        if update_fields is None or 'published_at' in update_fields:
+            self.__class__.objects.filter(pk=self.pk).update(
+                trending_score=self.trending_score_expression(self.published_at))
+
+    @classmethod
+    def make_excerpt(cls, content):
+        """Скорочений текст без HTML для списків"""
+        if not content:
+            return ''
+        return Truncator(strip_tags(content)).chars(
+            cls.EXCERPT_LENGTH, truncate='...')
+
     def _generate_unique_slug(self):
         """Генерація унікального slug з урахуванням race conditions"""
         base_slug = external_slugify(self.title)
@@ -109,12 +202,156 @@ class Post(models.Model):
             slug = f"{base_slug}-{i}"
 
     def increment_views(self):
-        """Збільшення лічильника переглядів без тригера save()"""
-        Post.objects.filter(pk=self.pk).update(
-            views_count=models.F('views_count') + 1
-        )
+        """
+        Зарахувати перегляд через буфер у Redis (HINCRBY), без UPDATE рядка.
+        У БД перегляди переносить команда flush_post_views.
+        """
+        from .services.view_counter import record_view
+
+        record_view(self.pk)
         self.views_count += 1  # Оновлюємо локальний екземпляр
 
+    @classmethod
+    def adjust_counter(cls, post_id, field, delta):
+        """Атомарна зміна денормалізованого лічильника (не нижче нуля)"""
+        if field not in cls.COUNTER_FIELDS:
+            raise ValueError(f'Невідомий лічильник: {field}')
+        updates = {field: Greatest(models.F(field) + delta, 0)}
+
+        weight = cls.HOT_SCORE_WEIGHTS.get(field)
+        if weight:
+            updates.update(cls._score_updates(weight * delta))
+
+        cls.objects.filter(pk=post_id).update(**updates)
+
+    @staticmethod
+    def _score_updates(hot_delta):
+        """
+        Інкрементальна зміна hot_score і trending_score в одному UPDATE.
+        Праворуч у SET — старі значення колонок, тож для тренду досить
+        замінити log2(1 + старий hot) на log2(1 + новий hot).
+        """
+        def _log2(expr):
+            return Log(Value(2.0), Greatest(expr, Value(0.0)) + Value(1.0))
+
+        old_hot = models.F('hot_score')
+        new_hot = models.F('hot_score') + hot_delta
+        return {
+            'hot_score': new_hot,
+            'trending_score': models.Case(
+                models.When(published_at__isnull=True, then=Value(0.0)),
+                default=models.F('trending_score')
+                - _log2(old_hot) + _log2(new_hot),
+                output_field=models.FloatField(),
+            ),
+        }
+
+    @staticmethod
+    def trending_score_for(hot_score, published_at):
+        """
+        Рейтинг «в тренді» з експоненційним згасанням (як у Reddit/HN).
+        Ранжування за hot_score * 2^(-вік / half_life) еквівалентне
+        ранжуванню за log2(1 + hot_score) + published_at / half_life,
+        а цей вираз не залежить від поточного часу — його можна зберігати
+        та індексувати, без перерахунку при старінні постів.
+        """
+        if not published_at:
+            return 0.0
+        half_life = settings.TRENDING_HALF_LIFE_HOURS * 3600
+        return (math.log2(1 + max(hot_score, 0))
+                + published_at.timestamp() / half_life)
+
+    @staticmethod
+    def trending_score_expression(published_at):
+        """trending_score_for як SQL-вираз від поточного hot_score"""
+        if not published_at:
+            return Value(0.0)
+        half_life = settings.TRENDING_HALF_LIFE_HOURS * 3600
+        hot = Greatest(models.F('hot_score'), Value(0.0))
+        return (Log(Value(2.0), hot + Value(1.0))
+                + Value(published_at.timestamp() / half_life))
+
+    @classmethod
+    def trending_score_sql(cls):
+        """trending_score_for повністю в SQL — з колонок hot_score і published_at"""
+        half_life = settings.TRENDING_HALF_LIFE_HOURS * 3600
+        hot = Greatest(models.F('hot_score'), Value(0.0))
+        return models.Case(
+            models.When(published_at__isnull=True, then=Value(0.0)),
+            default=Log(Value(2.0), hot + Value(1.0))
+            + EpochSeconds('published_at') / Value(half_life),
+            output_field=models.FloatField(),
+        )
+
+    @classmethod
+    def recompute_trending_scores(cls, queryset=None):
+        """
+        Перерахунок trending_score (наприклад, після зміни
+        TRENDING_HALF_LIFE_HOURS) одним UPDATE, без читання рядків у Python.
+        """
+        if queryset is None:
+            queryset = cls.objects.all()
+        return queryset.update(trending_score=cls.trending_score_sql())
+
+    @classmethod
+    def hot_score_expression(cls):
+        """SQL-вираз hot_score з поточних лічильників"""
+        return sum(
+            (Cast(models.F(field), models.FloatField()) * weight
+             for field, weight in cls.HOT_SCORE_WEIGHTS.items()),
+            Value(0.0),
+        )
+
+    @classmethod
+    def recompute_hot_scores(cls, queryset=None):
+        """Повний перерахунок hot_score (виправляє накопичені похибки)"""
+        if queryset is None:
+            queryset = cls.objects.all()
+        updated = queryset.update(hot_score=cls.hot_score_expression())
+        cls.recompute_trending_scores(queryset)
+        return updated
+
+    @classmethod
+    def recount_counters(cls, queryset=None):
+        """
+        Перерахунок лічильників одним UPDATE з корельованими підзапитами.
+        Повертає кількість оновлених рядків.
+        """
+        from django.contrib.contenttypes.models import ContentType
+        from apps.likes.models import Like
+        from apps.comments.models import Comment
+
+        if queryset is None:
+            queryset = cls.objects.all()
+
+        post_ct = ContentType.objects.get_for_model(cls)
+        updated = queryset.update(**cls._counter_subqueries(
+            Like.objects.filter(content_type=post_ct),
+            Comment.objects.filter(is_active=True),
+            PostImages.objects.all(),
+        ))
+        cls.recompute_hot_scores(queryset)
+        return updated
+
+    @staticmethod
+    def _counter_subqueries(likes, comments, images):
+        """Вирази фактичних значень лічильників для annotate()/update()"""
+        def _count(qs, fk):
+            return Coalesce(models.Subquery(
+                qs.filter(**{fk: models.OuterRef('pk')})
+                  .order_by()
+                  .values(fk)
+                  .annotate(c=models.Count('pk'))
+                  .values('c')[:1],
+                output_field=models.IntegerField(),
+            ), 0)
+
+        return {
+            'likes_count': _count(likes, 'object_id'),
+            'comments_count': _count(comments, 'post'),
+            'images_count': _count(images, 'post'),
+        }
+
     def get_absolute_url(self):
         return reverse('post-detail', kwargs={'slug': self.slug})
 
@@ -123,11 +360,6 @@ class Post(models.Model):
         """Чи опублікований пост"""
         return self.status == 'published' and self.published_at is not None
 
-    @property
-    def likes_count(self):
-        """Кількість лайків"""
-        return self.likes.count()
-
     def is_liked_by(self, user):
         """Чи лайкнув користувач цей пост"""
         if not user.is_authenticated:
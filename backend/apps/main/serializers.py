@@ -1,12 +1,12 @@
+from django.db import transaction
 from rest_framework import serializers
 from taggit.serializers import TagListSerializerField, TaggitSerializer
-from django.utils.text import Truncator
-from django.utils.html import strip_tags
 
 import bleach
 
 from .models import Category, Post, PostImages, PostVideo
 from apps.polls.serializers import PollSerializer
+from apps.likes.serializers import IsLikedMixin
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -19,7 +19,12 @@ class CategorySerializer(serializers.ModelSerializer):
         read_only_fields = ['slug', 'created_at', 'posts_count']
 
     def get_posts_count(self, obj):
-        return obj.posts.filter(status='published').count()
+        # Списки анотують posts_count у queryset (services/categories.py);
+        # окремий запит — лише для щойно створеної / зміненої категорії
+        count = getattr(obj, 'posts_count', None)
+        if count is None:
+            count = obj.posts.filter(status='published').count()
+        return count
 
 
 class PostImageSerializer(serializers.ModelSerializer):
@@ -36,17 +41,13 @@ class PostVideoSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class PostListSerializer(serializers.ModelSerializer):
+class PostListSerializer(IsLikedMixin, serializers.ModelSerializer):
     """Сериализатор для списка постов"""
     author_username = serializers.CharField(
         source='author.username', read_only=True)
     category_name = serializers.CharField(
         source='category.name', read_only=True)
-    comments_count = serializers.SerializerMethodField()
     tags = TagListSerializerField(required=False)
-    images_count = serializers.SerializerMethodField()
-    excerpt = serializers.SerializerMethodField()
-    likes_count = serializers.ReadOnlyField()
     is_liked = serializers.SerializerMethodField()
     author_karma_points = serializers.IntegerField(
         source='author.karma_points', read_only=True)
@@ -66,40 +67,19 @@ class PostListSerializer(serializers.ModelSerializer):
             'author_karma_points', 'author_karma_level',
 
         ]
-        read_only_fields = ['slug', 'author', 'views_count', 'published_at']
+        # excerpt — збережене поле (Post.save), content у списках не вантажиться
+        read_only_fields = ['slug', 'author', 'views_count', 'published_at',
+                            'comments_count', 'images_count', 'likes_count',
+                            'excerpt']
 
-    def get_excerpt(self, obj):
-        """Скорочений текст для списку"""
-        if not obj.content:
-            return ''
-        clean = strip_tags(obj.content)
-        return Truncator(clean).chars(200, truncate='...')
 
-    def get_images_count(self, obj):
-        return obj.images.count()
-
-    def get_comments_count(self, obj):
-        """Кількість коментарів (якщо є модель Comment)"""
-        if hasattr(obj, 'comments'):
-            return obj.comments.count()
-        return 0
-
-    def get_is_liked(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.is_liked_by(request.user)
-        return False
-
-
-class PostDetailSerializer(serializers.ModelSerializer):
+class PostDetailSerializer(IsLikedMixin, serializers.ModelSerializer):
     """Сериализатор для списка постов"""
     author_info = serializers.SerializerMethodField()
     category_info = serializers.SerializerMethodField()
-    comments_count = serializers.SerializerMethodField()
     tags = TagListSerializerField()
     images = PostImageSerializer(many=True, read_only=True)
     videos = PostVideoSerializer(many=True, read_only=True)
-    likes_count = serializers.ReadOnlyField()
     is_liked = serializers.SerializerMethodField()
     author_karma_points = serializers.IntegerField(
         source='author.karma_points', read_only=True)
@@ -120,7 +100,8 @@ class PostDetailSerializer(serializers.ModelSerializer):
             'author_karma_points', 'author_karma_level',
             'poll',
         ]
-        read_only_fields = ['slug', 'author', 'views_count', 'published_at']
+        read_only_fields = ['slug', 'author', 'views_count', 'published_at',
+                            'comments_count', 'likes_count']
 
     def get_author_info(self, obj):
         author = obj.author
@@ -140,18 +121,6 @@ class PostDetailSerializer(serializers.ModelSerializer):
             }
         return None
 
-    def get_comments_count(self, obj):
-        if hasattr(obj, 'comments'):
-            return obj.comments.count()
-        return 0
-
-    def get_is_liked(self, obj):
-        """Перевірка чи поточний користувач лайкнув пост"""
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.is_liked_by(request.user)
-        return False
-
 
 ALLOWED_TAGS = [
     'p', 'br', 'strong', 'em', 'u', 'h1', 'h2', 'h3',
@@ -202,10 +171,13 @@ class PostCreateUpdateSerializer(TaggitSerializer, serializers.ModelSerializer):
     #         )
     #     return value
 
+    # save() і теги — одна транзакція: пошуковий індекс пишеться раз, після коміту
+    @transaction.atomic
     def create(self, validated_data):
         validated_data['author'] = self.context['request'].user
         return super().create(validated_data)
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         tags_data = validated_data.pop('tags', None)
 
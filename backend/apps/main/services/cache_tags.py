@@ -0,0 +1,25 @@
+"""Теги кешу для рейтингових списків постів (popular / trending)"""
+
+RANKED_LISTINGS = ('popular', 'trending')
+
+
+def listing_tags(listing, category_slug, rows):
+    """Теги кешованої сторінки: сам список (з категорією) + кожен пост у ній"""
+    return [
+        f"{listing}:category:{category_slug}",
+        *(f"post:{row['id']}" for row in rows),
+    ]
+
+
+def post_tags(post):
+    """
+    Що інвалідувати при зміні поста: списки, куди він може потрапити
+    (без фільтра і з його категорією), та сторінки, де він уже є.
+    """
+    category_slug = post.category.slug if post.category_id else ''
+    tags = [f"post:{post.pk}"]
+    for listing in RANKED_LISTINGS:
+        tags.append(f"{listing}:category:")
+        if category_slug:
+            tags.append(f"{listing}:category:{category_slug}")
+    return tags
@@ -0,0 +1,33 @@
+"""Кеш списку категорій з кількістю опублікованих постів"""
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from apps.main.models import Category
+from apps.main.serializers import CategorySerializer
+
+CATEGORIES_CACHE_KEY = 'categories:list'
+CATEGORIES_CACHE_TIMEOUT = 3600
+
+
+def categories_with_counts():
+    """Категорії + posts_count одним запитом (COUNT ... GROUP BY)"""
+    return Category.objects.annotate(
+        posts_count=Count('posts', filter=Q(posts__status='published'))
+    ).order_by('name')
+
+
+def rebuild_categories_cache():
+    """
+    Перебудовує кеш одразу (а не лише видаляє), щоб перший запит після
+    зміни статусу поста не платив за перерахунок.
+    """
+    data = CategorySerializer(categories_with_counts(), many=True).data
+    cache.set(CATEGORIES_CACHE_KEY, data, timeout=CATEGORIES_CACHE_TIMEOUT)
+    return data
+
+
+def get_cached_categories():
+    data = cache.get(CATEGORIES_CACHE_KEY)
+    if data is None:
+        data = rebuild_categories_cache()
+    return data
@@ -0,0 +1,126 @@
+"""
+Повнотекстовий пошук постів.
+
+PostgreSQL: колонка posts.search_vector (tsvector) з GIN-індексом.
+SQLite (локальна розробка): віртуальна таблиця FTS5 posts_fts, де rowid = id поста.
+Індекс оновлюється з сигналів (збереження поста, зміна тегів, видалення).
+"""
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection, models
+from django.db.models import Case, F, Value, When
+from django.utils.html import strip_tags
+from rest_framework.filters import BaseFilterBackend
+
+from apps.main.models import Post
+
+FTS_TABLE = 'posts_fts'
+# SQLite: скільки найрелевантніших id беремо з FTS5 для одного запиту
+SQLITE_MAX_RESULTS = 1000
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _is_postgres():
+    return connection.vendor == 'postgresql'
+
+
+def _tokens(query):
+    return _TOKEN_RE.findall(query or '')[:10]
+
+
+def index_post(post, tag_names=None):
+    """
+    Оновлює пошуковий індекс одного поста. tag_names можна передати
+    готовими (наприклад, з prefetch), інакше — окремий запит.
+    """
+    if tag_names is None:
+        tag_names = post.tags.names()
+    title = post.title or ''
+    content = strip_tags(post.content or '')
+    tags = ' '.join(tag_names)
+
+    if _is_postgres():
+        config = settings.SEARCH_CONFIG
+        Post.objects.filter(pk=post.pk).update(search_vector=(
+            SearchVector(Value(title), weight='A', config=config)
+            + SearchVector(Value(tags), weight='A', config=config)
+            + SearchVector(Value(content), weight='B', config=config)
+        ))
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT OR REPLACE INTO {FTS_TABLE}(rowid, title, content, tags) "
+                f"VALUES (%s, %s, %s, %s)",
+                [post.pk, title, content, tags],
+            )
+
+
+def remove_post(post_id):
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [post_id])
+    # PostgreSQL: вектор живе в рядку поста і видаляється разом з ним
+
+
+def search_posts(queryset, query, order_by_rank=True):
+    """
+    Фільтрує queryset за повнотекстовим запитом (префіксний пошук по
+    кожному слову, всі слова обов'язкові). Додає анотацію search_rank;
+    з order_by_rank=True — сортує за релевантністю.
+    """
+    tokens = _tokens(query)
+    if not tokens:
+        return queryset.none()
+
+    if _is_postgres():
+        search_query = SearchQuery(
+            ' & '.join(f'{token}:*' for token in tokens),
+            search_type='raw', config=settings.SEARCH_CONFIG,
+        )
+        queryset = queryset.filter(search_vector=search_query).annotate(
+            search_rank=SearchRank(F('search_vector'), search_query))
+    else:
+        ranked_ids = _sqlite_match(tokens)
+        queryset = queryset.filter(pk__in=ranked_ids).annotate(
+            search_rank=Case(
+                *[When(pk=pk, then=Value(float(len(ranked_ids) - pos)))
+                  for pos, pk in enumerate(ranked_ids)],
+                default=Value(0.0),
+                output_field=models.FloatField(),
+            ))
+
+    if order_by_rank:
+        queryset = queryset.order_by('-search_rank', '-published_at')
+    return queryset
+
+
+def _sqlite_match(tokens):
+    # Кожне слово в лапках (екранування синтаксису FTS5) + префікс *
+    match = ' '.join('"{}"*'.format(t.replace('"', '""')) for t in tokens)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+            f"ORDER BY bm25({FTS_TABLE}, 10.0, 1.0, 10.0) LIMIT %s",
+            [match, SQLITE_MAX_RESULTS],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    Заміна SearchFilter для постів: ?search= через повнотекстовий індекс.
+    Ставити після OrderingFilter — тоді без явного ?ordering= результати
+    сортуються за релевантністю.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        order_by_rank = 'ordering' not in request.query_params
+        return search_posts(queryset, query, order_by_rank=order_by_rank)
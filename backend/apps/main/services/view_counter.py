@@ -0,0 +1,154 @@
+"""
+Буферизований лічильник переглядів постів.
+
+Кожен перегляд — це HINCRBY у Redis-хеші (post_id -> кількість), без
+UPDATE рядка поста. Команда flush_post_views періодично переносить
+накопичене в posts.views_count пакетними UPDATE, а читання додають
+ще не скинуту дельту, щоб лічильник залишався майже реальним.
+Без воркера буфер скидає сам запит: раз на VIEWS_INLINE_FLUSH_INTERVAL
+секунд або коли в ньому більше VIEWS_FLUSH_MAX_PENDING постів.
+"""
+import logging
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, models, transaction
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+from apps.main.models import Post
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = 'posts:views:pending'
+FLUSHING_KEY = 'posts:views:flushing'
+FLUSH_LOCK_KEY = 'posts:views:flush_lock'
+INLINE_FLUSH_KEY = 'posts:views:inline_flush'
+# Продовжується після кожного пакета (див. flush_views)
+FLUSH_LOCK_TIMEOUT = 60
+
+
+def _redis():
+    return get_redis_connection('default')
+
+
+def _key(name):
+    # Сирий клієнт не додає KEY_PREFIX — робимо це самі
+    return cache.make_key(name)
+
+
+def record_view(post_id):
+    """Зарахувати перегляд; якщо Redis недоступний — пишемо одразу в БД"""
+    try:
+        pipe = _redis().pipeline(transaction=False)
+        pipe.hincrby(_key(PENDING_KEY), post_id, 1)
+        pipe.hlen(_key(PENDING_KEY))
+        _, size = pipe.execute()
+    except RedisError as e:
+        logger.warning(f"View buffer unavailable, direct update: {e}")
+        _apply_deltas({post_id: 1})
+        return
+    _maybe_flush(size)
+
+
+def _maybe_flush(size):
+    """Запасний шлях без воркера flush_post_views: за віком або розміром буфера"""
+    interval = settings.VIEWS_INLINE_FLUSH_INTERVAL
+    if not interval:
+        return
+    try:
+        if (size >= settings.VIEWS_FLUSH_MAX_PENDING
+                or cache.add(INLINE_FLUSH_KEY, 1, timeout=interval)):
+            flush_views()
+    except (RedisError, DatabaseError) as e:
+        logger.warning(f"Inline views flush failed: {e}")
+
+
+def pending_views(post_ids):
+    """Ще не скинуті в БД перегляди: {post_id: delta}"""
+    post_ids = [int(pk) for pk in post_ids]
+    if not post_ids:
+        return {}
+    try:
+        client = _redis()
+        pipe = client.pipeline(transaction=False)
+        pipe.hmget(_key(PENDING_KEY), post_ids)
+        pipe.hmget(_key(FLUSHING_KEY), post_ids)
+        pending, flushing = pipe.execute()
+    except RedisError:
+        return {}
+
+    result = {}
+    for pk, a, b in zip(post_ids, pending, flushing):
+        delta = int(a or 0) + int(b or 0)
+        if delta:
+            result[pk] = delta
+    return result
+
+
+def merge_pending_views(rows):
+    """Додає буферизовані перегляди до серіалізованих постів (dict з id)"""
+    deltas = pending_views(
+        row['id'] for row in rows if row.get('id') is not None)
+    for row in rows:
+        if row.get('id') in deltas:
+            row['views_count'] = row.get('views_count', 0) + deltas[row['id']]
+    return rows
+
+
+def flush_views(batch_size=500):
+    """
+    Переносить буфер у БД. Хеш атомарно перейменовується (RENAME), тож нові
+    перегляди йдуть у свіжий ключ. Кожен записаний пакет одразу видаляється
+    з FLUSHING_KEY (HDEL), тож після падіння наступний запуск доскидає лише
+    незаписане. Повертає кількість переглядів.
+    """
+    if not cache.add(FLUSH_LOCK_KEY, 1, timeout=FLUSH_LOCK_TIMEOUT):
+        return 0
+
+    try:
+        client = _redis()
+        pending, flushing = _key(PENDING_KEY), _key(FLUSHING_KEY)
+
+        if not client.exists(flushing):
+            if not client.exists(pending):
+                return 0
+            client.rename(pending, flushing)
+
+        raw = client.hgetall(flushing)
+        deltas = {int(pk): int(delta) for pk, delta in raw.items()}
+
+        items = list(deltas.items())
+        for start in range(0, len(items), batch_size):
+            batch = dict(items[start:start + batch_size])
+            with transaction.atomic():
+                _apply_deltas(batch)
+            client.hdel(flushing, *batch)
+            # Замок живе, поки йдуть пакети — другий flush не візьме той самий хеш
+            cache.touch(FLUSH_LOCK_KEY, FLUSH_LOCK_TIMEOUT)
+            # Кешований деталь-пост тримає старий views_count без дельти
+            cache.delete_many([
+                f"post:detail:{slug}" for slug in
+                Post.objects.filter(pk__in=batch).values_list('slug', flat=True)
+            ])
+
+        client.delete(flushing)
+        return sum(deltas.values())
+    finally:
+        cache.delete(FLUSH_LOCK_KEY)
+
+
+def _apply_deltas(deltas):
+    """Один UPDATE на кожне різне значення дельти (зазвичай їх небагато)"""
+    by_delta = defaultdict(list)
+    for pk, delta in deltas.items():
+        if delta > 0:
+            by_delta[delta].append(pk)
+
+    weight = Post.HOT_SCORE_WEIGHTS['views_count']
+    for delta, pks in by_delta.items():
+        Post.objects.filter(pk__in=pks).update(
+            views_count=models.F('views_count') + delta,
+            **Post._score_updates(weight * delta),
+        )
@@ -1,29 +1,159 @@
-from django.db.models.signals import post_save, post_delete, pre_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_save, m2m_changed
 from django.dispatch import receiver
-from django.core.cache import cache
-from .models import Post
-from .models import Post, PostImages, PostVideo
+from django.contrib.contenttypes.models import ContentType
+
+from .models import Category, Post, PostImages, PostVideo
+from apps.comments.models import Comment
+from apps.likes.models import Like
+from apps.core.cache import invalidate_tags, bump_generation
+from .services.cache_tags import post_tags
+from .services import search
+from .services.categories import rebuild_categories_cache
 
 
 @receiver(post_save, sender=Post)
 @receiver(post_delete, sender=Post)
 def invalidate_posts_cache(sender, instance, **kwargs):
-    # Збираємо всі можливі ключі і видаляємо
-    sorts = ['hot', 'views', 'likes', 'comments']
-    cats = ['', instance.category.slug if instance.category else '']
-
-    for sort in sorts:
-        for cat in cats:
-            # Видаляємо перші 10 offset-ів (по 20 постів = 200 постів)
-            for offset in range(0, 200, 20):
-                cache.delete(f"popular:{sort}:{cat}::{offset}")
-                cache.delete(f"popular:{sort}:{cat}:20:{offset}")
-
-    # Трендові
-    for days in [7, 14, 30, 180]:
-        for limit in [12, 30]:
-            for cat in cats:
-                cache.delete(f"trending:{days}:{limit}:{cat}")
+    # Видаляємо рівно ті сторінки popular/trending, яких стосується пост
+    invalidate_tags(*post_tags(instance))
+    # Списки (зокрема кешовані результати пошуку) — і при змінах поза API
+    bump_generation('posts:list', 'posts:by_tag')
+
+
+# ── Денормалізовані лічильники поста ──────────────────────────
+
+def _is_post_like(like):
+    return like.content_type_id == ContentType.objects.get_for_model(Post).id
+
+
+@receiver(post_save, sender=Like)
+def like_counter_on_create(sender, instance, created, **kwargs):
+    if created and _is_post_like(instance):
+        Post.adjust_counter(instance.object_id, 'likes_count', 1)
+
+
+@receiver(post_delete, sender=Like)
+def like_counter_on_delete(sender, instance, **kwargs):
+    if _is_post_like(instance):
+        Post.adjust_counter(instance.object_id, 'likes_count', -1)
+
+
+@receiver(pre_save, sender=Comment)
+def comment_remember_active(sender, instance, **kwargs):
+    """Запам'ятовуємо попередній is_active, щоб врахувати soft-delete"""
+    if not instance.pk:
+        instance._was_active = False
+        return
+    instance._was_active = Comment.objects.filter(
+        pk=instance.pk, is_active=True).exists()
+
+
+@receiver(post_save, sender=Comment)
+def comment_counter_on_save(sender, instance, **kwargs):
+    was_active = getattr(instance, '_was_active', False)
+    if instance.is_active != was_active:
+        Post.adjust_counter(
+            instance.post_id, 'comments_count', 1 if instance.is_active else -1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_counter_on_delete(sender, instance, **kwargs):
+    if instance.is_active:
+        Post.adjust_counter(instance.post_id, 'comments_count', -1)
+
+
+@receiver(post_save, sender=PostImages)
+def image_counter_on_create(sender, instance, created, **kwargs):
+    # bulk_create сигналів не шле — там лічильник оновлює view
+    if created:
+        Post.adjust_counter(instance.post_id, 'images_count', 1)
+
+
+@receiver(post_delete, sender=PostImages)
+def image_counter_on_delete(sender, instance, **kwargs):
+    Post.adjust_counter(instance.post_id, 'images_count', -1)
+
+
+# ── Кеш категорій (posts_count) ───────────────────────────────
+
+@receiver(pre_save, sender=Post)
+def post_remember_state(sender, instance, **kwargs):
+    """Попередні статус і категорія — щоб знати, чи змінився posts_count"""
+    old = None
+    if instance.pk:
+        old = Post.objects.filter(pk=instance.pk) \
+            .values('status', 'category_id').first()
+    instance._old_state = old
+
+
+@receiver(post_save, sender=Post)
+def categories_cache_on_post_save(sender, instance, **kwargs):
+    old = getattr(instance, '_old_state', None)
+    published = instance.status == 'published'
+    if old is None:
+        changed = published
+    else:
+        was_published = old['status'] == 'published'
+        changed = published != was_published or (
+            published and old['category_id'] != instance.category_id)
+    if changed:
+        rebuild_categories_cache()
+
+
+@receiver(post_delete, sender=Post)
+def categories_cache_on_post_delete(sender, instance, **kwargs):
+    if instance.status == 'published' and instance.category_id:
+        rebuild_categories_cache()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def categories_cache_on_category_change(sender, instance, **kwargs):
+    rebuild_categories_cache()
+
+
+# ── Пошуковий індекс ──────────────────────────────────────────
+
+SEARCH_FIELDS = {'title', 'content'}
+
+
+def _index_on_commit(post):
+    """
+    Переіндексація після коміту, не більше одного разу на екземпляр:
+    save() і tags.set() (remove + add) в одній транзакції дають один запис.
+    """
+    if getattr(post, '_search_index_pending', False):
+        return
+    post._search_index_pending = True
+
+    def run():
+        post._search_index_pending = False
+        search.index_post(post)
+
+    transaction.on_commit(run)
+
+
+@receiver(post_save, sender=Post)
+def search_index_on_save(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not SEARCH_FIELDS & set(update_fields):
+        return
+    _index_on_commit(instance)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def search_index_on_tags(sender, instance, action, **kwargs):
+    # Теги ставляться після save() поста — в тій самій транзакції це той самий запис
+    if action in ('post_add', 'post_remove', 'post_clear') \
+            and isinstance(instance, Post):
+        _index_on_commit(instance)
+
+
+@receiver(post_delete, sender=Post)
+def search_index_on_delete(sender, instance, **kwargs):
+    # Після коміту — і після запланованої переіндексації цього ж поста
+    post_id = instance.pk
+    transaction.on_commit(lambda: search.remove_post(post_id))
 
 
 # ── Видалення файлів з R2 ─────────────────────────────────────
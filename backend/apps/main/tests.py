@@ -1,3 +1,83 @@
+import base64
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from .models import Post
+from .views import PopularPagination
+
+User = get_user_model()
+
+
+def _token(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+class KeysetPaginationTests(TestCase):
+    """?cursor= — обхід сторінок за (published_at, id) без пропусків і повторів"""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            username='author', email='author@example.com', password='pass12345')
+        base = timezone.now().replace(microsecond=0)
+        cls.posts = [
+            Post.objects.create(title=f'Пост {i}', content='текст',
+                                author=author, status='published')
+            for i in range(7)
+        ]
+        # Три пости з однаковою датою — порядок між ними задає id
+        dates = [base - timedelta(hours=h) for h in (1, 2, 2, 2, 3, 4, 5)]
+        for post, published_at in zip(cls.posts, dates):
+            Post.objects.filter(pk=post.pk).update(published_at=published_at)
+        cls.draft = Post.objects.create(
+            title='Чернетка', content='текст', author=author, status='draft')
+
+    def paginate(self, cursor='', limit=3):
+        paginator = PopularPagination()
+        request = Request(APIRequestFactory().get(
+            '/api/v1/posts/', {'cursor': cursor, 'limit': limit}))
+        page = paginator.paginate_queryset(Post.objects.all(), request)
+        return paginator, page
+
+    def test_round_trip_covers_all_rows_once(self):
+        expected = list(Post.objects.filter(published_at__isnull=False)
+                        .order_by('-published_at', '-id')
+                        .values_list('pk', flat=True))
+        seen, cursor, pages = [], '', 0
+        while True:
+            paginator, page = self.paginate(cursor)
+            seen += [post.pk for post in page]
+            pages += 1
+            cursor = paginator.next_cursor
+            if cursor is None:
+                break
+        self.assertEqual(seen, expected)
+        self.assertEqual(pages, 3)
+        self.assertNotIn(self.draft.pk, seen)
+
+    def test_cursor_encodes_last_row(self):
+        paginator, page = self.paginate(limit=2)
+        self.assertTrue(paginator.has_next)
+        value, last_pk = paginator._decode_cursor(
+            paginator.next_cursor, Post._meta.get_field('published_at'))
+        self.assertEqual((value, last_pk), (page[-1].published_at, page[-1].pk))
+
+    def test_last_page_has_no_cursor(self):
+        paginator, page = self.paginate(limit=10)
+        self.assertEqual(len(page), 7)
+        self.assertIsNone(paginator.next_cursor)
+        self.assertIsNone(paginator.get_paginated_response([]).data['next'])
 
-# Create your tests here.
+    def test_invalid_cursor_is_not_found(self):
+        for token in ('не-base64', _token(['x', 1]), _token({'a': 1, 'b': 2}),
+                      _token([None, 1]), _token([timezone.now().isoformat(), '1']),
+                      _token([timezone.now().isoformat(), True]), _token([1])):
+            with self.subTest(token=token), self.assertRaises(NotFound):
+                self.paginate(token)
@@ -1,6 +1,5 @@
 from django.db import transaction, models
-from django.db.models import Count, ExpressionWrapper, FloatField, F, Q
-from django.db.models.functions import Cast
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from django.core.cache import cache
 
@@ -25,14 +24,22 @@ from .serializers import (
     PostVideoSerializer,
 )
 from .permissions import IsAuthorOrReadOnly
+from .services.view_counter import record_view, merge_pending_views
+from .services.cache_tags import listing_tags
+from .services.search import FullTextSearchFilter, search_posts
+from .services.categories import categories_with_counts, get_cached_categories
 from apps.core.throttling import PostCreateMinuteThrottle, PostCreateDayThrottle
+from apps.core.cache import make_key, bump_generation, set_tagged
+from apps.core.pagination import KeysetPaginationMixin
+from apps.likes.utils import LikedIdsMixin, liked_ids_context, overlay_is_liked
+from apps.polls.utils import overlay_user_voted
+from apps.polls.services.results import overlay_results
 
 
 # ========================
 # Category ViewSet
 # ========================
 class CategoryViewSet(viewsets.ModelViewSet):
-    queryset = Category.objects.all().order_by('name')
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     lookup_field = 'slug'
@@ -40,55 +47,45 @@ class CategoryViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'description']
     ordering_fields = ['name', 'created_at']
 
+    def get_queryset(self):
+        return categories_with_counts()
+
     # Кешування списку
     def list(self, request, *args, **kwargs):
-        cache_key = "categories:list"
-        cached_data = cache.get(cache_key)
-
-        if cached_data is not None:
-            return Response(cached_data)
-
-        # Якщо в кеші немає — виконуємо звичайний запит
-        response = super().list(request, *args, **kwargs)
-
-        # Зберігаємо в кеш на 1 годину
-        cache.set(cache_key, response.data, timeout=3600)
-
-        return response
-
-    # Очищення кешу при змінах
-    def perform_create(self, serializer):
-        serializer.save()
-        cache.delete("categories:list")
-
-    def perform_update(self, serializer):
-        serializer.save()
-        cache.delete("categories:list")
+        # Пошук / сортування — звичайний запит (один, з анотацією)
+        if set(request.query_params) - {self.paginator.page_query_param}:
+            return super().list(request, *args, **kwargs)
 
-    def perform_destroy(self, instance):
-        instance.delete()
-        cache.delete("categories:list")
+        # Повний список кешується і перебудовується сигналами
+        # (зміни категорій, статусу / категорії постів)
+        categories = get_cached_categories()
+        page = self.paginate_queryset(categories)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(categories)
 
 
-class PopularPagination(LimitOffsetPagination):
+class PopularPagination(KeysetPaginationMixin, LimitOffsetPagination):
     default_limit = 20
     max_limit = 100
+    keyset_fields = ('published_at', 'id')
 
 
 # ========================
 # Post ViewSet
 # ========================
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(LikedIdsMixin, viewsets.ModelViewSet):
     """ViewSet для постів з повним CRUD функціоналом"""
+    liked_model = Post
     queryset = Post.objects.select_related('author', 'category') \
                            .prefetch_related('tags', 'images', 'videos')
     permission_classes = [IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
     pagination_class = PopularPagination
     lookup_field = 'slug'
+    # FullTextSearchFilter після OrderingFilter: без ?ordering= — за релевантністю
     filter_backends = [DjangoFilterBackend,
-                       filters.SearchFilter, filters.OrderingFilter]
+                       filters.OrderingFilter, FullTextSearchFilter]
     filterset_fields = ['category__slug', 'status', 'author']
-    search_fields = ['title', 'content', 'tags__name']
     ordering_fields = ['created_at', 'updated_at',
                        'published_at', 'views_count']
     ordering = ['-published_at', '-created_at']
@@ -113,6 +110,12 @@ class PostViewSet(viewsets.ModelViewSet):
             qs = qs.filter(author__username=author_username,
                            status='published')
 
+        # Спискам тіло поста не потрібне — є збережений excerpt
+        if self.action in ('list', 'by_tag'):
+            qs = qs.defer('content')
+        elif self.action == 'retrieve':
+            qs = qs.select_related('poll').prefetch_related('poll__options')
+
         return qs
 
     def get_serializer_class(self):
@@ -123,40 +126,69 @@ class PostViewSet(viewsets.ModelViewSet):
         return PostCreateUpdateSerializer
 
     def list(self, request, *args, **kwargs):
-        # Не кешуємо для авторизованих користувачів (чернетки) та при пошуку
-        if request.user.is_authenticated or request.query_params.get('search'):
-            return super().list(request, *args, **kwargs)
+        # Спільний кеш для всіх, крім авторів з чернетками (вони бачать їх у списку);
+        # is_liked поточного користувача накладається поверх кешу
+        if not self._uses_shared_cache(request):
+            response = super().list(request, *args, **kwargs)
+            merge_pending_views(response.data['results'])
+            return response
 
-        cache_key = f"posts:list:{self._get_query_key(request)}"
+        cache_key = make_key('posts:list', self._get_query_key(request))
 
         cached = cache.get(cache_key)
         if cached is not None:
-            return Response(cached)
+            self._personalize(cached)
+            return Response(self._merge_views(cached))
 
         response = super().list(request, *args, **kwargs)
         cache.set(cache_key, response.data, timeout=600)   # 10 хвилин
+        merge_pending_views(response.data['results'])
         return response
 
     def retrieve(self, request, *args, **kwargs):
         slug = kwargs['slug']
         cache_key = f"post:detail:{slug}"
 
-        # Якщо користувач НЕ авторизований — можна віддавати кеш
-        if not request.user.is_authenticated:
-            cached = cache.get(cache_key)
-            if cached is not None:
-                return Response(cached)
+        # У кеші лише опубліковані пости — віддаємо всім,
+        # is_liked та user_voted накладаються для поточного користувача
+        cached = cache.get(cache_key)
+        if cached is not None:
+            self._personalize(cached)
+            return Response(self._count_view(cached))
 
-        # Для авторизованих користувачів — завжди беремо свіжі дані
-        # (бо user_voted залежить від конкретного користувача)
         response = super().retrieve(request, *args, **kwargs)
 
-        # Кешуємо тільки для НЕавторизованих користувачів
-        if not request.user.is_authenticated:
+        # Чернетки (видимі лише автору) не кешуємо
+        if response.data.get('status') == 'published':
             cache.set(cache_key, response.data, timeout=1800)  # 30 хвилин
 
+        self._count_view(response.data)
         return response
 
+    def _uses_shared_cache(self, request):
+        user = request.user
+        if not user.is_authenticated:
+            return True
+        return not Post.objects.filter(author=user, status='draft').exists()
+
+    def _personalize(self, data):
+        """Накладає стан поточного користувача на спільну кешовану відповідь"""
+        if isinstance(data, list):
+            rows = data
+        else:
+            rows = data['results'] if 'results' in data else [data]
+        overlay_is_liked(self.request, Post, rows)
+        polls = overlay_results([row.get('poll') for row in rows])
+        overlay_user_voted(self.request, polls)
+        return data
+
+    def _count_view(self, data):
+        """Буферизований перегляд + актуальний views_count у відповіді"""
+        if data.get('status') == 'published':
+            record_view(data['id'])
+        merge_pending_views([data])
+        return data
+
     def _get_query_key(self, request):
         """Генерує ключ для кешу списку"""
         params = sorted(
@@ -181,10 +213,8 @@ class PostViewSet(viewsets.ModelViewSet):
     def _clear_post_cache(self, post):
         """Очищення всіх пов'язаних кешів"""
         cache.delete(f"post:detail:{post.slug}")
-        cache.delete_pattern("posts:list:*")
-        cache.delete_pattern("popular:*")
-        cache.delete_pattern("trending:*")
-        cache.delete_pattern("posts:by_tag:*")
+        # popular / trending інвалідуються по тегах у signals.py
+        bump_generation('posts:list', 'posts:by_tag')
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -198,17 +228,21 @@ class PostViewSet(viewsets.ModelViewSet):
         posts = Post.objects.select_related('author', 'category') \
                             .prefetch_related('tags', 'images', 'videos') \
                             .filter(author=request.user) \
+                            .defer('content') \
                             .order_by('-created_at')
 
         page = self.paginate_queryset(posts)
         if page is not None:
             serializer = PostListSerializer(
-                page, many=True, context={'request': request})
-            return self.get_paginated_response(serializer.data)
+                page, many=True,
+                context=liked_ids_context(request, Post, page))
+            return self.get_paginated_response(
+                merge_pending_views(serializer.data))
 
+        posts = list(posts)
         serializer = PostListSerializer(
-            posts, many=True, context={'request': request})
-        return Response(serializer.data)
+            posts, many=True, context=liked_ids_context(request, Post, posts))
+        return Response(merge_pending_views(serializer.data))
 
     @action(detail=False, methods=['get'])
     def by_tag(self, request):
@@ -220,12 +254,14 @@ class PostViewSet(viewsets.ModelViewSet):
         # Нормалізуємо тег (на всяк випадок)
         tag_name = tag_name.strip().lower()
 
-        cache_key = f"posts:by_tag:{tag_name}"
+        cache_key = make_key('posts:by_tag', tag_name,
+                             self._get_query_key(request))
 
         # Кешуємо тільки для публічних запитів
         cached = cache.get(cache_key)
         if cached is not None:
-            return Response(cached)
+            self._personalize(cached)
+            return Response(self._merge_views(cached))
 
         posts = self.get_queryset().filter(
             tags__name__iexact=tag_name,
@@ -236,17 +272,26 @@ class PostViewSet(viewsets.ModelViewSet):
 
         if page is not None:
             serializer = PostListSerializer(
-                page, many=True, context={'request': request})
+                page, many=True,
+                context=liked_ids_context(request, Post, page))
             response_data = self.get_paginated_response(serializer.data).data
         else:
+            posts = list(posts)
             serializer = PostListSerializer(
-                posts, many=True, context={'request': request})
+                posts, many=True,
+                context=liked_ids_context(request, Post, posts))
             response_data = serializer.data
 
         # Зберігаємо в кеш на 15 хвилин
         cache.set(cache_key, response_data, timeout=900)
 
-        return Response(response_data)
+        return Response(self._merge_views(response_data))
+
+    @staticmethod
+    def _merge_views(data):
+        rows = data['results'] if isinstance(data, dict) else data
+        merge_pending_views(rows)
+        return data
 
     def get_throttles(self):
         if self.action == 'create':
@@ -263,6 +308,7 @@ class BasePostMediaViewSet(viewsets.ModelViewSet):
     file_field_name = None
     max_items = None
     max_file_size = None
+    counter_field = None  # денормалізований лічильник на Post
 
     def get_post(self):
         return get_object_or_404(
@@ -315,6 +361,10 @@ class BasePostMediaViewSet(viewsets.ModelViewSet):
 
         self.serializer_class.Meta.model.objects.bulk_create(instances)
 
+        # bulk_create не викликає post_save — оновлюємо лічильник вручну
+        if self.counter_field:
+            Post.adjust_counter(post.pk, self.counter_field, len(instances))
+
     def create(self, request, *args, **kwargs):
         self.perform_create(None)
         return Response(
@@ -371,6 +421,7 @@ class PostImagesViewSet(BasePostMediaViewSet):
     serializer_class = PostImageSerializer
     file_field_name = 'image'
     max_items = 20
+    counter_field = 'images_count'
 
 
 class PostVideosViewSet(BasePostMediaViewSet):
@@ -393,47 +444,36 @@ def popular_posts(request):
     limit = request.query_params.get('limit', '')
     offset = request.query_params.get('offset', '0')
 
-    # Не кешуємо якщо є пошук
-    use_cache = not search
-    cache_key = f"popular:{sort}:{cat}:{limit}:{offset}"
+    # Пошук теж кешуємо: теги сторінки скидаються при зміні будь-якого поста
+    cache_key = f"popular:{sort}:{cat}:{limit}:{offset}:{search}"
 
-    if use_cache:
-        cached = cache.get(cache_key)
-        if cached:
-            return Response(cached)
+    cached = cache.get(cache_key)
+    if cached:
+        # Кеш спільний для всіх — is_liked поточного користувача поверх нього
+        overlay_is_liked(request, Post, cached['results'])
+        merge_pending_views(cached['results'])
+        return Response(cached)
 
     queryset = Post.objects.filter(status='published') \
         .select_related('author', 'category') \
         .prefetch_related('tags') \
-        .annotate(
-            likes_count_ann=Count('likes', distinct=True),
-            comments_count_ann=Count('comments', distinct=True),
-    )
+        .defer('content')
 
     if sort == 'hot':
-        queryset = queryset.annotate(
-            hot_score=ExpressionWrapper(
-                Cast(F('views_count'), FloatField()) * 0.45
-                + Cast(F('likes_count_ann'), FloatField()) * 2.8
-                + Cast(F('comments_count_ann'), FloatField()) * 4.2,
-                output_field=FloatField()
-            )
-        ).order_by('-hot_score')
+        # Матеріалізований hot_score — індексований ORDER BY ... LIMIT
+        queryset = queryset.order_by('-hot_score')
     elif sort == 'views':
         queryset = queryset.order_by('-views_count')
     elif sort == 'likes':
-        queryset = queryset.order_by('-likes_count_ann')
+        queryset = queryset.order_by('-likes_count')
     elif sort == 'comments':
-        queryset = queryset.order_by('-comments_count_ann')
+        queryset = queryset.order_by('-comments_count')
     else:
         queryset = queryset.order_by('-views_count')
 
     if search:
-        queryset = queryset.filter(
-            Q(title__icontains=search) |
-            Q(content__icontains=search) |
-            Q(tags__name__icontains=search)
-        ).distinct()
+        # Повнотекстовий індекс замість icontains; порядок — за sort
+        queryset = search_posts(queryset, search, order_by_rank=False)
 
     if cat:
         queryset = queryset.filter(category__slug=cat)
@@ -444,12 +484,13 @@ def popular_posts(request):
 
     page = paginator.paginate_queryset(queryset, request)
     serializer = PostListSerializer(
-        page, many=True, context={'request': request})
+        page, many=True, context=liked_ids_context(request, Post, page))
     response_data = paginator.get_paginated_response(serializer.data).data
 
-    if use_cache:
-        cache.set(cache_key, response_data, timeout=300)  # 5 хвилин
+    set_tagged(cache_key, response_data, 300,  # 5 хвилин
+               listing_tags('popular', cat, response_data['results']))
 
+    merge_pending_views(response_data['results'])
     return Response(response_data)
 
 
@@ -466,7 +507,8 @@ def trending_posts(request):
     cache_key = f"trending:{days}:{limit}:{cat}"
     cached = cache.get(cache_key)
     if cached:
-        return Response(cached)
+        overlay_is_liked(request, Post, cached)
+        return Response(merge_pending_views(cached))
 
     date_from = timezone.now() - timedelta(days=days)
 
@@ -475,23 +517,16 @@ def trending_posts(request):
         published_at__gte=date_from
     ).select_related('author', 'category') \
      .prefetch_related('tags') \
-     .annotate(
-         likes_count_ann=Count('likes', distinct=True),
-         comments_count_ann=Count('comments', distinct=True),
-         hot_score=ExpressionWrapper(
-             Cast(F('views_count'), FloatField()) * 0.45
-             + Cast(F('likes_count_ann'), FloatField()) * 2.8
-             + Cast(F('comments_count_ann'), FloatField()) * 4.2,
-             output_field=FloatField()
-         )
-    ).order_by('-hot_score')
+     .defer('content') \
+     .order_by('-trending_score')
 
     if cat:
         posts = posts.filter(category__slug=cat)
 
-    posts = posts[:limit]
+    posts = list(posts[:limit])
 
     serializer = PostListSerializer(
-        posts, many=True, context={'request': request})
-    cache.set(cache_key, serializer.data, timeout=600)  # 10 хвилин
-    return Response(serializer.data)
+        posts, many=True, context=liked_ids_context(request, Post, posts))
+    set_tagged(cache_key, serializer.data, 600,  # 10 хвилин
+               listing_tags('trending', cat, serializer.data))
+    return Response(merge_pending_views(serializer.data))
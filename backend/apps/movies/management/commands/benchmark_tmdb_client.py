@@ -0,0 +1,129 @@
+import asyncio
+import json
+import logging
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from django.core.management.base import BaseCommand
+
+from apps.movies.services.tmdb_client import TMDBClient, AsyncTMDBClient, HTTP2_AVAILABLE
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Імітація TMDB: невелика JSON-відповідь з keep-alive (HTTP/1.1)"""
+    protocol_version = 'HTTP/1.1'
+    # Заголовки й тіло пишуться окремо — без TCP_NODELAY Nagle + delayed ACK
+    # додають ~40 мс саме повторно використаним з'єднанням
+    disable_nagle_algorithm = True
+    delay = 0.0
+    body = json.dumps({
+        'page': 1,
+        'results': [{'id': i, 'title': f'Movie {i}', 'poster_path': f'/{i}.jpg'}
+                    for i in range(20)],
+    }).encode()
+
+    def do_GET(self):
+        if self.delay:
+            time.sleep(self.delay)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256   # інакше async-сплеск упирається в backlog=5
+
+
+class Command(BaseCommand):
+    help = (
+        'Порівнює затримку запитів до TMDB: новий httpx.Client на кожен виклик '
+        '(як було) проти пулу з\'єднань (sync) і AsyncClient з паралельними '
+        'запитами. Працює проти локального stub-сервера, без мережі й кешу.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=20,
+                            help='Паралельних запитів для async-варіанту')
+        parser.add_argument('--delay-ms', type=float, default=0.0,
+                            help='Штучна затримка відповіді stub-сервера')
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        _StubHandler.delay = options['delay_ms'] / 1000
+
+        logging.getLogger('httpx').setLevel(logging.WARNING)
+        server = _StubServer(('127.0.0.1', 0), _StubHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f'http://127.0.0.1:{server.server_address[1]}/3'
+
+        try:
+            rows = [
+                ('новий Client на виклик', *self._per_call(base_url, total)),
+                ('пул, sync', *self._pooled(base_url, total)),
+                (f'пул, async x{options["concurrency"]}',
+                 *asyncio.run(self._async(base_url, total, options['concurrency']))),
+            ]
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.stdout.write(f'HTTP/2: {"так" if HTTP2_AVAILABLE else "ні (немає h2)"}; '
+                          f'stub — HTTP/1.1 без TLS, тож виграш лише від TCP і створення клієнта')
+        self.stdout.write(f"{'варіант':<24} | {'медіана, мс':>11} | {'p95, мс':>8} | {'запитів/с':>9}")
+        for name, latencies, elapsed in rows:
+            latencies.sort()
+            p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+            self.stdout.write(
+                f'{name:<24} | {statistics.median(latencies):>11.2f} | '
+                f'{p95:>8.2f} | {len(latencies) / elapsed:>9.0f}')
+
+    @staticmethod
+    def _timed(fn, total):
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(total):
+            t = time.perf_counter()
+            fn()
+            latencies.append((time.perf_counter() - t) * 1000)
+        return latencies, time.perf_counter() - started
+
+    def _per_call(self, base_url, total):
+        def fetch():
+            # Так працював TMDBClient._get до пулу
+            with httpx.Client(timeout=10.0) as client:
+                client.get(f'{base_url}/trending/movie/week').raise_for_status()
+        return self._timed(fetch, total)
+
+    def _pooled(self, base_url, total):
+        client = TMDBClient(base_url=base_url, api_key='bench')
+        try:
+            return self._timed(lambda: client._get('/trending/movie/week'), total)
+        finally:
+            client.close()
+
+    async def _async(self, base_url, total, concurrency):
+        client = AsyncTMDBClient(base_url=base_url, api_key='bench')
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+
+        async def fetch():
+            async with semaphore:
+                t = time.perf_counter()
+                await client._aget('/trending/movie/week')
+                latencies.append((time.perf_counter() - t) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(fetch() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+        await client.aclose()
+        return latencies, elapsed
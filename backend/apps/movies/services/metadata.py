@@ -0,0 +1,107 @@
+"""
+Легкий кеш метаданих TMDB: (media_type, id) → (title, poster_path).
+
+Наповнюється з кожної відповіді, що проходить через клієнт (пошук, списки,
+тренди, деталі, рекомендації), тож запис у вотчліст / обране / оцінки
+зазвичай обходиться без запиту до TMDB.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+
+META_TIMEOUT = 7 * 86400
+MEDIA_TYPES = ('movie', 'tv')
+# Кожен промах — запит до TMDB у потоці запиту: тримаємо fan-out малим
+PREFETCH_MAX_IDS = 20
+PREFETCH_WORKERS = 4
+
+# Вкладені колекції: ключ → (тип за замовчуванням або None — як у батька, списки)
+_NESTED = {
+    'similar': (None, ('results',)),
+    'recommendations': (None, ('results',)),
+    'movie_credits': ('movie', ('cast', 'crew')),
+    'tv_credits': ('tv', ('cast', 'crew')),
+}
+
+
+def meta_key(media_type, tmdb_id):
+    return f"tmdb:meta:{media_type}:{tmdb_id}"
+
+
+def _media_type_for(endpoint):
+    """/movie/123, /discover/tv, /trending/movie/week → тип; /search/multi → None"""
+    for part in endpoint.strip('/').split('/'):
+        if part in MEDIA_TYPES:
+            return part
+    return None
+
+
+def extract(endpoint, payload):
+    """{ключ: (title, poster_path)} для всіх фільмів / серіалів у відповіді"""
+    found = {}
+
+    def walk(node, media_type, lists):
+        if not isinstance(node, dict):
+            return
+        item_type = node.get('media_type') or media_type
+        title = node.get('title') or node.get('name')
+        if item_type in MEDIA_TYPES and node.get('id') and title:
+            found[meta_key(item_type, node['id'])] = (title, node.get('poster_path') or '')
+
+        for key in lists:
+            for item in node.get(key) or []:
+                walk(item, media_type, ())
+        for key, (nested_type, nested_lists) in _NESTED.items():
+            walk(node.get(key), nested_type or media_type, nested_lists)
+
+    walk(payload, _media_type_for(endpoint), ('results',))
+    return found
+
+
+def remember(endpoint, payload):
+    found = extract(endpoint, payload)
+    if found:
+        cache.set_many(found, timeout=META_TIMEOUT)
+
+
+async def aremember(endpoint, payload):
+    found = extract(endpoint, payload)
+    if found:
+        await cache.aset_many(found, timeout=META_TIMEOUT)
+
+
+def get_many(tmdb_ids, media_type='movie'):
+    """{id: {'title', 'poster_path'}} лише для знайдених у кеші"""
+    keys = {meta_key(media_type, tmdb_id): tmdb_id for tmdb_id in tmdb_ids}
+    return {
+        keys[key]: {'title': title, 'poster_path': poster_path}
+        for key, (title, poster_path) in cache.get_many(keys).items()
+    }
+
+
+def prefetch(tmdb_ids, media_type='movie'):
+    """
+    Метадані для багатьох id: спершу кеш, відсутні — паралельно легкими
+    запитами /{media_type}/{id} (без append_to_response) через пул клієнта.
+    """
+    from .tmdb_client import tmdb
+
+    found = get_many(tmdb_ids, media_type)
+    missing = [tmdb_id for tmdb_id in tmdb_ids if tmdb_id not in found]
+    if not missing:
+        return found
+
+    def fetch(tmdb_id):
+        endpoint = f"/{media_type}/{tmdb_id}"
+        data = tmdb._get(endpoint)
+        if data:
+            remember(endpoint, data)
+        return data
+
+    if len(missing) == 1:
+        fetch(missing[0])
+    else:
+        with ThreadPoolExecutor(max_workers=min(len(missing), PREFETCH_WORKERS)) as pool:
+            list(pool.map(fetch, missing))
+    found.update(get_many(missing, media_type))
+    return found
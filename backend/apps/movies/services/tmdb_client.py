@@ -1,46 +1,161 @@
+import asyncio
+import importlib.util
+import threading
+import time
+import weakref
+
 import httpx
 from django.conf import settings
 from django.core.cache import cache
 import logging
 
+from . import metadata
+
 logger = logging.getLogger(__name__)
 
 TMDB_BASE_URL = "https://api.themoviedb.org/3"
 TMDB_IMAGE_BASE = "https://image.tmdb.org/t/p"
 
+# HTTP/2 — лише якщо встановлено h2 (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Single-flight: поки один воркер ходить у TMDB за ключем, решта недовго
+# чекають на його результат (або віддають застаріле значення)
+LOCK_POLL_INTERVAL = 0.05
+
+
+def _lock_timeout():
+    # Довше за таймаут запиту — замок не зникне посеред чужого запиту
+    return getattr(settings, 'TMDB_TIMEOUT', 10.0) + 5
+
+
+def _lock_wait():
+    # Очікувач тримає потік gunicorn — чекаємо недовго і без власного запиту
+    return getattr(settings, 'TMDB_LOCK_WAIT', 2.0)
+
+
+def _pack(data, timeout):
+    """Значення в кеші: (свіже до, дані); живе ще TMDB_STALE_TTL після цього"""
+    return (time.time() + timeout, data)
+
+
+def _unpack(entry):
+    """(дані, чи свіжі)"""
+    if entry is None:
+        return None, False
+    if isinstance(entry, tuple):
+        fresh_until, data = entry
+        return data, time.time() < fresh_until
+    return entry, True   # запис старого формату — просто дані
+
+
+def _stale_ttl():
+    return getattr(settings, 'TMDB_STALE_TTL', 6 * 3600)
+
 
 class TMDBClient:
-    def __init__(self):
-        self.api_key = getattr(settings, 'TMDB_API_KEY', '')
-        self.base_url = TMDB_BASE_URL
+    """
+    Клієнт TMDB з одним довгоживучим пулом з'єднань на процес:
+    keep-alive замість нового TCP/TLS-рукостискання на кожен промах кешу.
+    Усі запити йдуть на один хост, тож ліміти пулу — це ліміти на хост.
+    """
+
+    def __init__(self, base_url: str = TMDB_BASE_URL, api_key: str | None = None):
+        self.api_key = api_key if api_key is not None else getattr(settings, 'TMDB_API_KEY', '')
+        self.base_url = base_url
         self.language = "uk-UA"
+        self._client = None
+        self._client_lock = threading.Lock()
 
-    def _get(self, endpoint: str, params: dict = None) -> dict | None:
-        if params is None:
-            params = {}
+    def _client_options(self) -> dict:
+        return {
+            "timeout": getattr(settings, 'TMDB_TIMEOUT', 10.0),
+            "http2": HTTP2_AVAILABLE,
+            "limits": httpx.Limits(
+                max_connections=getattr(settings, 'TMDB_MAX_CONNECTIONS', 20),
+                max_keepalive_connections=getattr(settings, 'TMDB_MAX_KEEPALIVE', 10),
+                keepalive_expiry=getattr(settings, 'TMDB_KEEPALIVE_EXPIRY', 30.0),
+            ),
+        }
+
+    @property
+    def client(self) -> httpx.Client:
+        """httpx.Client потокобезпечний — один на всі потоки процесу"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = httpx.Client(**self._client_options())
+        return self._client
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def _prepare(self, endpoint: str, params: dict | None) -> tuple[str, dict]:
+        params = dict(params or {})
         params["api_key"] = self.api_key
         params.setdefault("language", self.language)
+        return f"{self.base_url}{endpoint}", params
+
+    @staticmethod
+    def _parse(response: httpx.Response, endpoint: str) -> dict | None:
         try:
-            with httpx.Client(timeout=10.0) as client:
-                response = client.get(
-                    f"{self.base_url}{endpoint}", params=params)
-                response.raise_for_status()
-                return response.json()
+            response.raise_for_status()
         except httpx.HTTPStatusError as e:
             logger.error(f"TMDB HTTP {e.response.status_code}: {endpoint}")
             return None
+        return response.json()
+
+    def _get(self, endpoint: str, params: dict = None) -> dict | None:
+        url, params = self._prepare(endpoint, params)
+        try:
+            return self._parse(self.client.get(url, params=params), endpoint)
         except httpx.RequestError as e:
             logger.error(f"TMDB request error: {e}")
             return None
 
     def _cached_get(self, cache_key, endpoint, params=None, timeout=3600):
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return cached
-        data = self._get(endpoint, params)
-        if data:
-            cache.set(cache_key, data, timeout)
-        return data
+        """
+        Кеш зі stale-while-revalidate і single-flight через Redis-замок:
+        - свіже значення — одразу;
+        - застаріле — оновлює лише власник замка, решта отримують старе;
+        - промах — у TMDB іде один запит, решта недовго чекають на його
+          результат (див. _wait_for).
+        """
+        data, fresh = _unpack(cache.get(cache_key))
+        if fresh:
+            return data
+
+        lock_key = f"{cache_key}:lock"
+        if cache.add(lock_key, 1, _lock_timeout()):
+            try:
+                fetched = self._get(endpoint, params)
+                if fetched:
+                    cache.set(cache_key, _pack(fetched, timeout), timeout + _stale_ttl())
+                    metadata.remember(endpoint, fetched)
+                return fetched or data   # TMDB недоступний — краще старе, ніж нічого
+            finally:
+                cache.delete(lock_key)
+
+        if data is not None:
+            return data
+        return self._wait_for(cache_key, lock_key)
+
+    def _wait_for(self, cache_key, lock_key):
+        """
+        Чекаємо результат власника замка не довше TMDB_LOCK_WAIT.
+        Не дочекались — None (view віддає 503), а не власний запит у TMDB.
+        """
+        deadline = time.monotonic() + _lock_wait()
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            data, _ = _unpack(cache.get(cache_key))
+            if data is not None:
+                return data
+            if not cache.has_key(lock_key):
+                return None   # власник не отримав відповідь від TMDB
+        return None
 
     # ─── Пошук ────────────────────────────────────────────────────────────────
 
@@ -139,7 +254,10 @@ class TMDBClient:
         return self._cached_get(cache_key, f"/genre/{media_type}/list", timeout=86400)
 
     def discover(self, media_type='movie', **filters) -> dict | None:
-        cache_key = f"tmdb:discover:{media_type}:{hash(frozenset(filters.items()))}"
+        # Детермінований ключ: hash() рядків різний у кожному процесі,
+        # а single-flight працює лише зі спільним ключем
+        query = "&".join(f"{k}={v}" for k, v in sorted(filters.items()))
+        cache_key = f"tmdb:discover:{media_type}:{query}"
         return self._cached_get(cache_key, f"/discover/{media_type}", filters, 1800)
 
     def get_recommendations(self, item_id: int, media_type='movie') -> dict | None:
@@ -153,4 +271,90 @@ class TMDBClient:
         return f"{TMDB_IMAGE_BASE}/{size}{path}"
 
 
+class AsyncTMDBClient(TMDBClient):
+    """
+    Той самий набір методів, але _cached_get — корутина, тож
+    `await atmdb.get_trending(...)` працює без дублювання методів.
+    httpx.AsyncClient прив'язаний до event loop — пул на кожен loop
+    (під ASGI це один loop на воркер).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._async_clients = weakref.WeakKeyDictionary()
+        # Запити в дорозі: {loop: {cache_key: Task}} — дедуплікація в процесі
+        self._inflight = weakref.WeakKeyDictionary()
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(**self._client_options())
+            self._async_clients[loop] = client
+        return client
+
+    async def aclose(self):
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    async def _aget(self, endpoint: str, params: dict = None) -> dict | None:
+        url, params = self._prepare(endpoint, params)
+        try:
+            response = await self.async_client.get(url, params=params)
+            return self._parse(response, endpoint)
+        except httpx.RequestError as e:
+            logger.error(f"TMDB request error: {e}")
+            return None
+
+    async def _cached_get(self, cache_key, endpoint, params=None, timeout=3600):
+        """
+        Те саме, що TMDBClient._cached_get, плюс дедуплікація в процесі:
+        корутини з однаковим ключем чекають одну задачу, і лише вона
+        бере Redis-замок (між процесами).
+        """
+        data, fresh = _unpack(await cache.aget(cache_key))
+        if fresh:
+            return data
+
+        inflight = self._inflight.setdefault(asyncio.get_running_loop(), {})
+        task = inflight.get(cache_key)
+        if task is not None:
+            # Хтось у цьому процесі вже оновлює — старе або чекаємо
+            return data if data is not None else await asyncio.shield(task)
+
+        task = asyncio.ensure_future(
+            self._arefresh(cache_key, endpoint, params, timeout, data))
+        inflight[cache_key] = task
+        task.add_done_callback(lambda _: inflight.pop(cache_key, None))
+        return await asyncio.shield(task)
+
+    async def _arefresh(self, cache_key, endpoint, params, timeout, stale):
+        lock_key = f"{cache_key}:lock"
+        if await cache.aadd(lock_key, 1, _lock_timeout()):
+            try:
+                fetched = await self._aget(endpoint, params)
+                if fetched:
+                    await cache.aset(cache_key, _pack(fetched, timeout),
+                                     timeout + _stale_ttl())
+                    await metadata.aremember(endpoint, fetched)
+                return fetched or stale
+            finally:
+                await cache.adelete(lock_key)
+
+        if stale is not None:
+            return stale
+        deadline = time.monotonic() + _lock_wait()
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            data, _ = _unpack(await cache.aget(cache_key))
+            if data is not None:
+                return data
+            if not await cache.ahas_key(lock_key):
+                return None
+        return None
+
+
 tmdb = TMDBClient()
+atmdb = AsyncTMDBClient()
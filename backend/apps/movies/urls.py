@@ -1,16 +1,23 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+
+def _proxy(view):
+    """Під ASGI з TMDB_ASYNC_VIEWS — async-варіант на пулі httpx.AsyncClient"""
+    return view.as_async if settings.TMDB_ASYNC_VIEWS else view
+
+
 urlpatterns = [
     # ── Пошук ──────────────────────────────────────────────────────────────────
     # Єдиний multi-search (фільми + серіали + персони)
-    path('search/',                   views.multi_search,
+    path('search/',                   _proxy(views.multi_search),
          name='multi-search'),
 
     # ── Персони ────────────────────────────────────────────────────────────────
     # ВАЖЛИВО: persons/<id>/ має бути ДО <int:movie_id>/
     path('persons/<int:person_id>/',
-         views.person_detail,          name='person-detail'),
+         _proxy(views.person_detail),          name='person-detail'),
 
     # ── Списки юзера (me/*) — ДО <int:movie_id>/ ──────────────────────────────
     path('me/watchlist/',
@@ -27,21 +34,23 @@ urlpatterns = [
          views.user_ratings,   name='user-ratings'),
 
     # ── TMDB proxy ─────────────────────────────────────────────────────────────
-    path('trending/',                 views.movie_trending,
+    path('meta/',                     views.movie_metadata,
+         name='movie-metadata'),
+    path('trending/',                 _proxy(views.movie_trending),
          name='movie-trending'),
-    path('genres/',                   views.movie_genres,
+    path('genres/',                   _proxy(views.movie_genres),
          name='movie-genres'),
-    path('discover/',                 views.movie_discover,
+    path('discover/',                 _proxy(views.movie_discover),
          name='movie-discover'),
-    path('popular/',                  views.movie_list_by_category,
+    path('popular/',                  _proxy(views.movie_list_by_category),
          {'category': 'popular'},     name='movie-popular'),
-    path('top_rated/',                views.movie_list_by_category,
+    path('top_rated/',                _proxy(views.movie_list_by_category),
          {'category': 'top_rated'},   name='movie-top-rated'),
-    path('now_playing/',              views.movie_list_by_category,
+    path('now_playing/',              _proxy(views.movie_list_by_category),
          {'category': 'now_playing'}, name='movie-now-playing'),
-    path('on_the_air/',               views.movie_list_by_category,
+    path('on_the_air/',               _proxy(views.movie_list_by_category),
          {'category': 'on_the_air'},  name='movie-on-the-air'),
-    path('upcoming/',                 views.movie_list_by_category,
+    path('upcoming/',                 _proxy(views.movie_list_by_category),
          {'category': 'upcoming'},    name='movie-upcoming'),
 
     # ── Конкретний фільм/серіал — ОСТАННІМ бо <int:movie_id>/ жре все ─────────
@@ -54,5 +63,5 @@ urlpatterns = [
     path('<int:movie_id>/rate/',
          views.movie_rating,         name='movie-rating'),
     path('<int:movie_id>/recommendations/',
-         views.movie_recommendations, name='movie-recommendations'),
+         _proxy(views.movie_recommendations), name='movie-recommendations'),
 ]
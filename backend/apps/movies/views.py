@@ -1,54 +1,139 @@
-from rest_framework import generics, permissions
+import logging
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from rest_framework import exceptions, generics, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
+from django.views.decorators.csrf import csrf_exempt
 
-from .services.tmdb_client import tmdb
+from apps.core.params import parse_id_list
+from .services import metadata
+from .services.tmdb_client import tmdb, atmdb
 from .models import WatchlistItem, MovieRating, FavoriteMovie
 from .serializers import WatchlistSerializer, MovieRatingSerializer, FavoriteMovieSerializer
 
+logger = logging.getLogger(__name__)
+
 User = get_user_model()
 
 
-# ─── Хелпер: отримати дані фільму/серіалу з TMDB ─────────────────────────────
+# ─── Хелпер: title і poster_path фільму/серіалу ──────────────────────────────
 def _fetch_item_data(tmdb_id: int, media_type: str = 'movie') -> dict:
-    """Отримує title і poster_path з TMDB. Гарантує що poster_path ніколи не None."""
+    """
+    title і poster_path з кешу метаданих (наповнюється відповідями проксі),
+    інакше — легкий запит до TMDB. Гарантує що poster_path ніколи не None.
+    """
+    # media_type стає частиною шляху до TMDB — лише відомі типи
+    if media_type not in metadata.MEDIA_TYPES:
+        media_type = 'movie'
     try:
-        if media_type == 'tv':
-            data = tmdb.get_tv(tmdb_id)
-            return {
-                'title': (data.get('name') or '') if data else '',
-                'poster_path': (data.get('poster_path') or '') if data else '',
-            }
-        data = tmdb.get_movie(tmdb_id)
-        return {
-            'title': (data.get('title') or '') if data else '',
-            'poster_path': (data.get('poster_path') or '') if data else '',
-        }
-    except Exception:
-        return {'title': '', 'poster_path': ''}
+        meta = metadata.prefetch([tmdb_id], media_type).get(tmdb_id)
+    except Exception as e:
+        # Збій TMDB/кешу чи дивна відповідь не повинні ламати запис у список
+        logger.warning(f"TMDB metadata unavailable for {media_type}/{tmdb_id}: {e}")
+        meta = None
+    return meta or {'title': '', 'poster_path': ''}
+
+
+def _request_media_type(request) -> str:
+    media_type = request.data.get(
+        'media_type', request.query_params.get('media_type', 'movie'))
+    if media_type not in metadata.MEDIA_TYPES:
+        media_type = 'movie'
+    return media_type
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# TMDB PROXY — sync (DRF) і async (ASGI) варіанти з одного тіла
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _drf_initial(view, request, kwargs):
+    """
+    Автентифікація, дозволи й ліміти для async-view — тим самим DRF-view
+    (APIView.initial з його permission/throttle-класами), у потоці, бо вони
+    синхронні. Повертає (APIView, DRF Request, готова відповідь-відмова або None).
+    """
+    api = view.cls(**view.initkwargs)
+    api.setup(request, **kwargs)
+    drf_request = api.initialize_request(request, **kwargs)
+    api.request = drf_request
+    api.headers = api.default_response_headers
+    try:
+        api.initial(drf_request)
+        if not hasattr(api, drf_request.method.lower()):
+            raise exceptions.MethodNotAllowed(drf_request.method)
+    except Exception as exc:
+        return api, drf_request, _finalize(api, drf_request, api.handle_exception(exc))
+    return api, drf_request, None
+
+
+def _finalize(api, drf_request, response):
+    return api.finalize_response(drf_request, response).render()
+
+
+def tmdb_proxy(error_message='TMDB API недоступний', error_status=503):
+    """
+    Тіло view отримує (клієнт, query params, **kwargs) і повертає виклик
+    клієнта або Response з помилкою валідації. Декоратор будує:
+      - sync DRF view на пулі httpx.Client (WSGI, за замовчуванням);
+      - view.as_async на пулі httpx.AsyncClient (ASGI, TMDB_ASYNC_VIEWS):
+        перевірки й рендеринг — того ж DRF-view, запит до TMDB — async.
+    """
+    def decorator(handler):
+        @api_view(['GET'])
+        @permission_classes([permissions.AllowAny])
+        @wraps(handler)
+        def view(request, **kwargs):
+            result = handler(tmdb, request.query_params, **kwargs)
+            if isinstance(result, Response):
+                return result
+            if result is None:
+                return Response({'error': error_message}, status=error_status)
+            return Response(result)
+
+        @csrf_exempt
+        @wraps(handler)
+        async def async_view(request, **kwargs):
+            api, drf_request, denied = await sync_to_async(_drf_initial)(
+                view, request, kwargs)
+            if denied is not None:
+                return denied
+
+            try:
+                result = handler(atmdb, drf_request.query_params, **kwargs)
+                if not isinstance(result, Response):
+                    data = await result
+                    result = Response(data) if data is not None else \
+                        Response({'error': error_message}, status=error_status)
+            except Exception as exc:
+                # Як у sync-варіанті: помилки — відповіддю DRF, а не 500 Django
+                result = api.handle_exception(exc)
+            # JSONRenderer не ходить у БД — рендеримо в циклі подій
+            return _finalize(api, drf_request, result)
+
+        view.as_async = async_view
+        return view
+    return decorator
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # TMDB PROXY — фільми і серіали
 # ═══════════════════════════════════════════════════════════════════════════════
 
-@api_view(['GET'])
-@permission_classes([permissions.AllowAny])
-def multi_search(request):
+@tmdb_proxy()
+def multi_search(client, params):
     """
     GET /api/v1/movies/search/?q=том+хенкс&page=1
     Єдиний пошук — повертає фільми, серіали і персони.
     Кожен елемент має поле media_type: "movie" | "tv" | "person"
     """
-    q = request.query_params.get('q', '').strip()
-    page = int(request.query_params.get('page', 1))
+    q = params.get('q', '').strip()
+    page = int(params.get('page', 1))
     if not q:
         return Response({'error': "Параметр 'q' обов'язковий"}, status=400)
-    data = tmdb.multi_search(q, page=page)
-    if data is None:
-        return Response({'error': 'TMDB API недоступний'}, status=503)
-    return Response(data)
+    return client.multi_search(q, page=page)
 
 
 @api_view(['GET'])
@@ -75,45 +160,34 @@ def movie_detail(request, movie_id):
     return Response({**data, 'user_state': user_state})
 
 
-@api_view(['GET'])
-@permission_classes([permissions.AllowAny])
-def movie_trending(request):
-    media_type = request.query_params.get('media_type', 'movie')
-    time_window = request.query_params.get('time_window', 'week')
+@tmdb_proxy()
+def movie_trending(client, params):
+    media_type = params.get('media_type', 'movie')
+    time_window = params.get('time_window', 'week')
     if media_type not in ('movie', 'tv', 'all'):
         media_type = 'movie'
-    data = tmdb.get_trending(media_type=media_type, time_window=time_window)
-    if data is None:
-        return Response({'error': 'TMDB API недоступний'}, status=503)
-    return Response(data)
+    return client.get_trending(media_type=media_type, time_window=time_window)
 
 
-@api_view(['GET'])
-@permission_classes([permissions.AllowAny])
-def movie_genres(request):
-    media_type = request.query_params.get('media_type', 'movie')
+@tmdb_proxy()
+def movie_genres(client, params):
+    media_type = params.get('media_type', 'movie')
     if media_type not in ('movie', 'tv'):
         media_type = 'movie'
-    data = tmdb.get_genres(media_type=media_type)
-    if data is None:
-        return Response({'error': 'TMDB API недоступний'}, status=503)
-    return Response(data)
+    return client.get_genres(media_type=media_type)
 
 
-@api_view(['GET'])
-@permission_classes([permissions.AllowAny])
-def movie_discover(request):
-    media_type = request.query_params.get('media_type', 'movie')
+@tmdb_proxy()
+def movie_discover(client, params):
+    media_type = params.get('media_type', 'movie')
     if media_type not in ('movie', 'tv'):
         media_type = 'movie'
 
-    qp = request.query_params
-
     allowed_simple = [
         'with_genres', 'primary_release_year', 'first_air_date_year',
         'sort_by', 'page', 'with_original_language', 'vote_count_gte',
     ]
-    filters = {k: qp[k] for k in allowed_simple if k in qp}
+    filters = {k: params[k] for k in allowed_simple if k in params}
 
     dot_params = {
         'vote_average_gte':         'vote_average.gte',
@@ -124,64 +198,48 @@ def movie_discover(request):
         'first_air_date_lte':       'first_air_date.lte',
     }
     for frontend_key, tmdb_key in dot_params.items():
-        if frontend_key in qp:
-            filters[tmdb_key] = qp[frontend_key]
+        if frontend_key in params:
+            filters[tmdb_key] = params[frontend_key]
 
-    data = tmdb.discover(media_type=media_type, **filters)
-    if data is None:
-        return Response({'error': 'TMDB API недоступний'}, status=503)
-    return Response(data)
+    return client.discover(media_type=media_type, **filters)
 
 
-@api_view(['GET'])
-@permission_classes([permissions.AllowAny])
-def movie_recommendations(request, movie_id):
-    media_type = request.query_params.get('media_type', 'movie')
-    data = tmdb.get_recommendations(movie_id, media_type=media_type)
-    if data is None:
-        return Response({'error': 'TMDB API недоступний'}, status=503)
-    return Response(data)
+@tmdb_proxy()
+def movie_recommendations(client, params, movie_id):
+    media_type = params.get('media_type', 'movie')
+    return client.get_recommendations(movie_id, media_type=media_type)
 
 
-@api_view(['GET'])
-@permission_classes([permissions.AllowAny])
-def movie_list_by_category(request, category):
-    page = int(request.query_params.get('page', 1))
-    media_type = request.query_params.get('media_type', 'movie')
+@tmdb_proxy()
+def movie_list_by_category(client, params, category):
+    page = int(params.get('page', 1))
+    media_type = params.get('media_type', 'movie')
 
     handlers = {
-        'popular': lambda: tmdb.get_popular(page=page, media_type=media_type),
-        'top_rated': lambda: tmdb.get_top_rated(page=page, media_type=media_type),
-        'upcoming': lambda: tmdb.get_upcoming(page=page),
-        'now_playing': lambda: tmdb.get_now_playing(page=page),
-        'on_the_air': lambda: tmdb.get_on_the_air(page=page),
+        'popular': lambda: client.get_popular(page=page, media_type=media_type),
+        'top_rated': lambda: client.get_top_rated(page=page, media_type=media_type),
+        'upcoming': lambda: client.get_upcoming(page=page),
+        'now_playing': lambda: client.get_now_playing(page=page),
+        'on_the_air': lambda: client.get_on_the_air(page=page),
     }
 
     handler = handlers.get(category)
     if not handler:
         return Response({'error': f'Невідома категорія: {category}'}, status=400)
-
-    data = handler()
-    if data is None:
-        return Response({'error': 'TMDB API недоступний'}, status=503)
-    return Response(data)
+    return handler()
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # ПЕРСОНИ (актори, режисери, etc.)
 # ═══════════════════════════════════════════════════════════════════════════════
 
-@api_view(['GET'])
-@permission_classes([permissions.AllowAny])
-def person_detail(request, person_id):
+@tmdb_proxy(error_message='Персону не знайдено', error_status=404)
+def person_detail(client, params, person_id):
     """
     GET /api/v1/movies/persons/<person_id>/
     Повна інформація про персону: біографія, фото, movie_credits, tv_credits
     """
-    data = tmdb.get_person(person_id)
-    if data is None:
-        return Response({'error': 'Персону не знайдено'}, status=404)
-    return Response(data)
+    return client.get_person(person_id)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -191,44 +249,46 @@ def person_detail(request, person_id):
 @api_view(['POST', 'DELETE'])
 @permission_classes([permissions.IsAuthenticated])
 def toggle_watchlist(request, movie_id):
-    media_type = request.data.get(
-        'media_type', request.query_params.get('media_type', 'movie'))
+    media_type = _request_media_type(request)
+
+    # Метадані потрібні лише при додаванні
+    deleted, _ = WatchlistItem.objects.filter(
+        user=request.user, tmdb_id=movie_id, media_type=media_type).delete()
+    if deleted:
+        return Response({'in_watchlist': False})
 
-    item, created = WatchlistItem.objects.get_or_create(
+    WatchlistItem.objects.get_or_create(
         user=request.user,
         tmdb_id=movie_id,
         media_type=media_type,
         defaults=_fetch_item_data(movie_id, media_type)
     )
-    if not created:
-        item.delete()
-        return Response({'in_watchlist': False})
     return Response({'in_watchlist': True}, status=201)
 
 
 @api_view(['POST', 'DELETE'])
 @permission_classes([permissions.IsAuthenticated])
 def toggle_favorite(request, movie_id):
-    media_type = request.data.get(
-        'media_type', request.query_params.get('media_type', 'movie'))
+    media_type = _request_media_type(request)
+
+    deleted, _ = FavoriteMovie.objects.filter(
+        user=request.user, tmdb_id=movie_id, media_type=media_type).delete()
+    if deleted:
+        return Response({'is_favorite': False})
 
-    item, created = FavoriteMovie.objects.get_or_create(
+    FavoriteMovie.objects.get_or_create(
         user=request.user,
         tmdb_id=movie_id,
         media_type=media_type,
         defaults=_fetch_item_data(movie_id, media_type)
     )
-    if not created:
-        item.delete()
-        return Response({'is_favorite': False})
     return Response({'is_favorite': True}, status=201)
 
 
 @api_view(['POST', 'PUT', 'DELETE'])
 @permission_classes([permissions.IsAuthenticated])
 def movie_rating(request, movie_id):
-    media_type = request.data.get(
-        'media_type', request.query_params.get('media_type', 'movie'))
+    media_type = _request_media_type(request)
 
     if request.method == 'DELETE':
         MovieRating.objects.filter(
@@ -246,22 +306,48 @@ def movie_rating(request, movie_id):
     except (ValueError, TypeError):
         return Response({'error': 'Рейтинг має бути числом від 1 до 10'}, status=400)
 
-    item_data = _fetch_item_data(movie_id, media_type)
+    defaults = {'rating': rating, 'review': request.data.get('review', '')}
+
+    # Оновлення оцінки з уже відомою назвою — без метаданих
+    existing = MovieRating.objects.filter(
+        user=request.user, tmdb_id=movie_id, media_type=media_type).first()
+    if existing is not None and existing.title:
+        for field, value in defaults.items():
+            setattr(existing, field, value)
+        existing.save(update_fields=[*defaults, 'updated_at'])
+        return Response({'user_rating': existing.rating}, status=200)
 
     obj, created = MovieRating.objects.update_or_create(
         user=request.user,
         tmdb_id=movie_id,
         media_type=media_type,
-        defaults={
-            'rating': rating,
-            'review': request.data.get('review', ''),
-            'title': item_data['title'],
-            'poster_path': item_data['poster_path'],
-        }
+        defaults={**defaults, **_fetch_item_data(movie_id, media_type)}
     )
     return Response({'user_rating': obj.rating}, status=201 if created else 200)
 
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def movie_metadata(request):
+    """
+    GET /api/v1/movies/meta/?ids=550,680&media_type=movie
+    title і poster_path для багатьох id: з кешу метаданих, відсутні —
+    паралельними легкими запитами до TMDB. Лише для авторизованих:
+    кожен промах — запит до TMDB.
+    """
+    media_type = request.query_params.get('media_type', 'movie')
+    if media_type not in metadata.MEDIA_TYPES:
+        media_type = 'movie'
+
+    ids = parse_id_list(request.query_params.get('ids'),
+                        metadata.PREFETCH_MAX_IDS, 'ids')
+    if not ids:
+        return Response({'error': "Параметр 'ids' обов'язковий"}, status=400)
+
+    found = metadata.prefetch(ids, media_type)
+    return Response({str(tmdb_id): found.get(tmdb_id) for tmdb_id in ids})
+
+
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def user_watchlist(request, username):
@@ -0,0 +1,150 @@
+import queue
+import random
+import statistics
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+
+from apps.polls.models import Poll, PollOption, PollVote
+from apps.polls.services import voting
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Навантажувальний тест голосування: тисячі паралельних голосів '
+        '(з переголосуванням і відкликанням) в одне опитування, потім '
+        'звірка лічильників з фактичними голосами. Дані видаляються після '
+        'тесту. Реальну конкурентність дає PostgreSQL; SQLite серіалізує записи.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--voters', type=int, default=2000)
+        parser.add_argument('--options', type=int, default=5)
+        parser.add_argument('--workers', type=int, default=32)
+        parser.add_argument('--revotes', type=float, default=0.3,
+                            help='Частка голосувальників, що змінюють вибір')
+        parser.add_argument('--multiple', action='store_true',
+                            help='Опитування з кількома варіантами')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--keep', action='store_true',
+                            help='Не видаляти тестові дані')
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        prefix = f'loadtest_vote_{int(time.time())}'
+
+        users = User.objects.bulk_create([
+            User(username=f'{prefix}_{i}', email=f'{prefix}_{i}@loadtest.local')
+            for i in range(options['voters'])
+        ])
+        poll = Poll.objects.create(question=prefix, is_multiple=options['multiple'])
+        option_ids = [
+            option.pk for option in PollOption.objects.bulk_create([
+                PollOption(poll=poll, text=f'Варіант {i + 1}', order=i)
+                for i in range(options['options'])
+            ])
+        ]
+
+        try:
+            jobs = self._jobs(users, option_ids, options)
+            latencies, errors, elapsed = self._run(
+                poll, jobs, options['workers'])
+            self._report(poll, option_ids, jobs, latencies, errors, elapsed)
+        finally:
+            if not options['keep']:
+                poll.delete()
+                User.objects.filter(username__startswith=prefix).delete()
+
+    def _jobs(self, users, option_ids, options):
+        def pick():
+            if options['multiple']:
+                return random.sample(option_ids, random.randint(1, len(option_ids)))
+            return [random.choice(option_ids)]
+
+        jobs = []
+        for user in users:
+            jobs.append((user.pk, pick()))
+            if random.random() < options['revotes']:
+                # Переголосування або відкликання голосу
+                jobs.append((user.pk, pick() if random.random() < 0.7 else []))
+        random.shuffle(jobs)
+        return jobs
+
+    def _run(self, poll, jobs, workers):
+        tasks = queue.Queue()
+        for job in jobs:
+            tasks.put(job)
+
+        latencies, errors = [], []
+        lock = threading.Lock()
+
+        def worker():
+            try:
+                while True:
+                    try:
+                        user_id, option_ids = tasks.get_nowait()
+                    except queue.Empty:
+                        return
+                    started = time.perf_counter()
+                    try:
+                        voting.cast_vote(poll, user_id, option_ids)
+                    except Exception as exc:
+                        with lock:
+                            errors.append(exc)
+                        continue
+                    with lock:
+                        latencies.append((time.perf_counter() - started) * 1000)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(workers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return latencies, errors, time.perf_counter() - started
+
+    def _report(self, poll, option_ids, jobs, latencies, errors, elapsed):
+        done = len(latencies)
+        self.stdout.write(
+            f'Голосів: {len(jobs)}, успішних: {done}, помилок: {len(errors)}, '
+            f'{elapsed:.2f} с ({done / elapsed:.0f} / с)')
+        if latencies:
+            latencies.sort()
+            p95 = latencies[int(len(latencies) * 0.95) - 1]
+            self.stdout.write(
+                f'Затримка, мс: медіана {statistics.median(latencies):.1f}, '
+                f'p95 {p95:.1f}, макс {latencies[-1]:.1f}')
+        for exc in errors[:5]:
+            self.stderr.write(f'  {type(exc).__name__}: {exc}')
+
+        # Звірка: лічильники проти GROUP BY по фактичних голосах
+        actual = dict(
+            PollVote.objects.filter(option__poll=poll)
+            .order_by().values('option_id')
+            .annotate(total=Count('pk'))
+            .values_list('option_id', 'total'))
+        counters = dict(PollOption.objects.filter(poll=poll)
+                        .values_list('pk', 'votes_count'))
+        poll.refresh_from_db(fields=['total_votes'])
+
+        mismatched = [pk for pk in option_ids
+                      if counters.get(pk, 0) != actual.get(pk, 0)]
+        total_actual = sum(actual.values())
+        for pk in option_ids:
+            self.stdout.write(
+                f'  варіант {pk}: лічильник {counters.get(pk, 0)}, '
+                f'фактично {actual.get(pk, 0)}')
+        self.stdout.write(
+            f'  total_votes: {poll.total_votes}, фактично {total_actual}')
+
+        if mismatched or poll.total_votes != total_actual:
+            raise CommandError('Лічильники розійшлися з фактичними голосами')
+        self.stdout.write(self.style.SUCCESS('Лічильники збігаються'))
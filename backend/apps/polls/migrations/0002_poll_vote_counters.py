@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:05
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    Poll = apps.get_model('polls', 'Poll')
+    PollOption = apps.get_model('polls', 'PollOption')
+    PollVote = apps.get_model('polls', 'PollVote')
+
+    PollOption.objects.update(votes_count=Coalesce(Subquery(
+        PollVote.objects.filter(option=OuterRef('pk'))
+        .order_by()
+        .values('option')
+        .annotate(c=Count('pk'))
+        .values('c')[:1],
+        output_field=models.IntegerField(),
+    ), 0))
+    Poll.objects.update(total_votes=Coalesce(Subquery(
+        PollOption.objects.filter(poll=OuterRef('pk'))
+        .order_by()
+        .values('poll')
+        .annotate(s=Sum('votes_count'))
+        .values('s')[:1],
+        output_field=models.IntegerField(),
+    ), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='poll',
+            name='total_votes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='polloption',
+            name='votes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 from django.conf import settings
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
 
 
 class Poll(models.Model):
@@ -10,12 +12,50 @@ class Poll(models.Model):
     question = models.CharField(max_length=500)
     is_multiple = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Денормалізована сума голосів по всіх варіантах
+    total_votes = models.PositiveIntegerField(default=0)
 
     class Meta:
         db_table = 'polls'
 
-    def total_votes(self):
-        return self.options.aggregate(total=models.Count('votes'))['total'] or 0
+    def adjust_votes(self, added_ids=(), removed_ids=()):
+        """
+        Атомарна зміна лічильників через F(): один UPDATE по змінених
+        варіантах (+1 / -1) і один по опитуванню. Блокування завжди в одному
+        порядку (варіанти, потім опитування) — без взаємних дедлоків.
+        """
+        changed = set(added_ids) | set(removed_ids)
+        if changed:
+            step = Case(When(pk__in=list(added_ids), then=Value(1)),
+                        default=Value(-1))
+            PollOption.objects.filter(pk__in=changed).update(
+                votes_count=Greatest(F('votes_count') + step, 0))
+        delta = len(added_ids) - len(removed_ids)
+        if delta:
+            Poll.objects.filter(pk=self.pk).update(
+                total_votes=Greatest(F('total_votes') + delta, 0))
+
+    @classmethod
+    def recount_votes(cls, poll_ids):
+        """Перерахунок лічильників одним GROUP BY option_id"""
+        tallies = dict(
+            PollVote.objects.filter(option__poll_id__in=poll_ids)
+            .order_by()
+            .values('option_id')
+            .annotate(total=models.Count('pk'))
+            .values_list('option_id', 'total')
+        )
+        options = list(PollOption.objects.filter(poll_id__in=poll_ids)
+                       .only('pk', 'poll_id'))
+        totals = dict.fromkeys(poll_ids, 0)
+        for option in options:
+            option.votes_count = tallies.get(option.pk, 0)
+            totals[option.poll_id] = totals.get(option.poll_id, 0) + option.votes_count
+
+        PollOption.objects.bulk_update(options, ['votes_count'])
+        cls.objects.bulk_update(
+            [cls(pk=pk, total_votes=total) for pk, total in totals.items()],
+            ['total_votes'])
 
 
 class PollOption(models.Model):
@@ -23,6 +63,7 @@ class PollOption(models.Model):
         Poll, on_delete=models.CASCADE, related_name='options')
     text = models.CharField(max_length=200)
     order = models.PositiveIntegerField(default=0)
+    votes_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         db_table = 'poll_options'
@@ -3,32 +3,30 @@ from .models import Poll, PollOption, PollVote
 
 
 class PollOptionSerializer(serializers.ModelSerializer):
-    votes_count = serializers.SerializerMethodField()
     vote_percent = serializers.SerializerMethodField()
 
     class Meta:
         model = PollOption
         fields = ['id', 'text', 'votes_count', 'vote_percent']
-
-    def get_votes_count(self, obj):
-        return obj.votes.count()
+        read_only_fields = ['votes_count']
 
     def get_vote_percent(self, obj):
-        total = obj.poll.total_votes()
+        # obj.poll — той самий об'єкт, що й у poll.options (без запиту)
+        total = obj.poll.total_votes
         if total == 0:
             return 0
-        return round((obj.votes.count() / total) * 100, 1)
+        return round((obj.votes_count / total) * 100, 1)
 
 
 class PollSerializer(serializers.ModelSerializer):
     options = PollOptionSerializer(many=True, read_only=True)
     user_voted = serializers.SerializerMethodField()
-    total_votes = serializers.SerializerMethodField()
 
     class Meta:
         model = Poll
         fields = ['id', 'question', 'is_multiple',
                   'options', 'user_voted', 'total_votes']
+        read_only_fields = ['total_votes']
 
     def get_user_voted(self, obj):
         request = self.context.get('request')
@@ -40,9 +38,6 @@ class PollSerializer(serializers.ModelSerializer):
             user=request.user
         ).values_list('option_id', flat=True))
 
-    def get_total_votes(self, obj):
-        return obj.total_votes()
-
 
 class PollCreateSerializer(serializers.ModelSerializer):
     options = serializers.ListField(
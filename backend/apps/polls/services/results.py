@@ -0,0 +1,56 @@
+"""
+Кеш результатів опитувань (лічильники без user_voted — його накладає
+overlay_user_voted для поточного користувача)
+"""
+from django.core.cache import cache
+
+from apps.polls.models import Poll
+from apps.polls.serializers import PollSerializer
+
+RESULTS_CACHE_TIMEOUT = 3600
+
+
+def results_key(poll_id):
+    return f"poll:results:{poll_id}"
+
+
+def refresh_results(poll_ids):
+    """
+    Перечитує денормалізовані лічильники (два запити на будь-яку кількість
+    опитувань) і перезаписує кеш. Повертає {poll_id: дані}.
+    """
+    polls = Poll.objects.filter(pk__in=poll_ids).prefetch_related('options')
+    data = {}
+    for poll in polls:
+        row = PollSerializer(poll).data
+        row.pop('user_voted', None)
+        data[poll.pk] = row
+    if data:
+        cache.set_many({results_key(pk): row for pk, row in data.items()},
+                       timeout=RESULTS_CACHE_TIMEOUT)
+    return data
+
+
+def get_results(poll_ids):
+    keys = {results_key(pk): pk for pk in poll_ids}
+    data = {keys[key]: row for key, row in cache.get_many(keys).items()}
+    missing = [pk for pk in poll_ids if pk not in data]
+    if missing:
+        data.update(refresh_results(missing))
+    return data
+
+
+def overlay_results(polls):
+    """Підставляє актуальні результати в опитування з кешу сторінки поста"""
+    polls = [poll for poll in polls if poll]
+    if not polls:
+        return polls
+    fresh = get_results([poll['id'] for poll in polls])
+    for poll in polls:
+        if poll['id'] in fresh:
+            poll.update(fresh[poll['id']])
+    return polls
+
+
+def forget(poll_id):
+    cache.delete(results_key(poll_id))
@@ -0,0 +1,41 @@
+"""Запис голосів: транзакція, різниця наборів варіантів, лічильники через F()"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from apps.polls.models import PollVote
+from apps.polls.services import results
+
+User = get_user_model()
+
+
+def cast_vote(poll, user_id, option_ids):
+    """
+    Замінює вибір користувача на option_ids (порожній — відкликати голос).
+    Повертає відсортований новий вибір.
+
+    Рядок користувача блокується до кінця транзакції: повторні запити одного
+    юзера виконуються по черзі, голоси різних юзерів одне одному не заважають.
+    Видаляються / створюються лише голоси з різниці старого й нового наборів.
+    """
+    new_ids = set(option_ids)
+    with transaction.atomic():
+        list(User.objects.select_for_update()
+             .filter(pk=user_id).values_list('pk', flat=True))
+
+        user_votes = PollVote.objects.filter(option__poll=poll, user_id=user_id)
+        old_ids = set(user_votes.values_list('option_id', flat=True))
+        added = new_ids - old_ids
+        removed = old_ids - new_ids
+
+        if removed:
+            user_votes.filter(option_id__in=removed).delete()
+        if added:
+            PollVote.objects.bulk_create([
+                PollVote(option_id=option_id, user_id=user_id)
+                for option_id in sorted(added)
+            ])
+        if added or removed:
+            poll.adjust_votes(added_ids=added, removed_ids=removed)
+            transaction.on_commit(lambda: results.refresh_results([poll.pk]))
+
+    return sorted(new_ids)
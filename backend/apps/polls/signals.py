@@ -0,0 +1,23 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from .models import Poll, PollVote
+from .services import results
+
+
+@receiver(pre_delete, sender=get_user_model())
+def recount_polls_on_user_delete(sender, instance, **kwargs):
+    """Голоси зникають каскадом без сигналів — перераховуємо після коміту"""
+    poll_ids = list(
+        PollVote.objects.filter(user=instance)
+        .values_list('option__poll_id', flat=True).distinct())
+    if not poll_ids:
+        return
+
+    def _recount():
+        Poll.recount_votes(poll_ids)
+        results.refresh_results(poll_ids)
+
+    transaction.on_commit(_recount)
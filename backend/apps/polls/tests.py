@@ -1,3 +1,99 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Count
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
-# Create your tests here.
+from .models import Poll, PollOption, PollVote
+from .services.voting import cast_vote
+
+User = get_user_model()
+
+
+class CastVoteTests(TestCase):
+    """cast_vote: різниця наборів і лічильники, що збігаються з COUNT(*)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='voter', email='voter@example.com', password='pass12345')
+        cls.other = User.objects.create_user(
+            username='other', email='other@example.com', password='pass12345')
+        cls.poll = Poll.objects.create(question='Що дивимось?')
+        cls.a, cls.b, cls.c = [
+            PollOption.objects.create(poll=cls.poll, text=text, order=i)
+            for i, text in enumerate(('A', 'B', 'C'))
+        ]
+
+    def assertCountersMatch(self):
+        tallies = dict(
+            PollVote.objects.filter(option__poll=self.poll)
+            .values('option_id').annotate(total=Count('pk'))
+            .values_list('option_id', 'total')
+        )
+        for option in PollOption.objects.filter(poll=self.poll):
+            self.assertEqual(option.votes_count, tallies.get(option.pk, 0),
+                             f'варіант {option.text}')
+        self.poll.refresh_from_db()
+        self.assertEqual(self.poll.total_votes, sum(tallies.values()))
+
+    def voted(self, user):
+        return set(PollVote.objects.filter(option__poll=self.poll, user=user)
+                   .values_list('option_id', flat=True))
+
+    def test_first_vote(self):
+        self.assertEqual(cast_vote(self.poll, self.user.pk, [self.a.pk]), [self.a.pk])
+        self.assertEqual(self.voted(self.user), {self.a.pk})
+        self.assertCountersMatch()
+
+    def test_revote_moves_vote(self):
+        cast_vote(self.poll, self.user.pk, [self.a.pk])
+        cast_vote(self.poll, self.user.pk, [self.b.pk])
+        self.assertEqual(self.voted(self.user), {self.b.pk})
+        self.assertCountersMatch()
+
+    def test_same_vote_twice_changes_nothing(self):
+        cast_vote(self.poll, self.user.pk, [self.a.pk])
+        with CaptureQueriesContext(connection) as ctx:
+            cast_vote(self.poll, self.user.pk, [self.a.pk])
+        writes = [q['sql'] for q in ctx.captured_queries
+                  if q['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))]
+        self.assertEqual(writes, [])
+        self.assertCountersMatch()
+
+    def test_retract(self):
+        cast_vote(self.poll, self.user.pk, [self.a.pk])
+        cast_vote(self.poll, self.other.pk, [self.a.pk])
+        self.assertEqual(cast_vote(self.poll, self.user.pk, []), [])
+        self.assertEqual(self.voted(self.user), set())
+        self.assertEqual(self.voted(self.other), {self.a.pk})
+        self.assertCountersMatch()
+
+    def test_retract_without_vote(self):
+        cast_vote(self.poll, self.user.pk, [])
+        self.assertCountersMatch()
+
+    def test_multiple_options_diff(self):
+        cast_vote(self.poll, self.user.pk, [self.a.pk, self.b.pk])
+        self.assertCountersMatch()
+
+        voted = cast_vote(self.poll, self.user.pk, [self.c.pk, self.b.pk])
+        self.assertEqual(voted, sorted([self.b.pk, self.c.pk]))
+        self.assertEqual(self.voted(self.user), {self.b.pk, self.c.pk})
+        self.assertCountersMatch()
+
+    def test_counters_match_after_mixed_votes(self):
+        cast_vote(self.poll, self.user.pk, [self.a.pk, self.b.pk, self.c.pk])
+        cast_vote(self.poll, self.other.pk, [self.b.pk])
+        cast_vote(self.poll, self.user.pk, [self.c.pk])
+        cast_vote(self.poll, self.other.pk, [self.a.pk, self.c.pk])
+        cast_vote(self.poll, self.user.pk, [])
+        self.assertCountersMatch()
+
+    def test_recount_votes_restores_counters(self):
+        cast_vote(self.poll, self.user.pk, [self.a.pk, self.b.pk])
+        PollOption.objects.filter(poll=self.poll).update(votes_count=7)
+        Poll.objects.filter(pk=self.poll.pk).update(total_votes=0)
+
+        Poll.recount_votes([self.poll.pk])
+        self.assertCountersMatch()
@@ -0,0 +1,23 @@
+from .models import PollVote
+
+
+def overlay_user_voted(request, polls):
+    """
+    Накладає user_voted поточного користувача на серіалізовані опитування
+    (з кешу) — один запит на всі опитування.
+    """
+    polls = [poll for poll in polls if poll]
+    user = getattr(request, 'user', None)
+
+    voted = {}
+    if user is not None and user.is_authenticated and polls:
+        rows = PollVote.objects.filter(
+            user=user,
+            option__poll_id__in=[poll['id'] for poll in polls],
+        ).values_list('option__poll_id', 'option_id')
+        for poll_id, option_id in rows:
+            voted.setdefault(poll_id, []).append(option_id)
+
+    for poll in polls:
+        poll['user_voted'] = voted.get(poll['id'], [])
+    return polls
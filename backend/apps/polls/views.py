@@ -2,12 +2,27 @@ from rest_framework import generics, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.core.cache import cache
 
-from .models import Poll, PollVote, PollOption
+from .models import Poll, PollOption
 from .serializers import PollSerializer, PollCreateSerializer
+from .services import results, voting
 from apps.main.models import Post
 
 
+def _invalidate_post_cache(poll):
+    """
+    Опитування входить у спільний кеш сторінки поста — скидаємо його при
+    створенні / видаленні. Голоси кеш поста не чіпають: результати
+    підставляються з poll:results:<id>.
+    """
+    if poll.post_id:
+        slug = Post.objects.filter(pk=poll.post_id) \
+            .values_list('slug', flat=True).first()
+        if slug:
+            cache.delete(f"post:detail:{slug}")
+
+
 class PollCreateView(generics.CreateAPIView):
     serializer_class = PollCreateSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -22,6 +37,7 @@ class PollCreateView(generics.CreateAPIView):
             Poll.objects.filter(post=post).delete()   # видаляємо старий poll
 
         poll = serializer.save(post=post)
+        _invalidate_post_cache(poll)
         return poll
 
     def create(self, request, *args, **kwargs):
@@ -49,24 +65,24 @@ class PollVoteView(APIView):
         if not poll.is_multiple and len(option_ids) > 1:
             return Response({'error': 'Можна обрати лише один варіант'}, status=400)
 
-        options = PollOption.objects.filter(id__in=option_ids, poll=poll)
-        if options.count() != len(option_ids):
+        valid_ids = list(PollOption.objects.filter(id__in=option_ids, poll=poll)
+                         .values_list('pk', flat=True))
+        if len(valid_ids) != len(option_ids):
             return Response({'error': 'Невірний варіант'}, status=400)
 
-        # Видаляємо старі голоси і створюємо нові
-        PollVote.objects.filter(option__poll=poll, user=request.user).delete()
-
-        PollVote.objects.bulk_create([
-            PollVote(option=option, user=request.user)
-            for option in options
-        ])
-
-        return Response(PollSerializer(poll, context={'request': request}).data)
+        voted_ids = voting.cast_vote(poll, request.user.pk, valid_ids)
+        return Response(self._results(poll, voted_ids))
 
     def delete(self, request, poll_id):
         poll = get_object_or_404(Poll, id=poll_id)
-        PollVote.objects.filter(option__poll=poll, user=request.user).delete()
-        return Response(PollSerializer(poll, context={'request': request}).data)
+        voting.cast_vote(poll, request.user.pk, [])
+        return Response(self._results(poll, []))
+
+    @staticmethod
+    def _results(poll, voted_ids):
+        """Результати з кешу (оновлюється після коміту голосу) + вибір користувача"""
+        data = results.get_results([poll.pk])[poll.pk]
+        return {**data, 'user_voted': voted_ids}
 
 
 class PollDeleteView(APIView):
@@ -74,5 +90,8 @@ class PollDeleteView(APIView):
 
     def delete(self, request, poll_id):
         poll = get_object_or_404(Poll, id=poll_id, post__author=request.user)
+        poll_id = poll.pk
         poll.delete()
+        results.forget(poll_id)
+        _invalidate_post_cache(poll)
         return Response(status=204)
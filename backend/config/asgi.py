@@ -3,6 +3,13 @@ ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Під ASGI можна ввімкнути TMDB_ASYNC_VIEWS — запити до TMDB тоді йдуть
+через пул httpx.AsyncClient і не тримають потік, поки чекають відповідь.
+Повністю async це не робить: автентифікація/ліміти DRF виконуються в потоці,
+а django-redis не має async-API — cache.aget/aset/aadd падають назад на
+sync_to_async(thread_sensitive=True), тобто всі звернення до кешу йдуть
+через один спільний потік.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -329,8 +329,48 @@ EMAIL_PORT = 587
 EMAIL_HOST_USER = config('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
 
+# Рейтинги постів: ваги для hot_score та період напіврозпаду для трендів
+POST_SCORE_WEIGHTS = {
+    'views_count': 0.45,
+    'likes_count': 2.8,
+    'comments_count': 4.2,
+}
+TRENDING_HALF_LIFE_HOURS = config(
+    'TRENDING_HALF_LIFE_HOURS', default=48, cast=float)
+
+# Черга карми (KarmaEvent). Воркер process_karma_events не обов'язковий:
+# без нього кожен запит після коміту застосовує власні події (чужих не чіпає).
+# False — вимкнути (коли воркер запущено окремим процесом).
+KARMA_INLINE_APPLY = config('KARMA_INLINE_APPLY', default=True, cast=bool)
+
+# Буфер переглядів. Без воркера flush_post_views його скидає запит: раз на
+# N секунд або коли в буфері більше VIEWS_FLUSH_MAX_PENDING постів.
+# 0 — вимкнути (коли воркер запущено окремим процесом).
+VIEWS_INLINE_FLUSH_INTERVAL = config(
+    'VIEWS_INLINE_FLUSH_INTERVAL', default=60, cast=int)
+VIEWS_FLUSH_MAX_PENDING = config(
+    'VIEWS_FLUSH_MAX_PENDING', default=1000, cast=int)
+
+# Повнотекстовий пошук: конфігурація text search PostgreSQL
+# ('simple' — без стемінгу, однаково працює для укр/англ)
+SEARCH_CONFIG = config('SEARCH_CONFIG', default='simple')
+
 # апі для фільмів
 TMDB_API_KEY = config('TMDB_API_KEY', default='')
+# Пул з'єднань до TMDB (один хост — ліміти фактично на хост)
+TMDB_TIMEOUT = config('TMDB_TIMEOUT', default=10.0, cast=float)
+TMDB_MAX_CONNECTIONS = config('TMDB_MAX_CONNECTIONS', default=20, cast=int)
+TMDB_MAX_KEEPALIVE = config('TMDB_MAX_KEEPALIVE', default=10, cast=int)
+TMDB_KEEPALIVE_EXPIRY = config('TMDB_KEEPALIVE_EXPIRY', default=30.0, cast=float)
+# Скільки ще віддавати застарілу відповідь, поки один воркер її оновлює (с)
+TMDB_STALE_TTL = config('TMDB_STALE_TTL', default=6 * 3600, cast=int)
+# Скільки запит без кешу чекає на чужий запит до TMDB (с); далі — 503,
+# а не власний запит (інакше всі очікувачі підуть у TMDB одночасно)
+TMDB_LOCK_WAIT = config('TMDB_LOCK_WAIT', default=2.0, cast=float)
+# Async-варіант проксі-view (httpx.AsyncClient) — вмикати під ASGI.
+# Async лише запит до TMDB: кеш django-redis і перевірки DRF — через
+# sync_to_async (кеш — в одному спільному потоці), див. config/asgi.py
+TMDB_ASYNC_VIEWS = config('TMDB_ASYNC_VIEWS', default=False, cast=bool)
 # Кеш — Redis
 CACHES = {
     "default": {